@@ -0,0 +1,314 @@
+"""Distilled local tool classifier trained from feedback history.
+
+A multinomial logistic regression over hashed word n-gram features. It is
+trained from successful feedback entries and answers routine tool selections
+in-process, so the LLM selector is only consulted when the classifier is not
+confident.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from pathlib import Path
+from tempfile import gettempdir
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from tool_router.ai.feedback import FeedbackStore
+
+
+logger = logging.getLogger(__name__)
+
+_MODEL_FILE_ENV = "ROUTER_CLASSIFIER_FILE"
+_DEFAULT_MODEL_FILE = str(Path(gettempdir()) / "tool_router_classifier.json.gz")
+_MODEL_VERSION = 1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_PRUNE_THRESHOLD = 1e-4  # Weights below this magnitude are dropped when saving
+
+
+class HashedNgramFeaturizer:
+    """Map text to a sparse, L2-normalized vector of hashed word n-grams."""
+
+    def __init__(self, n_features: int = 2**18, max_ngram: int = 2) -> None:
+        self.n_features = n_features
+        self.max_ngram = max_ngram
+
+    def transform(self, text: str) -> dict[int, float]:
+        """Return {feature_index: weight} for the given text."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        counts: dict[int, float] = {}
+        for n in range(1, self.max_ngram + 1):
+            for i in range(len(tokens) - n + 1):
+                # crc32 is stable across processes, unlike the salted built-in hash()
+                index = zlib.crc32(" ".join(tokens[i : i + n]).encode()) % self.n_features
+                counts[index] = counts.get(index, 0.0) + 1.0
+
+        norm = math.sqrt(sum(value * value for value in counts.values()))
+        if norm == 0:
+            return {}
+        return {index: value / norm for index, value in counts.items()}
+
+
+class ToolClassifier:
+    """Softmax regression mapping task text to the tool that handled it successfully."""
+
+    def __init__(
+        self,
+        n_features: int = 2**18,
+        learning_rate: float = 0.5,
+        epochs: int = 5,
+        min_confidence: float = 0.85,
+        min_samples: int = 20,
+    ) -> None:
+        """Initialize an untrained classifier.
+
+        Args:
+            n_features: Size of the hashed feature space
+            learning_rate: SGD step size
+            epochs: Passes over each training batch
+            min_confidence: Minimum probability for predict() to return a tool
+            min_samples: Samples required before predictions are served
+        """
+        self.featurizer = HashedNgramFeaturizer(n_features=n_features)
+        self.learning_rate = learning_rate
+        self.epochs = epochs
+        self.min_confidence = min_confidence
+        self.min_samples = min_samples
+        self.n_samples_seen = 0
+        self.trained_until = 0.0  # Timestamp of the newest feedback entry trained on
+        self.trained_offset = 0  # Entries at exactly trained_until already trained on
+        # (weights, bias) swapped as one tuple so readers never see a mixed model
+        self._params: tuple[dict[str, dict[int, float]], dict[str, float]] = ({}, {})
+        self._lock = threading.Lock()
+
+    @property
+    def classes(self) -> list[str]:
+        """Tool names the classifier can predict."""
+        return list(self._params[1])
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether enough data has been seen to serve predictions."""
+        return len(self._params[1]) >= 2 and self.n_samples_seen >= self.min_samples
+
+    @staticmethod
+    def _softmax(
+        features: dict[int, float], weights: dict[str, dict[int, float]], bias: dict[str, float]
+    ) -> dict[str, float]:
+        scores = {
+            tool: bias[tool] + sum(weights[tool].get(index, 0.0) * value for index, value in features.items())
+            for tool in bias
+        }
+        top = max(scores.values())
+        exps = {tool: math.exp(score - top) for tool, score in scores.items()}
+        total = sum(exps.values())
+        return {tool: value / total for tool, value in exps.items()}
+
+    def predict_proba(self, task: str) -> dict[str, float]:
+        """Return class probabilities for a task (empty when untrained)."""
+        weights, bias = self._params
+        if not bias:
+            return {}
+        return self._softmax(self.featurizer.transform(task), weights, bias)
+
+    def predict(self, task: str) -> tuple[str, float] | None:
+        """Return (tool_name, confidence) if the classifier is ready and confident, else None."""
+        if not self.is_ready:
+            return None
+        probabilities = self.predict_proba(task)
+        if not probabilities:
+            return None
+        tool_name, confidence = max(probabilities.items(), key=lambda item: item[1])
+        if confidence < self.min_confidence:
+            return None
+        return tool_name, confidence
+
+    def partial_fit(self, samples: list[tuple[str, str]], seed: int = 0) -> None:
+        """Continue training on (task, tool_name) samples.
+
+        Training runs on copies of the parameters which are swapped in at the
+        end, so concurrent predictions never observe a half-updated model.
+        """
+        if not samples:
+            return
+
+        featurized = [(self.featurizer.transform(task), tool) for task, tool in samples]
+        with self._lock:
+            weights = {tool: dict(w) for tool, w in self._params[0].items()}
+            bias = dict(self._params[1])
+            for _, tool in featurized:
+                if tool not in bias:
+                    bias[tool] = 0.0
+                    weights[tool] = {}
+
+            rng = random.Random(seed)  # noqa: S311 - shuffling only
+            for _ in range(self.epochs):
+                rng.shuffle(featurized)
+                for features, target in featurized:
+                    probabilities = self._softmax(features, weights, bias)
+                    for tool, probability in probabilities.items():
+                        gradient = probability - (1.0 if tool == target else 0.0)
+                        if abs(gradient) < 1e-6:
+                            continue
+                        step = self.learning_rate * gradient
+                        tool_weights = weights[tool]
+                        for index, value in features.items():
+                            tool_weights[index] = tool_weights.get(index, 0.0) - step * value
+                        bias[tool] -= step
+
+            self._params = (weights, bias)
+            self.n_samples_seen += len(samples)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, model_file: str | None = None) -> None:
+        """Write a compact gzip-compressed model file (atomic replace)."""
+        path = Path(model_file or os.getenv(_MODEL_FILE_ENV, _DEFAULT_MODEL_FILE))
+        weights, bias = self._params
+        data = {
+            "version": _MODEL_VERSION,
+            "n_features": self.featurizer.n_features,
+            "n_samples_seen": self.n_samples_seen,
+            "trained_until": self.trained_until,
+            "trained_offset": self.trained_offset,
+            "bias": bias,
+            "weights": {
+                tool: [[index, round(value, 6)] for index, value in w.items() if abs(value) >= _PRUNE_THRESHOLD]
+                for tool, w in weights.items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(gzip.compress(json.dumps(data, separators=(",", ":")).encode()))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, model_file: str | None = None, **kwargs: float) -> ToolClassifier:
+        """Load a model file, returning an untrained classifier if missing or invalid."""
+        path = Path(model_file or os.getenv(_MODEL_FILE_ENV, _DEFAULT_MODEL_FILE))
+        if not path.exists():
+            return cls(**kwargs)
+        try:
+            data = json.loads(gzip.decompress(path.read_bytes()))
+            if data.get("version") != _MODEL_VERSION:
+                msg = f"unsupported model version {data.get('version')}"
+                raise ValueError(msg)
+            classifier = cls(n_features=data["n_features"], **kwargs)
+            classifier.n_samples_seen = data["n_samples_seen"]
+            classifier.trained_until = data["trained_until"]
+            classifier.trained_offset = data.get("trained_offset", 0)
+            classifier._params = (
+                {tool: {int(i): v for i, v in pairs} for tool, pairs in data["weights"].items()},
+                dict(data["bias"]),
+            )
+            logger.debug("Loaded tool classifier with %d classes from %s", len(classifier.classes), path)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not load tool classifier: %s", exc)
+            return cls(**kwargs)
+        else:
+            return classifier
+
+
+class ClassifierTrainer:
+    """Incrementally retrain a ToolClassifier from new successful feedback."""
+
+    def __init__(
+        self,
+        classifier: ToolClassifier,
+        feedback_store: FeedbackStore,
+        model_file: str | None = None,
+        min_new_samples: int = 10,
+    ) -> None:
+        self.classifier = classifier
+        self.feedback_store = feedback_store
+        self.model_file = model_file
+        self.min_new_samples = min_new_samples
+        self._running = False
+        self._training_thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def train_incremental(self) -> int:
+        """Train on feedback past the classifier's watermark.
+
+        The watermark is the newest timestamp trained on plus how many entries
+        at that timestamp were included, so entries sharing it with the last
+        trained one are not skipped.
+
+        Returns:
+            Number of samples trained on (0 if too few new samples)
+        """
+        watermark, offset = self.classifier.trained_until, self.classifier.trained_offset
+        # training_samples() is exclusive, so step just below the watermark to include it
+        samples = self.feedback_store.training_samples(since=math.nextafter(watermark, -math.inf))
+        skip = 0
+        while skip < min(offset, len(samples)) and samples[skip][2] == watermark:
+            skip += 1
+        new_samples = samples[skip:]
+        if not new_samples or len(new_samples) < self.min_new_samples:
+            return 0
+
+        self.classifier.partial_fit([(task, tool) for task, tool, _ in new_samples])
+        newest = max(timestamp for _, _, timestamp in new_samples)
+        self.classifier.trained_until = newest
+        self.classifier.trained_offset = sum(1 for _, _, timestamp in samples if timestamp == newest)
+        try:
+            self.classifier.save(self.model_file)
+        except OSError as exc:
+            logger.warning("Could not persist tool classifier: %s", exc)
+        logger.info(
+            "Tool classifier retrained on %d samples (%d classes)", len(new_samples), len(self.classifier.classes)
+        )
+        return len(new_samples)
+
+    def start(self, interval: int = 300) -> None:
+        """Start background retraining: one pass right away, then every interval seconds."""
+        if self._running:
+            logger.warning("Classifier training already running")
+            return
+
+        self._running = True
+        self._stop_event.clear()
+
+        def train_loop() -> None:
+            while True:
+                try:
+                    self.train_incremental()
+                except Exception as e:  # noqa: BLE001
+                    logger.warning("Error in classifier training: %s", e)
+                if self._stop_event.wait(interval):
+                    break
+
+        self._training_thread = threading.Thread(target=train_loop, name="classifier-trainer", daemon=True)
+        self._training_thread.start()
+        logger.info("Started background classifier training (interval: %ds)", interval)
+
+    def stop(self) -> None:
+        """Stop background retraining."""
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop_event.set()
+        if self._training_thread:
+            self._training_thread.join(timeout=5)
+        logger.info("Stopped background classifier training")
+
+
+def train_from_feedback(
+    feedback_store: FeedbackStore, model_file: str | None = None, **kwargs: float
+) -> ToolClassifier:
+    """Fit a fresh classifier on all successful feedback and save it."""
+    classifier = ToolClassifier(**kwargs)
+    ClassifierTrainer(classifier, feedback_store, model_file=model_file, min_new_samples=1).train_incremental()
+    return classifier
@@ -10,7 +10,9 @@ from typing import Any
 
 import httpx
 
+from tool_router.ai.keywords import COMPLEXITY_RULES, get_task_classifier
 from tool_router.ai.prompts import PromptTemplates
+from tool_router.ai.tokens import format_tool_line, get_token_counter, pack_tool_descriptions
 
 
 logger = logging.getLogger(__name__)
@@ -84,6 +86,24 @@ class AIModel(Enum):
         }
         return costs.get(model, {"input": 0.0, "output": 0.0})  # Free for local models
 
+    @classmethod
+    def get_context_window(cls, model: str) -> int:
+        """Get the usable context window (in tokens) for a model."""
+        # Local models are bounded by Ollama's default num_ctx, not their trained window
+        if cls.is_local_model(model):
+            return 2048
+        windows = {
+            cls.GPT4O_MINI.value: 128_000,
+            cls.GPT4O.value: 128_000,
+            cls.GPT35_TURBO.value: 16_385,
+            cls.CLAUDE_HAIKU.value: 200_000,
+            cls.CLAUDE_SONNET.value: 200_000,
+            cls.GEMINI_FLASH.value: 1_000_000,
+            cls.GEMINI_PRO.value: 2_000_000,
+            cls.GROK_MINI.value: 131_072,
+        }
+        return windows.get(model, 2048)
+
     @classmethod
     def is_local_model(cls, model: str) -> bool:
         """Check if model is locally hosted (free)."""
@@ -164,6 +184,9 @@ class BaseAISelector(ABC):
 class OllamaSelector(BaseAISelector):
     """Ollama-based AI selector (existing implementation)."""
 
+    # Tokens reserved for the model's response (matches num_predict)
+    _RESPONSE_TOKENS = 200
+
     def __init__(
         self,
         endpoint: str,
@@ -186,9 +209,13 @@ class OllamaSelector(BaseAISelector):
         if not tools:
             return None
 
-        tool_list = "\n".join(
-            f"- {tool.get('name', 'Unknown')}: {tool.get('description', 'No description')}" for tool in tools
+        base_prompt = PromptTemplates.create_tool_selection_prompt(
+            task=task,
+            tool_list="",
+            context=context,
+            similar_tools=similar_tools,
         )
+        tool_list = pack_tool_descriptions(tools, self._tool_list_budget(base_prompt))
         prompt = PromptTemplates.create_tool_selection_prompt(
             task=task,
             tool_list=tool_list,
@@ -225,9 +252,13 @@ class OllamaSelector(BaseAISelector):
         if not tools:
             return None
 
-        tool_list = "\n".join(
-            f"- {tool.get('name', 'Unknown')}: {tool.get('description', 'No description')}" for tool in tools
+        base_prompt = PromptTemplates.create_multi_tool_selection_prompt(
+            task=task,
+            tool_list="",
+            context=context,
+            max_tools=max_tools,
         )
+        tool_list = pack_tool_descriptions(tools, self._tool_list_budget(base_prompt))
         prompt = PromptTemplates.create_multi_tool_selection_prompt(
             task=task,
             tool_list=tool_list,
@@ -253,6 +284,11 @@ class OllamaSelector(BaseAISelector):
 
         return result
 
+    def _tool_list_budget(self, base_prompt: str) -> int:
+        """Tokens left for the tool list once the prompt frame and response are reserved."""
+        context_window = AIModel.get_context_window(self.model)
+        return max(0, context_window - get_token_counter().count(base_prompt) - self._RESPONSE_TOKENS)
+
     def _call_ollama(self, prompt: str) -> str | None:
         """Call the Ollama API."""
         try:
@@ -265,7 +301,8 @@ class OllamaSelector(BaseAISelector):
                         "stream": False,
                         "options": {
                             "temperature": 0.1,
-                            "num_predict": 200,
+                            "num_predict": self._RESPONSE_TOKENS,
+                            "num_ctx": AIModel.get_context_window(self.model),
                         },
                     },
                 )
@@ -642,16 +679,10 @@ class EnhancedAISelector:
 
     def _analyze_task_complexity(self, task: str) -> str:
         """Analyze task complexity for model selection."""
-        task_lower = task.lower().strip()
-
         # Simple heuristic based on task characteristics
-        if len(task_lower) < 50 or any(keyword in task_lower for keyword in ["what is", "how to", "explain", "define"]):
+        if len(task.strip()) < 50:
             return "simple"
-        if any(keyword in task_lower for keyword in ["create", "generate", "build", "implement", "develop"]):
-            return "complex"
-        if any(keyword in task_lower for keyword in ["analyze", "optimize", "refactor", "debug", "test"]):
-            return "moderate"
-        return "unknown"
+        return get_task_classifier().label(task, COMPLEXITY_RULES.name)
 
     def _estimate_token_usage(
         self,
@@ -661,10 +692,10 @@ class EnhancedAISelector:
         max_tools: int = 3,
     ) -> dict[str, int]:
         """Estimate token usage for a request."""
-        # Rough estimation based on content length
-        task_tokens = len(task.split()) * 1.3  # Average 1.3 tokens per word
-        context_tokens = len(context.split()) * 1.3 if context else 0
-        tool_list_tokens = len(tools) * 50  # Average 50 tokens per tool description
+        counter = get_token_counter()
+        task_tokens = counter.count(task)
+        context_tokens = counter.count(context)
+        tool_list_tokens = sum(counter.count(format_tool_line(tool)) + 1 for tool in tools)
 
         # For multi-tool, account for orchestration overhead
         orchestration_overhead = max_tools * 20
@@ -0,0 +1,237 @@
+"""Learned direct routes for frequently repeated tasks.
+
+Tasks are reduced to a template by replacing their arguments (paths, file
+names, URLs, quoted strings, numbers and the object after a connector such
+as "for" or "to") with a placeholder while keeping the verbs and nouns, so
+"read file a.csv" and "read file b.csv" share one template, as do "search
+the web for python" and "search the web for rust", but "list users" and
+"list repositories" do not. A template whose outcomes keep
+succeeding with the same tool is promoted to a direct route that bypasses
+scoring entirely; a failure demotes it again.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from tool_router.ai.keywords import ROUTING_RULE_SETS
+
+
+logger = logging.getLogger(__name__)
+
+_PROMOTE_AFTER_ENV = "ROUTER_FAST_PATH_PROMOTE_AFTER"
+_MIN_CONFIDENCE_ENV = "ROUTER_FAST_PATH_MIN_CONFIDENCE"
+_DEFAULT_PROMOTE_AFTER = 5  # Consecutive successes before a template is routed directly
+_DEFAULT_MIN_CONFIDENCE = 0.9  # Minimum observed success ratio of the tool for the template
+_DEFAULT_MAX_TEMPLATES = 10000
+_PLACEHOLDER = "{}"
+_LATENCY_SMOOTHING = 0.1  # Weight of the newest sample in the latency moving averages
+
+# Words whose following phrase is an argument ("search the web for <python>")
+_ARGUMENT_CONNECTORS = frozenset(("for", "to", "about", "named", "called", "into", "from", "in", "on", "as"))
+# Words that end such a phrase; determiners right after the connector are kept
+_PHRASE_STOPS = _ARGUMENT_CONNECTORS | frozenset(("and", "or", "then", "with", "using", "via", "by", "at"))
+_DETERMINERS = frozenset(("the", "a", "an", "my", "our", "this", "that", "all"))
+# Routing keywords are never arguments: "how to <delete> files" keeps its verb
+_KEYWORDS = frozenset(
+    word
+    for rule_set in ROUTING_RULE_SETS
+    for keywords in rule_set.rules.values()
+    for keyword in keywords
+    for word in keyword.split()
+)
+_QUOTED = re.compile(r'"[^"]*"|\'[^\']*\'')
+_URL = re.compile(r"https?://\S+")
+_PUNCTUATION = frozenset(",;!?")
+_TOKEN = re.compile(r'"\{\}"|[^\s,;!?]+|[,;!?]')
+_PATH = re.compile(r"[/\\]|^[\w\-]+\.[a-z][a-z0-9]{0,4}$")  # Paths and file names
+_NUMBER = re.compile(r"^\d+(?:\.\d+)?$")
+
+
+@dataclass
+class _TemplateState:
+    """Outcome tracking for one task template."""
+
+    tool: str = ""  # Tool of the current success streak
+    streak: int = 0
+    successes: int = 0  # Outcomes of the streak tool for this template
+    attempts: int = 0
+    route: str | None = None  # Promoted tool, if any
+
+    @property
+    def confidence(self) -> float:
+        return self.successes / self.attempts if self.attempts else 0.0
+
+
+class DirectRouteTable:
+    """Map task templates to tools once they have proven reliable.
+
+    A template is promoted after promote_after consecutive successes with one
+    tool, provided that tool's success ratio for the template is at least
+    min_confidence. Any failure of the routed tool demotes the template.
+    Templates are kept in LRU order and bounded by max_templates.
+    """
+
+    def __init__(
+        self,
+        promote_after: int | None = None,
+        min_confidence: float | None = None,
+        max_templates: int = _DEFAULT_MAX_TEMPLATES,
+    ) -> None:
+        """Initialize an empty table.
+
+        Args:
+            promote_after: Consecutive successes required for promotion
+                (defaults to ROUTER_FAST_PATH_PROMOTE_AFTER or 5; 0 disables promotion)
+            min_confidence: Minimum success ratio of the tool for the template
+                (defaults to ROUTER_FAST_PATH_MIN_CONFIDENCE or 0.9)
+            max_templates: Templates tracked before the least recently used is dropped
+        """
+        self.promote_after = (
+            promote_after
+            if promote_after is not None
+            else int(os.getenv(_PROMOTE_AFTER_ENV, str(_DEFAULT_PROMOTE_AFTER)))
+        )
+        self.min_confidence = (
+            min_confidence
+            if min_confidence is not None
+            else float(os.getenv(_MIN_CONFIDENCE_ENV, str(_DEFAULT_MIN_CONFIDENCE)))
+        )
+        self.max_templates = max_templates
+        self._templates: OrderedDict[str, _TemplateState] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._promotions = 0
+        self._demotions = 0
+        self._avg_lookup_ms = 0.0
+        self._avg_scored_ms = 0.0
+
+    @staticmethod
+    def template(task: str) -> str:
+        """Normalize a task to its template by replacing its arguments.
+
+        Quoted strings, URLs, paths, file names and numbers are replaced, as
+        is the phrase after an argument connector (up to the next connector
+        or punctuation) unless it starts with a routing keyword. Everything
+        else, including the request's verbs and nouns, is kept so different
+        intents never share a template.
+        """
+        task = _QUOTED.sub('"{}"', task.lower())
+        task = _URL.sub(_PLACEHOLDER, task)
+        words: list[str] = []
+        in_argument = False
+        for token in _TOKEN.findall(task):
+            if token in _PHRASE_STOPS or token in _PUNCTUATION:
+                in_argument = token in _ARGUMENT_CONNECTORS
+                words.append(token)
+                continue
+            if token in _KEYWORDS:
+                in_argument = False
+                words.append(token)
+                continue
+            if in_argument and token in _DETERMINERS and words[-1] in _ARGUMENT_CONNECTORS:
+                words.append(token)
+                continue
+            word = _PLACEHOLDER if in_argument or _PATH.search(token) or _NUMBER.match(token) else token
+            if not (word == _PLACEHOLDER and words and words[-1] == _PLACEHOLDER):
+                words.append(word)
+        return " ".join(words)
+
+    def lookup(self, task: str) -> str | None:
+        """Return the directly routed tool for a task, or None to fall back to scoring."""
+        start = time.perf_counter()
+        key = self.template(task)
+        with self._lock:
+            state = self._templates.get(key)
+            tool = state.route if state else None
+            if tool is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._templates.move_to_end(key)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._avg_lookup_ms += (elapsed_ms - self._avg_lookup_ms) * _LATENCY_SMOOTHING
+        return tool
+
+    def record_scoring_latency(self, duration_ms: float) -> None:
+        """Record how long a scored (non fast-path) selection took, for savings estimates."""
+        with self._lock:
+            if self._avg_scored_ms == 0.0:
+                self._avg_scored_ms = duration_ms
+            else:
+                self._avg_scored_ms += (duration_ms - self._avg_scored_ms) * _LATENCY_SMOOTHING
+
+    def observe(self, task: str, tool: str, success: bool) -> None:
+        """Update the template's streak with one outcome, promoting or demoting it."""
+        key = self.template(task)
+        with self._lock:
+            state = self._templates.get(key)
+            if state is None:
+                state = self._templates[key] = _TemplateState()
+                if len(self._templates) > self.max_templates:
+                    self._templates.popitem(last=False)
+            else:
+                self._templates.move_to_end(key)
+
+            if not success:
+                if state.tool == tool:
+                    state.streak = 0
+                    state.attempts += 1
+                if state.route == tool:
+                    state.route = None
+                    self._demotions += 1
+                    logger.info("Demoted direct route %r -> %s after a failure", key, tool)
+                return
+
+            if state.tool != tool:
+                # A different tool succeeded: start tracking it instead
+                state.tool, state.streak, state.successes, state.attempts = tool, 0, 0, 0
+            state.streak += 1
+            state.successes += 1
+            state.attempts += 1
+
+            if (
+                state.route != tool
+                and self.promote_after > 0
+                and state.streak >= self.promote_after
+                and state.confidence >= self.min_confidence
+            ):
+                state.route = tool
+                self._promotions += 1
+                logger.info("Promoted direct route %r -> %s", key, tool)
+
+    def demote(self, task: str) -> None:
+        """Drop the direct route for a task's template (e.g. its tool disappeared)."""
+        key = self.template(task)
+        with self._lock:
+            state = self._templates.get(key)
+            if state and state.route is not None:
+                state.route = None
+                state.streak = 0
+                self._demotions += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return hit rate, route counts and the estimated latency saved by direct routes."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            saved_per_hit = max(0.0, self._avg_scored_ms - self._avg_lookup_ms)
+            return {
+                "routes": sum(1 for state in self._templates.values() if state.route is not None),
+                "templates": len(self._templates),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "promotions": self._promotions,
+                "demotions": self._demotions,
+                "avg_lookup_ms": self._avg_lookup_ms,
+                "avg_scored_ms": self._avg_scored_ms,
+                "estimated_saved_ms": self._hits * saved_per_hit,
+            }
@@ -1,24 +1,42 @@
 """Enhanced context learning from feedback for AI tool selection."""
 
+import heapq
 import json
 import logging
 import os
 import re
+import threading
 import time
-from dataclasses import asdict, dataclass, field
+from array import array
+from collections import deque
+from collections.abc import Iterator, Mapping
+from dataclasses import asdict, astuple, dataclass, field
 from pathlib import Path
 from tempfile import gettempdir
+from types import MappingProxyType
 from typing import Any
 
+from tool_router.ai.keywords import INTENT_RULES, TASK_TYPE_RULES, get_task_classifier
+
 
 logger = logging.getLogger(__name__)
 
 _FEEDBACK_FILE_ENV = "ROUTER_FEEDBACK_FILE"
+_BACKEND_ENV = "ROUTER_FEEDBACK_BACKEND"
 _DEFAULT_FEEDBACK_FILE = str(Path(gettempdir()) / "tool_router_feedback.json")
 _MAX_ENTRIES = 1000
+_RECENT_WINDOW = 50
+_MAX_CONTEXT_CHARS = 256  # Context kept per history entry; it is stored but never scored
+_HALF_LIFE_ENV = "ROUTER_FEEDBACK_HALF_LIFE"
+_DEFAULT_HALF_LIFE = 86400.0  # Seconds for an outcome's weight to halve
 
+_FSYNC_ENV = "ROUTER_FEEDBACK_FSYNC"
+_FSYNC_POLICIES = ("always", "interval", "never")
+_FSYNC_INTERVAL = 1.0  # Seconds between fsyncs under the "interval" policy
+_COMPACT_THRESHOLD = 1000  # Log records that trigger an inline compaction
 
-@dataclass
+
+@dataclass(slots=True)
 class FeedbackEntry:
     """A single feedback record for a tool selection."""
 
@@ -72,101 +90,374 @@ class TaskPattern:
     total_occurrences: int = 0
 
 
-class FeedbackStore:
-    """Enhanced persistent store for tool selection feedback enabling context learning.
+@dataclass
+class OutcomeCounter:
+    """Running success/total counts for one aggregation key."""
 
-    Feedback is used to boost or penalise tools based on historical success
-    rates, providing a lightweight learning signal without requiring a full
-    ML pipeline.
+    successes: int = 0
+    total: int = 0
+
+    def add(self, success: bool) -> None:
+        self.total += 1
+        if success:
+            self.successes += 1
+
+    @property
+    def success_rate(self) -> float:
+        if self.total == 0:
+            return 0.5  # neutral prior
+        return self.successes / self.total
+
+
+@dataclass
+class DecayedRate:
+    """Exponentially time-decayed success and confidence estimator.
+
+    Each outcome's weight halves every half_life seconds, so the rates follow
+    recent behaviour while storing only four floats per key.
     """
 
-    def __init__(self, feedback_file: str | None = None) -> None:
-        self._file = Path(feedback_file or os.getenv(_FEEDBACK_FILE_ENV, _DEFAULT_FEEDBACK_FILE))
-        self._entries: list[FeedbackEntry] = []
-        self._stats: dict[str, ToolStats] = {}
-        self._patterns: dict[str, TaskPattern] = {}
-        self._load()
+    weight: float = 0.0
+    successes: float = 0.0
+    confidence: float = 0.0
+    updated_at: float = 0.0
+
+    def add(self, success: bool, confidence: float, timestamp: float, half_life: float) -> None:
+        if timestamp >= self.updated_at:
+            decay = 0.5 ** ((timestamp - self.updated_at) / half_life)
+            self.weight *= decay
+            self.successes *= decay
+            self.confidence *= decay
+            self.updated_at = timestamp
+            contribution = 1.0
+        else:
+            # Late arrivals (e.g. merged from another replica) count as already decayed
+            contribution = 0.5 ** ((self.updated_at - timestamp) / half_life)
+        self.weight += contribution
+        if success:
+            self.successes += contribution
+        self.confidence += contribution * confidence
 
-    @staticmethod
-    def _classify_task_type(task: str) -> str:
-        """Classify task into semantic categories."""
-        task_lower = task.lower()
+    @property
+    def success_rate(self) -> float:
+        if self.weight == 0:
+            return 0.5  # neutral prior
+        return self.successes / self.weight
+
+    @property
+    def avg_confidence(self) -> float:
+        if self.weight == 0:
+            return 0.0
+        return self.confidence / self.weight
 
-        # File operations
-        if any(word in task_lower for word in ["file", "read", "write", "create", "delete", "open"]):
-            return "file_operations"
 
-        # Search operations
-        if any(word in task_lower for word in ["search", "find", "lookup", "query", "search"]):
-            return "search_operations"
+def classify_task_type(task: str) -> str:
+    """Classify task into semantic categories."""
+    return get_task_classifier().label(task, TASK_TYPE_RULES.name)
 
-        # Code operations
-        if any(word in task_lower for word in ["code", "edit", "modify", "refactor", "syntax"]):
-            return "code_operations"
 
-        # Database operations
-        if any(word in task_lower for word in ["database", "db", "sql", "query", "table"]):
-            return "database_operations"
+def classify_intent(task: str) -> str:
+    """Classify user intent."""
+    return get_task_classifier().label(task, INTENT_RULES.name)
 
-        # Network operations
-        if any(word in task_lower for word in ["http", "api", "request", "fetch", "web"]):
-            return "network_operations"
 
-        # System operations
-        if any(word in task_lower for word in ["system", "process", "command", "terminal", "shell"]):
-            return "system_operations"
+def extract_entities(task: str) -> list[str]:
+    """Extract key entities from task text."""
+    # Simple entity extraction - look for file paths, URLs, and quoted strings
+    entities = []
 
-        return "general_operations"
+    # File paths
+    path_pattern = r"[/\\]?[\w\-./\\]+"
+    paths = re.findall(path_pattern, task)
+    entities.extend([p for p in paths if len(p) > 2])
 
-    @staticmethod
-    def _classify_intent(task: str) -> str:
-        """Classify user intent."""
-        task_lower = task.lower()
+    # Quoted strings
+    quote_pattern = r'"([^"]+)"|\'([^\']+)\''
+    quotes = re.findall(quote_pattern, task)
+    entities.extend([q[0] or q[1] for q in quotes])
 
-        # Create intent
-        if any(word in task_lower for word in ["create", "make", "add", "new", "generate", "build"]):
-            return "create"
+    # URLs
+    url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
+    urls = re.findall(url_pattern, task)
+    entities.extend(urls)
 
-        # Read intent
-        if any(word in task_lower for word in ["read", "get", "fetch", "retrieve", "show", "display", "list"]):
-            return "read"
+    return list(set(entities))  # Remove duplicates
 
-        # Update intent
-        if any(word in task_lower for word in ["update", "modify", "change", "edit", "alter", "adjust"]):
-            return "update"
 
-        # Delete intent
-        if any(word in task_lower for word in ["delete", "remove", "destroy", "clear", "clean"]):
-            return "delete"
+class FeedbackHistory:
+    """Bounded, columnar history of feedback entries (oldest first).
 
-        # Search intent
-        if any(word in task_lower for word in ["search", "find", "lookup", "query", "seek"]):
-            return "search"
+    Numeric fields live in typed arrays and the tool, task type and intent
+    labels are interned to integer ids, so an entry costs little more than
+    its task text. Contexts are truncated to _MAX_CONTEXT_CHARS and repeated
+    ones share a single string. Entities are not stored; they are re-derived
+    from the task when an entry is materialized. Indexing and iteration build
+    FeedbackEntry objects on demand, and appending past maxlen overwrites
+    the oldest entry like a bounded deque.
+    """
 
-        return "unknown"
+    def __init__(self, maxlen: int) -> None:
+        if maxlen < 1:
+            msg = f"feedback history maxlen must be at least 1, got {maxlen}"
+            raise ValueError(msg)
+        self.maxlen = maxlen
+        self._labels: list[str] = []
+        self._label_ids: dict[str, int] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every entry (interned labels are kept)."""
+        self._start = 0  # Physical slot of the oldest entry once the buffer has wrapped
+        self._tasks: list[str] = []
+        self._contexts: list[str] = []
+        self._context_pool: dict[str, str] = {}
+        self._timestamps = array("d")
+        self._confidences = array("d")
+        self._success = bytearray()
+        self._tools = array("I")
+        self._task_types = array("I")
+        self._intents = array("I")
+        self._token_counts = array("I")  # Distinct lowercase task tokens, for similarity scoring
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __getitem__(self, index: int) -> FeedbackEntry:
+        slot = self._slot(index)
+        task = self._tasks[slot]
+        return FeedbackEntry(
+            task=task,
+            selected_tool=self._labels[self._tools[slot]],
+            success=bool(self._success[slot]),
+            timestamp=self._timestamps[slot],
+            context=self._contexts[slot],
+            confidence=self._confidences[slot],
+            task_type=self._labels[self._task_types[slot]],
+            intent_category=self._labels[self._intents[slot]],
+            entities=extract_entities(task),
+        )
 
-    @staticmethod
-    def _extract_entities(task: str) -> list[str]:
-        """Extract key entities from task text."""
-        # Simple entity extraction - look for file paths, URLs, and quoted strings
-        entities = []
+    def __iter__(self) -> Iterator[FeedbackEntry]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _slot(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            msg = "feedback history index out of range"
+            raise IndexError(msg)
+        return (self._start + index) % self.maxlen
+
+    def _label_id(self, label: str) -> int:
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = len(self._labels)
+            self._labels.append(label)
+            self._label_ids[label] = label_id
+        return label_id
+
+    def _intern_context(self, context: str) -> str:
+        context = context[:_MAX_CONTEXT_CHARS]
+        if len(self._context_pool) >= self.maxlen and context not in self._context_pool:
+            self._context_pool.clear()  # Keeps evicted contexts from being pinned by the pool
+        return self._context_pool.setdefault(context, context)
+
+    def append(self, entry: FeedbackEntry) -> None:
+        """Append an entry, overwriting the oldest one when full."""
+        values = (
+            entry.task,
+            self._intern_context(entry.context),
+            entry.timestamp,
+            entry.confidence,
+            int(entry.success),
+            self._label_id(entry.selected_tool),
+            self._label_id(entry.task_type),
+            self._label_id(entry.intent_category),
+            len(set(entry.task.lower().split())),
+        )
+        columns = (
+            self._tasks,
+            self._contexts,
+            self._timestamps,
+            self._confidences,
+            self._success,
+            self._tools,
+            self._task_types,
+            self._intents,
+            self._token_counts,
+        )
+        if len(self) < self.maxlen:
+            for column, value in zip(columns, values, strict=True):
+                column.append(value)
+        else:
+            for column, value in zip(columns, values, strict=True):
+                column[self._start] = value
+            self._start = (self._start + 1) % self.maxlen
+
+    def task(self, index: int) -> str:
+        """Return the task text of one entry without materializing it."""
+        return self._tasks[self._slot(index)]
+
+    def tool(self, index: int) -> str:
+        """Return the selected tool of one entry without materializing it."""
+        return self._labels[self._tools[self._slot(index)]]
+
+    def succeeded(self, index: int) -> bool:
+        """Return whether one entry was a success without materializing it."""
+        return bool(self._success[self._slot(index)])
+
+    def token_count(self, index: int) -> int:
+        """Return the number of distinct lowercase tokens in one entry's task."""
+        return self._token_counts[self._slot(index)]
+
+    def training_samples(self, since: float) -> list[tuple[str, str, float]]:
+        """Return (task, tool, timestamp) for successful entries newer than since, oldest first."""
+        samples = []
+        for index in range(len(self)):
+            slot = (self._start + index) % self.maxlen
+            if self._success[slot] and self._timestamps[slot] > since:
+                samples.append((self._tasks[slot], self._labels[self._tools[slot]], self._timestamps[slot]))
+        return samples
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Serialize entries for a snapshot (entities are omitted and re-derived on load)."""
+        records = []
+        for index in range(len(self)):
+            slot = (self._start + index) % self.maxlen
+            records.append(
+                {
+                    "task": self._tasks[slot],
+                    "selected_tool": self._labels[self._tools[slot]],
+                    "success": bool(self._success[slot]),
+                    "timestamp": self._timestamps[slot],
+                    "context": self._contexts[slot],
+                    "confidence": self._confidences[slot],
+                    "task_type": self._labels[self._task_types[slot]],
+                    "intent_category": self._labels[self._intents[slot]],
+                }
+            )
+        return records
+
+
+class FeedbackStore:
+    """Enhanced persistent store for tool selection feedback enabling context learning.
+
+    Feedback is used to boost or penalise tools based on historical success
+    rates, providing a lightweight learning signal without requiring a full
+    ML pipeline.
+
+    All aggregates are maintained incrementally, so recording feedback and
+    looking up boosts cost O(1) regardless of how much history is retained.
+    The raw entry history is only kept (up to max_entries, in a compact
+    columnar FeedbackHistory) for similarity lookups, training samples and
+    persistence.
 
-        # File paths
-        path_pattern = r"[/\\]?[\w\-./\\]+"
-        paths = re.findall(path_pattern, task)
-        entities.extend([p for p in paths if len(p) > 2])
+    Boosts use exponentially decayed success and confidence estimators per
+    tool, (task_type, tool) and (tool, intent), so routing adapts quickly when
+    a tool regresses or is fixed; all-time counts remain in ToolStats.
 
-        # Quoted strings
-        quote_pattern = r'"([^"]+)"|\'([^\']+)\''
-        quotes = re.findall(quote_pattern, task)
-        entities.extend([q[0] or q[1] for q in quotes])
+    New entries are appended to a JSONL write-ahead log next to the snapshot
+    file; the log is folded into the snapshot by compact(), either inline
+    once it grows past compact_threshold records or periodically from a
+    background thread (start_compaction).
+    """
 
-        # URLs
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        urls = re.findall(url_pattern, task)
-        entities.extend(urls)
+    def __init__(
+        self,
+        feedback_file: str | None = None,
+        max_entries: int = _MAX_ENTRIES,
+        fsync: str | None = None,
+        compact_threshold: int = _COMPACT_THRESHOLD,
+        half_life: float | None = None,
+    ) -> None:
+        """Initialize the store and recover persisted feedback.
+
+        Args:
+            feedback_file: Snapshot path (the log lives at ``<feedback_file>.log``)
+            max_entries: Raw entries retained in memory and in snapshots
+            fsync: Log durability policy: "always", "interval" or "never"
+            compact_threshold: Log records that trigger an inline compaction
+            half_life: Seconds for an outcome's influence on boosts to halve
+                (defaults to ROUTER_FEEDBACK_HALF_LIFE or one day)
+        """
+        self.half_life = half_life or float(os.getenv(_HALF_LIFE_ENV, str(_DEFAULT_HALF_LIFE)))
+        self._file = Path(feedback_file or os.getenv(_FEEDBACK_FILE_ENV, _DEFAULT_FEEDBACK_FILE))
+        self._log_file = self._file.with_name(self._file.name + ".log")
+        self._compacting_file = self._file.with_name(self._file.name + ".log.compacting")
+        self.fsync = self._resolve_fsync_policy(fsync)
+        self.compact_threshold = compact_threshold
+        self._entries = FeedbackHistory(max_entries)
+        self._stats: dict[str, ToolStats] = {}
+        self._patterns: dict[str, TaskPattern] = {}
+        self._reset_aggregates()
+        self._clear_entries()
+
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()  # Serializes snapshot writers
+        self._seq = 0  # Sequence number of the last applied entry
+        self._log_handle: Any = None
+        self._log_records = 0  # Records in the live log since the last compaction
+        self._last_fsync = 0.0
+        self._compaction_thread: threading.Thread | None = None
+        self._compaction_stop = threading.Event()
+        self._load()
 
-        return list(set(entities))  # Remove duplicates
+    @staticmethod
+    def _resolve_fsync_policy(fsync: str | None) -> str:
+        policy = (fsync or os.getenv(_FSYNC_ENV, "interval")).lower()
+        if policy not in _FSYNC_POLICIES:
+            logger.warning("Unknown feedback fsync policy %r, using 'interval'", policy)
+            return "interval"
+        return policy
+
+    def _reset_aggregates(self) -> None:
+        """Clear the incrementally maintained counters."""
+        self._task_type_outcomes: dict[tuple[str, str], OutcomeCounter] = {}  # (task_type, tool)
+        self._intent_outcomes: dict[tuple[str, str], OutcomeCounter] = {}  # (tool, intent)
+        self._pattern_entities: dict[str, set[str]] = {}
+        # Ring buffer of the last _RECENT_WINDOW outcomes with per-tool window counters
+        self._recent: deque[tuple[str, bool]] = deque()
+        self._recent_outcomes: dict[str, OutcomeCounter] = {}
+        self._tool_decay: dict[str, DecayedRate] = {}
+        self._task_type_decay: dict[tuple[str, str], DecayedRate] = {}  # (task_type, tool)
+        self._intent_decay: dict[tuple[str, str], DecayedRate] = {}  # (tool, intent)
+        # Materialized comprehensive boosts per (task_type, intent) class, see get_boost_table()
+        self._boost_tables: dict[tuple[str, str], dict[str, float]] = {}
+        self._stale_boost_tools: set[str] = set()  # Tools with feedback not yet folded into the tables
+
+    def _clear_entries(self) -> None:
+        """Drop the entry history and its similarity index."""
+        self._entries.clear()
+        # Entry ids are positional: the entry at self._entries[i] has id _first_entry_id + i
+        self._first_entry_id = 0
+        self._token_index: dict[str, set[int]] = {}  # token -> ids of successful entries
+
+    def _append_entry(self, entry: FeedbackEntry) -> None:
+        """Append to the bounded history, keeping the similarity index in step with evictions."""
+        if len(self._entries) == self._entries.maxlen:
+            evicted_id = self._first_entry_id
+            self._first_entry_id += 1
+            if self._entries.succeeded(0):
+                for token in set(self._entries.task(0).lower().split()):
+                    ids = self._token_index[token]
+                    ids.discard(evicted_id)
+                    if not ids:
+                        del self._token_index[token]
+
+        self._entries.append(entry)
+        entry_id = self._first_entry_id + len(self._entries) - 1
+        if entry.success:
+            for token in set(entry.task.lower().split()):
+                if token not in self._token_index:
+                    self._token_index[token] = set()
+                self._token_index[token].add(entry_id)
+
+    # Kept as methods for callers that classify through the store
+    _classify_task_type = staticmethod(classify_task_type)
+    _classify_intent = staticmethod(classify_intent)
+    _extract_entities = staticmethod(extract_entities)
 
     # ------------------------------------------------------------------
     # Public API
@@ -181,92 +472,129 @@ class FeedbackStore:
         confidence: float = 0.0,
     ) -> None:
         """Record the outcome of a tool selection with enhanced learning."""
-        # Classify task for learning
-        task_type = self._classify_task_type(task)
-        intent_category = self._classify_intent(task)
-        entities = self._extract_entities(task)
+        entry = self._make_entry(task, selected_tool, success, context, confidence)
+        self._commit([entry])
+        logger.debug(
+            "Enhanced feedback recorded: tool=%s success=%s task_type=%s rate=%.2f",
+            selected_tool,
+            success,
+            entry.task_type,
+            self._stats[selected_tool].success_rate,
+        )
+
+    def record_many(self, events: list[dict[str, Any]]) -> None:
+        """Record a batch of outcomes with a single log write.
+
+        Args:
+            events: Keyword arguments for record(), one dict per outcome
+        """
+        entries = [self._make_entry(**event) for event in events]
+        if entries:
+            self._commit(entries)
+            logger.debug("Enhanced feedback recorded: batch of %d", len(entries))
 
-        entry = FeedbackEntry(
+    def _make_entry(
+        self,
+        task: str,
+        selected_tool: str,
+        success: bool,
+        context: str = "",
+        confidence: float = 0.0,
+    ) -> FeedbackEntry:
+        """Classify a task and build its feedback entry."""
+        return FeedbackEntry(
             task=task,
             selected_tool=selected_tool,
             success=success,
             context=context,
             confidence=confidence,
-            task_type=task_type,
-            intent_category=intent_category,
-            entities=entities,
+            task_type=self._classify_task_type(task),
+            intent_category=self._classify_intent(task),
+            entities=self._extract_entities(task),
         )
-        self._entries.append(entry)
 
-        # Update tool statistics
-        if selected_tool not in self._stats:
-            self._stats[selected_tool] = ToolStats(selected_tool)
-        stats = self._stats[selected_tool]
-        if success:
+    def _commit(self, entries: list[FeedbackEntry]) -> None:
+        """Apply entries to memory and append them to the log, compacting if it has grown too long."""
+        with self._lock:
+            records = []
+            for entry in entries:
+                self._append_entry(entry)
+                self._apply_entry(entry)
+                self._seq += 1
+                records.append((entry, self._seq))
+            self._append_to_log(records)
+            needs_compaction = self._log_records >= self.compact_threshold and self._compaction_thread is None
+
+        if needs_compaction:
+            self.compact()
+
+    def _apply_entry(self, entry: FeedbackEntry) -> ToolStats:
+        """Fold one entry into every aggregate in O(1)."""
+        tool = entry.selected_tool
+        if tool not in self._stats:
+            self._stats[tool] = ToolStats(tool)
+        stats = self._stats[tool]
+        if entry.success:
             stats.success_count += 1
         else:
             stats.failure_count += 1
 
-        # Update confidence tracking
-        total_entries = len([e for e in self._entries if e.selected_tool == selected_tool])
-        if total_entries > 0:
-            confidences = [e.confidence for e in self._entries if e.selected_tool == selected_tool]
-            stats.avg_confidence = sum(confidences) / len(confidences)
-
-        # Update task type tracking
-        if task_type not in stats.task_types:
-            stats.task_types[task_type] = 0
-        stats.task_types[task_type] += 1
-
-        # Update intent tracking
-        if intent_category not in stats.intent_categories:
-            stats.intent_categories[intent_category] = 0
-        stats.intent_categories[intent_category] += 1
-
-        # Update recent success rate (last 50 entries)
-        recent_entries = [e for e in self._entries[-50:] if e.selected_tool == selected_tool]
-        if recent_entries:
-            recent_successes = sum(1 for e in recent_entries if e.success)
-            stats.recent_success_rate = recent_successes / len(recent_entries)
-
-        # Update task patterns
-        if task_type not in self._patterns:
-            self._patterns[task_type] = TaskPattern(task_type)
-        pattern = self._patterns[task_type]
-        pattern.total_occurrences += 1
-
-        # Update pattern tool preferences
-        if selected_tool not in pattern.preferred_tools:
-            pattern.preferred_tools[selected_tool] = 0.0
+        # Running mean over all outcomes for this tool
+        stats.avg_confidence += (entry.confidence - stats.avg_confidence) / stats.total
+        stats.task_types[entry.task_type] = stats.task_types.get(entry.task_type, 0) + 1
+        stats.intent_categories[entry.intent_category] = stats.intent_categories.get(entry.intent_category, 0) + 1
 
-        # Calculate success rate for this tool in this task type
-        task_type_entries = [e for e in self._entries if e.task_type == task_type and e.selected_tool == selected_tool]
-        if task_type_entries:
-            success_rate = sum(1 for e in task_type_entries if e.success) / len(task_type_entries)
-            pattern.preferred_tools[selected_tool] = success_rate
+        self._push_recent(tool, entry.success)
+        stats.recent_success_rate = self._recent_outcomes[tool].success_rate
 
-        # Update pattern entities
-        for entity in entities:
-            if entity not in pattern.common_entities:
-                pattern.common_entities.append(entity)
+        intent_key = (tool, entry.intent_category)
+        self._intent_outcomes.setdefault(intent_key, OutcomeCounter()).add(entry.success)
 
-        # Calculate average confidence for this task type
-        task_type_confidences = [e.confidence for e in self._entries if e.task_type == task_type]
-        if task_type_confidences:
-            pattern.avg_confidence = sum(task_type_confidences) / len(task_type_confidences)
+        self._apply_decay(entry)
+        self._stale_boost_tools.add(tool)
 
-        # Trim to avoid unbounded growth
-        if len(self._entries) > _MAX_ENTRIES:
-            self._entries = self._entries[-_MAX_ENTRIES:]
+        if entry.task_type not in self._patterns:
+            self._patterns[entry.task_type] = TaskPattern(entry.task_type)
+        pattern = self._patterns[entry.task_type]
+        pattern.total_occurrences += 1
+        pattern.avg_confidence += (entry.confidence - pattern.avg_confidence) / pattern.total_occurrences
+
+        task_type_outcome = self._task_type_outcomes.setdefault((entry.task_type, tool), OutcomeCounter())
+        task_type_outcome.add(entry.success)
+        pattern.preferred_tools[tool] = task_type_outcome.success_rate
+
+        if entry.task_type not in self._pattern_entities:
+            self._pattern_entities[entry.task_type] = set(pattern.common_entities)
+        known_entities = self._pattern_entities[entry.task_type]
+        for entity in entry.entities:
+            if entity not in known_entities:
+                known_entities.add(entity)
+                pattern.common_entities.append(entity)
 
-        self._persist()
-        logger.debug(
-            "Enhanced feedback recorded: tool=%s success=%s task_type=%s rate=%.2f",
-            selected_tool,
-            success,
-            task_type,
-            stats.success_rate,
-        )
+        return stats
+
+    def _apply_decay(self, entry: FeedbackEntry) -> None:
+        """Fold one entry into the time-decayed estimators."""
+        tool = entry.selected_tool
+        for decay_map, key in (
+            (self._tool_decay, tool),
+            (self._task_type_decay, (entry.task_type, tool)),
+            (self._intent_decay, (tool, entry.intent_category)),
+        ):
+            if key not in decay_map:
+                decay_map[key] = DecayedRate()
+            decay_map[key].add(entry.success, entry.confidence, entry.timestamp, self.half_life)
+
+    def _push_recent(self, tool: str, success: bool) -> None:
+        """Append to the recent-outcome ring buffer, evicting the oldest outcome."""
+        if len(self._recent) >= _RECENT_WINDOW:
+            old_tool, old_success = self._recent.popleft()
+            window = self._recent_outcomes[old_tool]
+            window.total -= 1
+            if old_success:
+                window.successes -= 1
+        self._recent.append((tool, success))
+        self._recent_outcomes.setdefault(tool, OutcomeCounter()).add(success)
 
     def get_boost(self, tool_name: str) -> float:
         """Return an enhanced score multiplier based on comprehensive learning."""
@@ -275,7 +603,8 @@ class FeedbackStore:
             return 1.0  # not enough data
 
         # Enhanced boost calculation considering multiple factors
-        base_boost = 0.5 + stats.success_rate  # Historical success rate
+        decayed = self._tool_decay.get(tool_name) or DecayedRate()
+        base_boost = 0.5 + decayed.success_rate  # Time-decayed success rate
 
         # For confidence and recent boosts, only apply if there's some success
         # to avoid penalizing tools that have never succeeded
@@ -283,7 +612,7 @@ class FeedbackStore:
         recent_boost = 0.0
 
         if stats.success_count > 0:
-            confidence_boost = (stats.avg_confidence - 0.5) * 0.3  # Confidence factor
+            confidence_boost = (decayed.avg_confidence - 0.5) * 0.3  # Confidence factor
             recent_boost = (stats.recent_success_rate - 0.5) * 0.2  # Recent performance
 
         # Combine factors
@@ -293,36 +622,27 @@ class FeedbackStore:
         return max(0.1, min(1.7, enhanced_boost))
 
     def get_task_type_boost(self, tool_name: str, task_type: str) -> float:
-        """Get boost based on task type performance."""
-        pattern = self._patterns.get(task_type)
-        if not pattern or tool_name not in pattern.preferred_tools:
+        """Get boost based on time-decayed task type performance."""
+        decayed = self._task_type_decay.get((task_type, tool_name))
+        if decayed is None:
             return 1.0
 
-        success_rate = pattern.preferred_tools[tool_name]
         # Map success rate to boost multiplier
-        return 0.7 + (success_rate * 0.6)  # Range: 0.7 to 1.3
+        return 0.7 + (decayed.success_rate * 0.6)  # Range: 0.7 to 1.3
 
     def get_intent_boost(self, tool_name: str, intent_category: str) -> float:
-        """Get boost based on intent category performance."""
-        stats = self._stats.get(tool_name)
-        if not stats or intent_category not in stats.intent_categories:
+        """Get boost based on time-decayed intent category performance."""
+        decayed = self._intent_decay.get((tool_name, intent_category))
+        if decayed is None:
             return 1.0
 
-        # Calculate success rate for this specific intent
-        intent_entries = [
-            e for e in self._entries if e.selected_tool == tool_name and e.intent_category == intent_category
-        ]
-        if not intent_entries:
-            return 1.0
-
-        success_rate = sum(1 for e in intent_entries if e.success) / len(intent_entries)
-        return 0.8 + (success_rate * 0.4)  # Range: 0.8 to 1.2
+        return 0.8 + (decayed.success_rate * 0.4)  # Range: 0.8 to 1.2
 
     def get_comprehensive_boost(self, tool_name: str, task: str) -> float:
         """Get comprehensive boost considering all factors."""
-        task_type = self._classify_task_type(task)
-        intent_category = self._classify_intent(task)
+        return self._combine_boosts(tool_name, self._classify_task_type(task), self._classify_intent(task))
 
+    def _combine_boosts(self, tool_name: str, task_type: str, intent_category: str) -> float:
         # Combine different boost factors
         base_boost = self.get_boost(tool_name)
         task_type_boost = self.get_task_type_boost(tool_name, task_type)
@@ -337,6 +657,31 @@ class FeedbackStore:
 
         return comprehensive_boost
 
+    def get_boost_table(self, task: str) -> Mapping[str, float]:
+        """Return comprehensive boosts for every tool with feedback, for one task.
+
+        The task is classified once and the boosts for its (task_type, intent)
+        class are read from a materialized table, so scoring a catalog costs
+        one dict lookup per tool. Tools missing from the table have no
+        feedback and a neutral boost of 1.0. Tables are built on first use
+        and refreshed only for the tools that received feedback since.
+
+        Returns:
+            Read-only mapping of tool name to get_comprehensive_boost() value
+        """
+        key = (self._classify_task_type(task), self._classify_intent(task))
+        with self._lock:
+            if self._stale_boost_tools:
+                for (task_type, intent_category), table in self._boost_tables.items():
+                    for tool in self._stale_boost_tools:
+                        table[tool] = self._combine_boosts(tool, task_type, intent_category)
+                self._stale_boost_tools.clear()
+            table = self._boost_tables.get(key)
+            if table is None:
+                table = {tool: self._combine_boosts(tool, *key) for tool in self._stats}
+                self._boost_tables[key] = table
+            return MappingProxyType(table)
+
     def get_learning_insights(self, task: str) -> dict[str, Any]:
         """Get learning insights for a given task."""
         task_type = self._classify_task_type(task)
@@ -402,56 +747,165 @@ class FeedbackStore:
         """Return stats for all tools that have received feedback."""
         return dict(self._stats)
 
+    def training_samples(self, since: float = 0.0) -> list[tuple[str, str, float]]:
+        """Return (task, selected_tool, timestamp) for successful entries newer than since."""
+        with self._lock:
+            return self._entries.training_samples(since)
+
     def similar_task_tools(self, task: str, top_n: int = 3) -> list[str]:
         """Return tool names that succeeded on similar past tasks.
 
-        Uses simple token overlap as a lightweight similarity measure.
+        Uses simple token overlap as a lightweight similarity measure. Only
+        entries sharing at least one token with the task are visited, via the
+        inverted token index; ties favour the tool used most recently.
         """
         task_tokens = set(task.lower().split())
-        candidates: list[tuple[str, float]] = []
-
-        for entry in reversed(self._entries):
-            if not entry.success:
-                continue
-            entry_tokens = set(entry.task.lower().split())
-            overlap = len(task_tokens & entry_tokens)
-            if overlap > 0:
-                similarity = overlap / max(len(task_tokens), len(entry_tokens))
-                candidates.append((entry.selected_tool, similarity))
-
-        # Deduplicate, keeping highest similarity per tool
-        best: dict[str, float] = {}
-        for tool_name, sim in candidates:
-            if tool_name not in best or sim > best[tool_name]:
-                best[tool_name] = sim
-
-        sorted_tools = sorted(best.items(), key=lambda x: -x[1])
-        return [t for t, _ in sorted_tools[:top_n]]
+        with self._lock:
+            overlaps: dict[int, int] = {}
+            for token in task_tokens:
+                for entry_id in self._token_index.get(token, ()):
+                    overlaps[entry_id] = overlaps.get(entry_id, 0) + 1
+
+            # Best similarity per tool, plus its newest matching entry id for tie-breaking
+            best: dict[str, tuple[float, int]] = {}
+            for entry_id, overlap in overlaps.items():
+                index = entry_id - self._first_entry_id
+                tool_name = self._entries.tool(index)
+                similarity = overlap / max(len(task_tokens), self._entries.token_count(index))
+                current = best.get(tool_name)
+                if current is None:
+                    best[tool_name] = (similarity, entry_id)
+                else:
+                    best[tool_name] = (max(similarity, current[0]), max(entry_id, current[1]))
+
+        top = heapq.nsmallest(top_n, best.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return [tool_name for tool_name, _ in top]
 
     # ------------------------------------------------------------------
     # Persistence
     # ------------------------------------------------------------------
 
+    def _append_to_log(self, records: list[tuple[FeedbackEntry, int]]) -> None:
+        """Append (entry, seq) records to the write-ahead log (best-effort, caller holds the lock)."""
+        try:
+            if self._log_handle is None:
+                self._file.parent.mkdir(parents=True, exist_ok=True)
+                self._log_handle = self._log_file.open("a", encoding="utf-8")
+            self._log_handle.write(
+                "".join(
+                    json.dumps({"seq": seq, **asdict(entry)}, separators=(",", ":")) + "\n" for entry, seq in records
+                )
+            )
+            self._log_handle.flush()
+            self._log_records += len(records)
+            now = time.monotonic()
+            if self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= _FSYNC_INTERVAL):
+                os.fsync(self._log_handle.fileno())
+                self._last_fsync = now
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not append feedback to log: %s", exc)
+
+    def _close_log(self) -> None:
+        """Flush and close the log handle (caller holds the lock)."""
+        if self._log_handle is None:
+            return
+        try:
+            if self.fsync != "never":
+                self._log_handle.flush()
+                os.fsync(self._log_handle.fileno())
+            self._log_handle.close()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not close feedback log: %s", exc)
+        self._log_handle = None
+
+    def compact(self) -> None:
+        """Fold the write-ahead log into a fresh snapshot."""
+        self._persist()
+
     def _persist(self) -> None:
-        """Write entries to disk (best-effort)."""
+        """Write a snapshot of entries and aggregates, then drop the compacted log (best-effort).
+
+        The live log is rotated aside under the lock so recording can continue
+        while the snapshot is written. Every record carries a sequence number
+        and the snapshot stores the last one it covers, so a crash at any point
+        leaves a state that _load can recover without double counting.
+        """
         try:
-            self._file.parent.mkdir(parents=True, exist_ok=True)
+            with self._compaction_lock:
+                self._write_snapshot()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not persist feedback: %s", exc)
+
+    def _write_snapshot(self) -> None:
+        """Capture state and rotate the log under the lock, then write the snapshot atomically."""
+        with self._lock:
             data = {
-                "entries": [asdict(e) for e in self._entries],
+                "seq": self._seq,
+                "entries": self._entries.to_records(),
                 "stats": {name: asdict(s) for name, s in self._stats.items()},
+                "aggregates": self._aggregates_to_dict(),
             }
-            self._file.write_text(json.dumps(data, indent=2))
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Could not persist feedback: %s", exc)
+            self._close_log()
+            if self._log_file.exists() and not self._compacting_file.exists():
+                self._log_file.replace(self._compacting_file)
+            self._log_records = 0
+
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._file.with_name(self._file.name + ".tmp")
+        with tmp_file.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+            handle.flush()
+            if self.fsync != "never":
+                os.fsync(handle.fileno())
+        tmp_file.replace(self._file)
+        self._compacting_file.unlink(missing_ok=True)
+
+    def start_compaction(self, interval: int = 60) -> None:
+        """Start periodic background compaction of the write-ahead log."""
+        if self._compaction_thread is not None:
+            logger.warning("Feedback compaction already running")
+            return
 
-    def _load(self) -> None:
-        """Load entries from disk (best-effort)."""
-        if not self._file.exists():
+        self._compaction_stop.clear()
+
+        def compaction_loop() -> None:
+            while not self._compaction_stop.wait(interval):
+                if self._log_records:
+                    self.compact()
+
+        self._compaction_thread = threading.Thread(target=compaction_loop, name="feedback-compactor", daemon=True)
+        self._compaction_thread.start()
+        logger.info("Started background feedback compaction (interval: %ds)", interval)
+
+    def stop_compaction(self) -> None:
+        """Stop background compaction."""
+        if self._compaction_thread is None:
             return
+
+        self._compaction_stop.set()
+        self._compaction_thread.join(timeout=5)
+        self._compaction_thread = None
+        logger.info("Stopped background feedback compaction")
+
+    def close(self) -> None:
+        """Stop background work, compact pending log records and release the log file."""
+        self.stop_compaction()
+        if self._log_records:
+            self.compact()
+        with self._lock:
+            self._close_log()
+
+    def _load(self) -> None:
+        """Recover from the snapshot plus any write-ahead log records (best-effort)."""
         try:
-            data = json.loads(self._file.read_text())
-            self._entries = [FeedbackEntry(**e) for e in data.get("entries", [])]
-            self._stats = {name: ToolStats(**s) for name, s in data.get("stats", {}).items()}
+            if self._file.exists():
+                self._load_snapshot(json.loads(self._file.read_text()))
+            snapshot_seq = self._seq
+            interrupted_compaction = self._compacting_file.exists()
+            for log_file in (self._compacting_file, self._log_file):
+                self._replay_log(log_file, snapshot_seq)
+            if interrupted_compaction:
+                self._persist()
             logger.debug(
                 "Loaded %d feedback entries from %s",
                 len(self._entries),
@@ -459,5 +913,125 @@ class FeedbackStore:
             )
         except Exception as exc:  # noqa: BLE001
             logger.warning("Could not load feedback: %s", exc)
-            self._entries = []
+            self._clear_entries()
             self._stats = {}
+            self._patterns = {}
+            self._reset_aggregates()
+            self._seq = 0
+
+    def _load_snapshot(self, data: dict[str, Any]) -> None:
+        """Restore entries and aggregates from a snapshot document."""
+        for e in data.get("entries", []):
+            self._append_entry(FeedbackEntry(**e))
+        if "aggregates" in data:
+            self._aggregates_from_dict(data["aggregates"])
+        else:
+            # Older files only carry entries: replay them once to rebuild the counters
+            for entry in self._entries:
+                self._apply_entry(entry)
+        self._stats = {name: ToolStats(**s) for name, s in data.get("stats", {}).items()}
+        self._seed_decay_from_counts(time.time())
+        self._seq = data.get("seq", 0)
+
+    def _replay_log(self, log_file: Path, snapshot_seq: int) -> None:
+        """Apply log records newer than the snapshot.
+
+        A torn final record (from a crash mid-append) ends the replay and is
+        truncated away so later appends start on a clean line.
+        """
+        if not log_file.exists():
+            return
+        valid_bytes = 0
+        with log_file.open("rb") as handle:
+            for line in handle:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")  # noqa: TRY301
+                    record = json.loads(line)
+                    seq = record.pop("seq")
+                    entry = FeedbackEntry(**record)
+                except (ValueError, TypeError, KeyError):
+                    logger.warning("Discarding torn feedback log record in %s", log_file)
+                    break
+                valid_bytes += len(line)
+                if seq <= snapshot_seq:
+                    continue
+                self._append_entry(entry)
+                self._apply_entry(entry)
+                self._seq = seq
+                if log_file == self._log_file:
+                    self._log_records += 1
+        if valid_bytes < log_file.stat().st_size:
+            with log_file.open("r+b") as handle:
+                handle.truncate(valid_bytes)
+
+    def _aggregates_to_dict(self) -> dict[str, Any]:
+        """Serialize the incremental counters."""
+        return {
+            "patterns": {name: asdict(p) for name, p in self._patterns.items()},
+            "task_type_outcomes": [
+                [t, tool, c.successes, c.total] for (t, tool), c in self._task_type_outcomes.items()
+            ],
+            "intent_outcomes": [[tool, i, c.successes, c.total] for (tool, i), c in self._intent_outcomes.items()],
+            "recent": [[tool, success] for tool, success in self._recent],
+            "decayed": {
+                "tools": [[tool, *astuple(d)] for tool, d in self._tool_decay.items()],
+                "task_types": [[t, tool, *astuple(d)] for (t, tool), d in self._task_type_decay.items()],
+                "intents": [[tool, i, *astuple(d)] for (tool, i), d in self._intent_decay.items()],
+            },
+        }
+
+    def _aggregates_from_dict(self, data: dict[str, Any]) -> None:
+        """Restore the incremental counters serialized by _aggregates_to_dict."""
+        self._patterns = {name: TaskPattern(**p) for name, p in data.get("patterns", {}).items()}
+        self._task_type_outcomes = {(t, tool): OutcomeCounter(s, n) for t, tool, s, n in data["task_type_outcomes"]}
+        self._intent_outcomes = {(tool, i): OutcomeCounter(s, n) for tool, i, s, n in data["intent_outcomes"]}
+        for tool, success in data.get("recent", []):
+            self._push_recent(tool, success)
+        decayed = data.get("decayed", {})
+        self._tool_decay = {tool: DecayedRate(*values) for tool, *values in decayed.get("tools", [])}
+        self._task_type_decay = {(t, tool): DecayedRate(*values) for t, tool, *values in decayed.get("task_types", [])}
+        self._intent_decay = {(tool, i): DecayedRate(*values) for tool, i, *values in decayed.get("intents", [])}
+
+    def _seed_decay_from_counts(self, timestamp: float) -> None:
+        """Create decayed estimators from all-time counts for keys that have none.
+
+        Used when history predates the decayed estimators (or was trimmed away):
+        those outcomes are treated as if they all happened at timestamp.
+        """
+        for tool, stats in self._stats.items():
+            if tool not in self._tool_decay and stats.total:
+                self._tool_decay[tool] = DecayedRate(
+                    stats.total, stats.success_count, stats.avg_confidence * stats.total, timestamp
+                )
+        for decay_map, outcomes in (
+            (self._task_type_decay, self._task_type_outcomes),
+            (self._intent_decay, self._intent_outcomes),
+        ):
+            for key, outcome in outcomes.items():
+                if key not in decay_map and outcome.total:
+                    decay_map[key] = DecayedRate(outcome.total, outcome.successes, 0.0, timestamp)
+
+
+def create_feedback_store(backend: str | None = None) -> Any:
+    """Create the feedback store selected by backend or ROUTER_FEEDBACK_BACKEND.
+
+    Args:
+        backend: "json" (default, FeedbackStore), "sqlite" (SQLiteFeedbackStore)
+            or "redis" (RedisFeedbackStore, shared between replicas)
+
+    Returns:
+        A store exposing the FeedbackStore API
+    """
+    backend = (backend or os.getenv(_BACKEND_ENV, "json")).lower()
+    if backend == "sqlite":
+        from tool_router.ai.sqlite_feedback import SQLiteFeedbackStore  # noqa: PLC0415 - avoids a circular import
+
+        return SQLiteFeedbackStore()
+    if backend == "redis":
+        from tool_router.ai.redis_feedback import RedisFeedbackStore  # noqa: PLC0415 - avoids a circular import
+
+        return RedisFeedbackStore()
+    if backend != "json":
+        logger.warning("Unknown feedback backend %r, using json", backend)
+    return FeedbackStore()
@@ -0,0 +1,185 @@
+"""Background feedback ingestion decoupled from request handling.
+
+Request handlers submit lightweight events to a bounded queue; a worker
+thread drains it in batches and applies each batch with one record_many()
+call, so classification, aggregate updates and persistence happen off the
+request path.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_QUEUE_SIZE = 10000
+_DEFAULT_BATCH_SIZE = 100
+_DEFAULT_FLUSH_INTERVAL = 0.5  # Seconds the worker waits for a batch to fill
+
+
+class FeedbackWriter:
+    """Apply feedback events to a store from a background thread.
+
+    When the queue is full new events are dropped (and counted) rather than
+    blocking the caller. Throughput and drop counters are exposed by get_stats().
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        max_queue_size: int = _DEFAULT_QUEUE_SIZE,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        flush_interval: float = _DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """Initialize the writer (call start() to begin processing).
+
+        Args:
+            store: Feedback store exposing record_many()
+            max_queue_size: Pending events kept before new ones are dropped
+            batch_size: Maximum events applied per record_many() call
+            flush_interval: Seconds to wait for more events before applying a partial batch
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._worker: threading.Thread | None = None
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._dropped = 0
+        self._written = 0
+        self._batches = 0
+        self._errors = 0
+
+    def submit(
+        self,
+        task: str,
+        selected_tool: str,
+        success: bool,
+        context: str = "",
+        confidence: float = 0.0,
+    ) -> bool:
+        """Enqueue a feedback event without blocking.
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        event = {
+            "task": task,
+            "selected_tool": selected_tool,
+            "success": success,
+            "context": context,
+            "confidence": confidence,
+        }
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            logger.debug("Feedback queue full, dropped event for %s", selected_tool)
+            return False
+
+        with self._stats_lock:
+            self._submitted += 1
+        return True
+
+    def start(self) -> None:
+        """Start the background worker."""
+        if self._worker is not None:
+            logger.warning("Feedback writer already running")
+            return
+
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._worker.start()
+        logger.info("Started background feedback writer")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker after applying every queued event."""
+        if self._worker is None:
+            return
+
+        self._stop_event.set()
+        self._worker.join(timeout=timeout)
+        self._worker = None
+        self._drain()  # Events submitted while the worker was shutting down
+        logger.info("Stopped background feedback writer")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until all queued events have been applied.
+
+        Without a running worker the queue is drained on the calling thread.
+
+        Returns:
+            True if the queue was fully drained within the timeout
+        """
+        if self._worker is None:
+            self._drain()
+            return True
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._apply(self._collect_batch(first))
+        self._drain()
+
+    def _collect_batch(self, first: dict[str, Any]) -> list[dict[str, Any]]:
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> None:
+        """Apply everything currently queued on the calling thread."""
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._apply(self._collect_batch(first))
+
+    def _apply(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            self.store.record_many(batch)
+        except Exception as exc:  # noqa: BLE001
+            with self._stats_lock:
+                self._errors += 1
+            logger.warning("Could not apply feedback batch of %d events: %s", len(batch), exc)
+        else:
+            with self._stats_lock:
+                self._written += len(batch)
+                self._batches += 1
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def get_stats(self) -> dict[str, int]:
+        """Return queue depth and throughput counters."""
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "submitted": self._submitted,
+                "written": self._written,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "errors": self._errors,
+            }
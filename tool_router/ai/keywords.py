@@ -0,0 +1,291 @@
+"""Single-pass keyword classification shared by the routing components.
+
+Every keyword rule set used to label tasks (feedback task type and intent,
+selector complexity, prompt task type, RAG query intent) is compiled into one
+regular expression. A task is scanned once to find all keywords it contains
+and every rule set is resolved from that match set; results are memoized per
+normalized task.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+_DEFAULT_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Keyword rules producing one label per task.
+
+    Labels are tried in order and the first one with a matching keyword wins;
+    with scored=True the label matching the most distinct keywords wins
+    instead (ties go to the earlier label). Keywords are lowercase and match
+    as substrings of the lowercased task.
+    """
+
+    name: str
+    rules: Mapping[str, Sequence[str]]
+    default: str
+    scored: bool = False
+
+
+TASK_TYPE_RULES = RuleSet(
+    "task_type",
+    {
+        "file_operations": ("file", "read", "write", "create", "delete", "open"),
+        "search_operations": ("search", "find", "lookup", "query"),
+        "code_operations": ("code", "edit", "modify", "refactor", "syntax"),
+        "database_operations": ("database", "db", "sql", "query", "table"),
+        "network_operations": ("http", "api", "request", "fetch", "web"),
+        "system_operations": ("system", "process", "command", "terminal", "shell"),
+    },
+    default="general_operations",
+)
+
+INTENT_RULES = RuleSet(
+    "intent",
+    {
+        "create": ("create", "make", "add", "new", "generate", "build"),
+        "read": ("read", "get", "fetch", "retrieve", "show", "display", "list"),
+        "update": ("update", "modify", "change", "edit", "alter", "adjust"),
+        "delete": ("delete", "remove", "destroy", "clear", "clean"),
+        "search": ("search", "find", "lookup", "query", "seek"),
+    },
+    default="unknown",
+)
+
+COMPLEXITY_RULES = RuleSet(
+    "complexity",
+    {
+        "simple": ("what is", "how to", "explain", "define"),
+        "complex": ("create", "generate", "build", "implement", "develop"),
+        "moderate": ("analyze", "optimize", "refactor", "debug", "test"),
+    },
+    default="unknown",
+)
+
+PROMPT_TASK_TYPE_RULES = RuleSet(
+    "prompt_task_type",
+    {
+        "code_generation": (
+            "create",
+            "generate",
+            "build",
+            "implement",
+            "write",
+            "develop",
+            "make",
+            "construct",
+            "design",
+            "code",
+            "function",
+            "class",
+            "component",
+        ),
+        "code_refactoring": (
+            "refactor",
+            "improve",
+            "optimize",
+            "clean up",
+            "restructure",
+            "reorganize",
+            "simplify",
+            "modernize",
+            "update",
+        ),
+        "code_debugging": (
+            "debug",
+            "fix",
+            "error",
+            "issue",
+            "problem",
+            "bug",
+            "broken",
+            "not working",
+            "fail",
+            "crash",
+            "exception",
+        ),
+        "code_analysis": (
+            "analyze",
+            "review",
+            "examine",
+            "inspect",
+            "check",
+            "audit",
+            "evaluate",
+            "assess",
+            "understand",
+            "explain",
+        ),
+        "documentation": (
+            "document",
+            "explain",
+            "describe",
+            "comment",
+            "readme",
+            "guide",
+            "manual",
+            "tutorial",
+            "instruction",
+            "help",
+        ),
+        "optimization": (
+            "optimize",
+            "improve performance",
+            "speed up",
+            "enhance",
+            "boost",
+            "make faster",
+            "reduce",
+            "minimize",
+            "streamline",
+        ),
+        "creative": (
+            "design",
+            "create",
+            "imagine",
+            "brainstorm",
+            "innovate",
+            "invent",
+            "conceptualize",
+            "visualize",
+            "artistic",
+            "creative",
+        ),
+    },
+    default="unknown",
+    scored=True,
+)
+
+RAG_INTENT_RULES = {
+    "ui_specialist": RuleSet(
+        "rag_intent:ui_specialist",
+        {
+            "implicit_fact": ("create", "generate", "build", "make"),
+            "interpretable_rationale": ("how to", "why", "what is", "explain"),
+            "hidden_rationale": ("fix", "debug", "error", "problem"),
+        },
+        default="explicit_fact",
+    ),
+    "prompt_architect": RuleSet(
+        "rag_intent:prompt_architect",
+        {
+            "interpretable_rationale": ("optimize", "improve", "enhance"),
+            "implicit_fact": ("template", "pattern", "structure"),
+            "hidden_rationale": ("technique", "method", "approach"),
+        },
+        default="explicit_fact",
+    ),
+    "router_specialist": RuleSet(
+        "rag_intent:router_specialist",
+        {
+            "interpretable_rationale": ("route", "assign", "delegate"),
+            "hidden_rationale": ("performance", "optimize", "speed"),
+            "implicit_fact": ("specialist", "agent", "service"),
+        },
+        default="explicit_fact",
+    ),
+}
+
+ROUTING_RULE_SETS = (
+    TASK_TYPE_RULES,
+    INTENT_RULES,
+    COMPLEXITY_RULES,
+    PROMPT_TASK_TYPE_RULES,
+    *RAG_INTENT_RULES.values(),
+)
+
+
+class KeywordClassifier:
+    """Resolve many keyword rule sets from a single scan of the text.
+
+    All keywords are compiled into one alternation inside a lookahead, longest
+    first, so the scan reports the longest keyword starting at each position;
+    shorter keywords starting there are its prefixes and are added from a
+    precomputed table. That yields exactly the keywords a substring test
+    would find, without rescanning the text per keyword.
+    """
+
+    def __init__(self, rule_sets: Sequence[RuleSet], cache_size: int = _DEFAULT_CACHE_SIZE) -> None:
+        """Compile the rule sets.
+
+        Args:
+            rule_sets: Rule sets to resolve; names must be unique
+            cache_size: Normalized texts whose results are memoized
+        """
+        self.rule_sets = {rule_set.name: rule_set for rule_set in rule_sets}
+        keywords = sorted(
+            {keyword for rule_set in rule_sets for words in rule_set.rules.values() for keyword in words},
+            key=lambda keyword: (-len(keyword), keyword),
+        )
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))") if keywords else None
+        self._prefixes = {
+            keyword: frozenset(other for other in keywords if keyword.startswith(other)) for keyword in keywords
+        }
+        self._classify_cached = functools.lru_cache(maxsize=cache_size)(self._classify_uncached)
+
+    def matches(self, text: str) -> frozenset[str]:
+        """Return every keyword contained in text (case-insensitive)."""
+        return self._classify_cached(text.lower())[0]
+
+    def classify(self, text: str) -> Mapping[str, str]:
+        """Return the label of every rule set for text, keyed by rule set name."""
+        return self._classify_cached(text.lower())[1]
+
+    def label(self, text: str, rule_set: str) -> str:
+        """Return the label one rule set assigns to text."""
+        return self.classify(text)[rule_set]
+
+    def scores(self, text: str, rule_set: str) -> dict[str, int]:
+        """Return the number of distinct matching keywords per label (labels without matches omitted)."""
+        found = self.matches(text)
+        counts = {}
+        for label, words in self.rule_sets[rule_set].rules.items():
+            count = sum(1 for word in words if word in found)
+            if count:
+                counts[label] = count
+        return counts
+
+    def cache_info(self) -> functools._CacheInfo:
+        """Return memoization statistics."""
+        return self._classify_cached.cache_info()
+
+    def _classify_uncached(self, text: str) -> tuple[frozenset[str], Mapping[str, str]]:
+        found: set[str] = set()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                found |= self._prefixes[match.group(1)]
+        labels = {name: self._resolve(rule_set, found) for name, rule_set in self.rule_sets.items()}
+        return frozenset(found), MappingProxyType(labels)
+
+    @staticmethod
+    def _resolve(rule_set: RuleSet, found: set[str]) -> str:
+        if not rule_set.scored:
+            for label, words in rule_set.rules.items():
+                if any(word in found for word in words):
+                    return label
+            return rule_set.default
+
+        best_label, best_count = rule_set.default, 0
+        for label, words in rule_set.rules.items():
+            count = sum(1 for word in words if word in found)
+            if count > best_count:
+                best_label, best_count = label, count
+        return best_label
+
+
+@functools.lru_cache(maxsize=1)
+def get_task_classifier() -> KeywordClassifier:
+    """Get or create the shared routing classifier (singleton).
+
+    Returns:
+        KeywordClassifier compiled from ROUTING_RULE_SETS
+    """
+    return KeywordClassifier(ROUTING_RULE_SETS)
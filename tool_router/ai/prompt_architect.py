@@ -8,6 +8,9 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
+from tool_router.ai.keywords import PROMPT_TASK_TYPE_RULES, get_task_classifier
+from tool_router.ai.tokens import get_token_counter
+
 
 logger = logging.getLogger(__name__)
 
@@ -67,110 +70,13 @@ class TaskAnalyzer:
 
     def __init__(self) -> None:
         self.task_keywords = {
-            TaskType.CODE_GENERATION: [
-                "create",
-                "generate",
-                "build",
-                "implement",
-                "write",
-                "develop",
-                "make",
-                "construct",
-                "design",
-                "code",
-                "function",
-                "class",
-                "component",
-            ],
-            TaskType.CODE_REFACTORING: [
-                "refactor",
-                "improve",
-                "optimize",
-                "clean up",
-                "restructure",
-                "reorganize",
-                "simplify",
-                "modernize",
-                "update",
-            ],
-            TaskType.CODE_DEBUGGING: [
-                "debug",
-                "fix",
-                "error",
-                "issue",
-                "problem",
-                "bug",
-                "broken",
-                "not working",
-                "fail",
-                "crash",
-                "exception",
-            ],
-            TaskType.CODE_ANALYSIS: [
-                "analyze",
-                "review",
-                "examine",
-                "inspect",
-                "check",
-                "audit",
-                "evaluate",
-                "assess",
-                "understand",
-                "explain",
-            ],
-            TaskType.DOCUMENTATION: [
-                "document",
-                "explain",
-                "describe",
-                "comment",
-                "readme",
-                "guide",
-                "manual",
-                "tutorial",
-                "instruction",
-                "help",
-            ],
-            TaskType.OPTIMIZATION: [
-                "optimize",
-                "improve performance",
-                "speed up",
-                "enhance",
-                "boost",
-                "make faster",
-                "reduce",
-                "minimize",
-                "streamline",
-            ],
-            TaskType.CREATIVE: [
-                "design",
-                "create",
-                "imagine",
-                "brainstorm",
-                "innovate",
-                "invent",
-                "conceptualize",
-                "visualize",
-                "artistic",
-                "creative",
-            ],
+            TaskType(label): list(keywords) for label, keywords in PROMPT_TASK_TYPE_RULES.rules.items()
         }
 
     def identify_task_type(self, prompt: str) -> TaskType:
         """Identify the primary task type from a prompt."""
-        prompt_lower = prompt.lower()
-
-        # Score each task type based on keyword matches
-        task_scores = {}
-        for task_type, keywords in self.task_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in prompt_lower)
-            if score > 0:
-                task_scores[task_type] = score
-
-        if not task_scores:
-            return TaskType.UNKNOWN
-
-        # Return the task type with the highest score
-        return max(task_scores, key=task_scores.get)
+        # The label with the most keyword matches wins
+        return TaskType(get_task_classifier().label(prompt, PROMPT_TASK_TYPE_RULES.name))
 
     def extract_requirements(self, prompt: str, task_type: TaskType) -> list[Requirement]:
         """Extract specific requirements from the prompt."""
@@ -692,8 +598,7 @@ class PromptArchitect:
 
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count for text."""
-        # Rough estimation: ~1.3 tokens per word
-        return int(len(text.split()) * 1.3)
+        return get_token_counter().count(text)
 
     def _calculate_cost_savings(self, original_tokens: int, optimized_tokens: int) -> float:
         """Calculate cost savings from token reduction."""
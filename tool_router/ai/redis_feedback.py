@@ -0,0 +1,422 @@
+"""Redis-backed feedback store shared by every router replica.
+
+Counters live in Redis hashes updated with atomic increments, and every
+outcome is also appended to a Redis stream. Each replica keeps a local
+FeedbackStore-shaped mirror that serves all reads; it applies its own
+writes immediately and periodically applies the other replicas' events
+read from the stream since its last merge.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+from tool_router.ai.feedback import (
+    _MAX_ENTRIES,
+    _RECENT_WINDOW,
+    FeedbackEntry,
+    FeedbackStore,
+    OutcomeCounter,
+    TaskPattern,
+    ToolStats,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_REDIS_URL_ENV = "ROUTER_FEEDBACK_REDIS_URL"
+_DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+_DEFAULT_KEY_PREFIX = "tool_router:feedback:"
+_DEFAULT_MAX_EVENTS = 10000  # Approximate stream length kept in Redis
+_DEFAULT_SYNC_INTERVAL = 5  # Seconds between merges of the shared state
+_DEFAULT_SYNC_BATCH = 1000  # Stream events read per round trip when merging
+_APPLIED_TTL = 86400  # Seconds a replica's applied sequence number outlives its last write
+_SEP = "\x1f"  # Field separator inside hash keys (never appears in tool names)
+
+
+@dataclass
+class _PendingEvent:
+    """An outcome applied locally but not yet confirmed by Redis."""
+
+    event_id: str
+    entry: FeedbackEntry
+
+    @property
+    def seq(self) -> int:
+        """Per-replica sequence number encoded in the event id."""
+        return int(self.event_id.rsplit(":", 1)[1])
+
+
+class RedisFeedbackStore(FeedbackStore):
+    """Feedback store whose learning is shared between processes through Redis.
+
+    Writes are idempotent: each replica numbers its events and stores the
+    highest number sent in the same MULTI/EXEC transaction as the counter
+    increments, so a retried batch never counts an outcome twice. Events
+    that cannot be sent are kept in a bounded local buffer and retried on
+    the next write or merge.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        redis_url: str | None = None,
+        key_prefix: str = _DEFAULT_KEY_PREFIX,
+        max_entries: int = _MAX_ENTRIES,
+        max_events: int = _DEFAULT_MAX_EVENTS,
+        sync_interval: int = _DEFAULT_SYNC_INTERVAL,
+        half_life: float | None = None,
+    ) -> None:
+        """Connect to Redis and load the shared state.
+
+        Args:
+            client: Redis client created with decode_responses=True (built from redis_url if omitted)
+            redis_url: Connection URL (defaults to ROUTER_FEEDBACK_REDIS_URL)
+            key_prefix: Namespace for all feedback keys
+            max_entries: Recent entries mirrored locally for similarity and training
+            max_events: Approximate number of events kept in the Redis stream
+            sync_interval: Seconds between background merges (see start_compaction)
+            half_life: Seconds for an outcome's influence on boosts to halve
+        """
+        self.key_prefix = key_prefix
+        self.max_events = max_events
+        self.sync_interval = sync_interval
+        self._instance_id = uuid.uuid4().hex
+        self._pending: deque[_PendingEvent] = deque(maxlen=max_events)
+        self._buffer_full_warned = False
+        # Stream id of the newest event merged into the mirror (None until the first full load)
+        self._last_event_id: str | None = None
+        self._flush_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # Keeps concurrent merges from applying an event twice
+        self._client = client if client is not None else self._connect(redis_url)
+        super().__init__(max_entries=max_entries, half_life=half_life)
+
+    @staticmethod
+    def _connect(redis_url: str | None) -> Any:
+        if not REDIS_AVAILABLE:
+            logger.warning("redis package not installed, feedback will not be shared")
+            return None
+        try:
+            client = redis.from_url(redis_url or os.getenv(_REDIS_URL_ENV, _DEFAULT_REDIS_URL), decode_responses=True)
+            client.ping()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not connect to Redis for shared feedback: %s", exc)
+            return None
+        return client
+
+    def _key(self, name: str) -> str:
+        return f"{self.key_prefix}{name}"
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _commit(self, entries: list[FeedbackEntry]) -> None:
+        """Apply entries locally, then send them to Redis outside the store lock."""
+        super()._commit(entries)
+        self._flush_pending()
+
+    def _append_to_log(self, records: list[tuple[FeedbackEntry, int]]) -> None:
+        """Queue locally applied entries for Redis (caller holds the lock)."""
+        if self._client is None:
+            return  # Nothing will ever send them
+        if len(self._pending) + len(records) > self._pending.maxlen and not self._buffer_full_warned:
+            logger.warning("Shared feedback buffer full, dropping oldest unsent events")
+            self._buffer_full_warned = True
+        for entry, seq in records:
+            self._pending.append(_PendingEvent(f"{self._instance_id}:{seq}", entry))
+
+    def _flush_pending(self) -> bool:
+        """Send buffered events to Redis in one idempotent transaction.
+
+        The buffer is copied under the store lock; the round trip runs without
+        it so readers and writers are not blocked on Redis.
+
+        Returns:
+            True if nothing is left to send
+        """
+        if self._client is None:
+            return not self._pending
+        if not self._flush_lock.acquire(blocking=False):
+            return False  # Another thread is already sending
+        try:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return True
+            applied_key = self._key(f"applied:{self._instance_id}")
+
+            def apply(pipe: Any) -> None:
+                applied_seq = int(pipe.get(applied_key) or 0)
+                pipe.multi()
+                for event in batch:
+                    if event.seq > applied_seq:
+                        self._queue_event(pipe, event)
+                pipe.set(applied_key, max(applied_seq, batch[-1].seq), ex=_APPLIED_TTL)
+
+            self._client.transaction(apply, applied_key)
+            sent = {event.event_id for event in batch}
+            with self._lock:
+                # Events queued meanwhile stay; overflow may already have dropped some sent ones
+                while self._pending and self._pending[0].event_id in sent:
+                    self._pending.popleft()
+                if not self._pending:
+                    self._buffer_full_warned = False
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not send %d feedback events to Redis: %s", len(self._pending), exc)
+            return False
+        finally:
+            self._flush_lock.release()
+        return not self._pending
+
+    def _queue_event(self, pipe: Any, event: _PendingEvent) -> None:
+        """Add one event's counter updates and stream append to a MULTI pipeline."""
+        entry = event.entry
+        tool = entry.selected_tool
+        succeeded = int(entry.success)
+        tool_field = f"{tool}{_SEP}"
+        task_type_field = f"{entry.task_type}{_SEP}{tool}{_SEP}"
+        intent_field = f"{tool}{_SEP}{entry.intent_category}{_SEP}"
+
+        pipe.hincrby(self._key("tools"), tool_field + ("s" if succeeded else "f"), 1)
+        pipe.hincrbyfloat(self._key("tools"), tool_field + "c", entry.confidence)
+        pipe.hincrby(self._key("task_types"), task_type_field + "s", succeeded)
+        pipe.hincrby(self._key("task_types"), task_type_field + "n", 1)
+        pipe.hincrbyfloat(self._key("task_types"), task_type_field + "c", entry.confidence)
+        pipe.hincrby(self._key("intents"), intent_field + "s", succeeded)
+        pipe.hincrby(self._key("intents"), intent_field + "n", 1)
+        if entry.entities:
+            pipe.zadd(
+                self._key("entities"),
+                {f"{entry.task_type}{_SEP}{entity}": entry.timestamp for entity in entry.entities},
+                nx=True,
+            )
+        pipe.xadd(
+            self._key("events"),
+            {
+                "id": event.event_id,
+                "task": entry.task,
+                "tool": tool,
+                "success": succeeded,
+                "timestamp": entry.timestamp,
+                "context": entry.context,
+                "confidence": entry.confidence,
+                "task_type": entry.task_type,
+                "intent": entry.intent_category,
+                "entities": json.dumps(entry.entities),
+            },
+            maxlen=self.max_events,
+            approximate=True,
+        )
+
+    # ------------------------------------------------------------------
+    # Merging shared state
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Merge the other replicas' new events from Redis into the local mirror (best-effort).
+
+        Only stream events after the last merged one are applied. The mirror is
+        rebuilt from the shared counters on the first load, and again whenever
+        the stream was trimmed past that offset.
+        """
+        if self._client is None:
+            return
+        self._flush_pending()
+        with self._refresh_lock:
+            try:
+                events = self._read_new_events()
+                if events is None:
+                    self._reload()
+                    return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Could not merge shared feedback from Redis: %s", exc)
+                return
+
+            own_prefix = f"{self._instance_id}:"
+            with self._lock:
+                for _, fields in events:
+                    if fields["id"].startswith(own_prefix):
+                        continue  # Applied locally when it was recorded
+                    entry = self._entry_from_event(fields)
+                    self._append_entry(entry)
+                    self._apply_entry(entry)
+            if events:
+                self._last_event_id = events[-1][0]
+        logger.debug("Merged %d shared feedback events", len(events))
+
+    def _read_new_events(self) -> list[tuple[str, dict[str, str]]] | None:
+        """Read the stream after the last merged event, oldest first.
+
+        Returns:
+            The new events, or None if the mirror has to be rebuilt instead
+        """
+        if self._last_event_id is None:
+            return None
+        # The inclusive start returns the last merged event first unless it was trimmed away
+        events = self._client.xrange(self._key("events"), min=self._last_event_id, count=_DEFAULT_SYNC_BATCH)
+        if not events or events[0][0] != self._last_event_id:
+            return None
+        new_events = events[1:]
+        while len(events) == _DEFAULT_SYNC_BATCH:
+            events = self._client.xrange(self._key("events"), min=f"({events[-1][0]}", count=_DEFAULT_SYNC_BATCH)
+            new_events.extend(events)
+        return new_events
+
+    def _reload(self) -> None:
+        """Replace the local mirror with the shared state from Redis."""
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hgetall(self._key("tools"))
+        pipe.hgetall(self._key("task_types"))
+        pipe.hgetall(self._key("intents"))
+        pipe.zrange(self._key("entities"), 0, -1)
+        pipe.xrevrange(self._key("events"), count=self._entries.maxlen)
+        tools, task_types, intents, entities, events = pipe.execute()
+
+        with self._lock:
+            self._rebuild(tools, task_types, intents, entities, events)
+            # Outcomes not yet accepted by Redis stay visible locally
+            for event in self._pending:
+                self._append_entry(event.entry)
+                self._apply_entry(event.entry)
+        self._last_event_id = events[0][0] if events else None
+        logger.debug("Loaded shared feedback for %d tools", len(self._stats))
+
+    def _rebuild(
+        self,
+        tools: dict[str, str],
+        task_types: dict[str, str],
+        intents: dict[str, str],
+        entities: list[str],
+        events: list[tuple[str, dict[str, str]]],
+    ) -> None:
+        """Rebuild every local aggregate from Redis data (caller holds the lock)."""
+        self._clear_entries()
+        self._reset_aggregates()
+        self._stats = {}
+        self._patterns = {}
+
+        tool_counts: dict[str, dict[str, float]] = {}
+        for field, value in tools.items():
+            tool, kind = field.rsplit(_SEP, 1)
+            tool_counts.setdefault(tool, {})[kind] = float(value)
+        for tool, counts in tool_counts.items():
+            stats = ToolStats(tool, success_count=int(counts.get("s", 0)), failure_count=int(counts.get("f", 0)))
+            stats.avg_confidence = counts.get("c", 0.0) / stats.total if stats.total else 0.0
+            self._stats[tool] = stats
+
+        task_type_counts: dict[tuple[str, str], dict[str, float]] = {}
+        for field, value in task_types.items():
+            task_type, tool, kind = field.split(_SEP)
+            task_type_counts.setdefault((task_type, tool), {})[kind] = float(value)
+        for (task_type, tool), counts in task_type_counts.items():
+            outcome = OutcomeCounter(int(counts.get("s", 0)), int(counts.get("n", 0)))
+            self._task_type_outcomes[(task_type, tool)] = outcome
+            pattern = self._patterns.setdefault(task_type, TaskPattern(task_type))
+            pattern.preferred_tools[tool] = outcome.success_rate
+            pattern.avg_confidence += counts.get("c", 0.0)  # Summed here, divided below
+            pattern.total_occurrences += outcome.total
+            if tool in self._stats:
+                self._stats[tool].task_types[task_type] = outcome.total
+        for pattern in self._patterns.values():
+            if pattern.total_occurrences:
+                pattern.avg_confidence /= pattern.total_occurrences
+
+        for field, value in intents.items():
+            tool, intent, kind = field.split(_SEP)
+            outcome = self._intent_outcomes.setdefault((tool, intent), OutcomeCounter())
+            if kind == "s":
+                outcome.successes = int(value)
+            else:
+                outcome.total = int(value)
+                if tool in self._stats:
+                    self._stats[tool].intent_categories[intent] = outcome.total
+
+        for member in entities:
+            task_type, entity = member.split(_SEP, 1)
+            if task_type in self._patterns:
+                self._patterns[task_type].common_entities.append(entity)
+                self._pattern_entities.setdefault(task_type, set()).add(entity)
+
+        # Events arrive newest first; the local history and recent window want oldest first
+        recent = [self._entry_from_event(fields) for _, fields in reversed(events)]
+        for entry in recent:
+            self._append_entry(entry)
+            self._apply_decay(entry)
+        # Keys with no events left in the stream fall back to their all-time counts
+        self._seed_decay_from_counts(recent[0].timestamp if recent else time.time())
+        for entry in recent[-_RECENT_WINDOW:]:
+            self._push_recent(entry.selected_tool, entry.success)
+        for tool, stats in self._stats.items():
+            window = self._recent_outcomes.get(tool)
+            stats.recent_success_rate = window.success_rate if window else 0.5
+
+    @staticmethod
+    def _entry_from_event(fields: dict[str, str]) -> FeedbackEntry:
+        return FeedbackEntry(
+            task=fields["task"],
+            selected_tool=fields["tool"],
+            success=fields["success"] == "1",
+            timestamp=float(fields["timestamp"]),
+            context=fields.get("context", ""),
+            confidence=float(fields.get("confidence", 0.0)),
+            task_type=fields.get("task_type", ""),
+            intent_category=fields.get("intent", ""),
+            entities=json.loads(fields.get("entities", "[]")),
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle (replaces the file-based persistence of FeedbackStore)
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Load the shared state on startup."""
+        self.refresh()
+
+    def _persist(self) -> None:
+        """Send pending events and merge the shared state."""
+        self.refresh()
+
+    def start_compaction(self, interval: int | None = None) -> None:
+        """Start periodically merging the shared state from Redis.
+
+        Args:
+            interval: Seconds between merges (defaults to sync_interval)
+        """
+        if self._compaction_thread is not None:
+            logger.warning("Shared feedback sync already running")
+            return
+
+        interval = interval or self.sync_interval
+        self._compaction_stop.clear()
+
+        def sync_loop() -> None:
+            while not self._compaction_stop.wait(interval):
+                self.refresh()
+
+        self._compaction_thread = threading.Thread(target=sync_loop, name="feedback-sync", daemon=True)
+        self._compaction_thread.start()
+        logger.info("Started shared feedback sync (interval: %ds)", interval)
+
+    def close(self) -> None:
+        """Stop syncing and make a final attempt to send pending events."""
+        self.stop_compaction()
+        if not self._flush_pending():
+            logger.warning("%d feedback events were not sent to Redis", len(self._pending))
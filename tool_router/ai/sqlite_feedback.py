@@ -0,0 +1,560 @@
+"""SQLite-backed feedback store with indexed analytics queries.
+
+Drop-in alternative to FeedbackStore for deployments that want to keep long
+routing histories. Raw entries live in an indexed table; boosts and insights
+are read from rollup tables that are updated in the same transaction as each
+insert, so lookups never scan the history and nothing is loaded at startup.
+Boosts use time-decayed rollups with the same half-life as FeedbackStore, so
+both backends rank tools alike for the same feedback.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from tempfile import gettempdir
+from types import MappingProxyType
+from typing import Any
+
+from tool_router.ai.feedback import (
+    _DEFAULT_HALF_LIFE,
+    _HALF_LIFE_ENV,
+    _RECENT_WINDOW,
+    DecayedRate,
+    TaskPattern,
+    ToolStats,
+    classify_intent,
+    classify_task_type,
+    extract_entities,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_DB_FILE_ENV = "ROUTER_FEEDBACK_DB"
+_DEFAULT_DB_FILE = str(Path(gettempdir()) / "tool_router_feedback.db")
+_SIMILARITY_WINDOW = 1000  # Most recent successful entries considered by similar_task_tools
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    selected_tool TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    context TEXT NOT NULL DEFAULT '',
+    confidence REAL NOT NULL DEFAULT 0.0,
+    task_type TEXT NOT NULL,
+    intent_category TEXT NOT NULL,
+    entities TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_tool ON feedback_entries(selected_tool);
+CREATE INDEX IF NOT EXISTS idx_feedback_task_type_tool ON feedback_entries(task_type, selected_tool);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback_entries(timestamp);
+
+CREATE TABLE IF NOT EXISTS tool_rollup (
+    tool TEXT PRIMARY KEY,
+    successes INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_type_rollup (
+    task_type TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    successes INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (task_type, tool)
+);
+CREATE TABLE IF NOT EXISTS intent_rollup (
+    tool TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    successes INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (tool, intent)
+);
+CREATE TABLE IF NOT EXISTS decayed_rollup (
+    scope TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    label TEXT NOT NULL,
+    weight REAL NOT NULL,
+    successes REAL NOT NULL,
+    confidence REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (scope, tool, label)
+);
+CREATE TABLE IF NOT EXISTS pattern_entities (
+    task_type TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    PRIMARY KEY (task_type, entity)
+);
+"""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared form on every call.
+_INSERT_ENTRY = """
+INSERT INTO feedback_entries
+    (task, selected_tool, success, timestamp, context, confidence, task_type, intent_category, entities)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_UPSERT_TOOL = """
+INSERT INTO tool_rollup (tool, successes, failures, confidence_sum) VALUES (?, ?, ?, ?)
+ON CONFLICT(tool) DO UPDATE SET
+    successes = successes + excluded.successes,
+    failures = failures + excluded.failures,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+_UPSERT_TASK_TYPE = """
+INSERT INTO task_type_rollup (task_type, tool, successes, total, confidence_sum) VALUES (?, ?, ?, 1, ?)
+ON CONFLICT(task_type, tool) DO UPDATE SET
+    successes = successes + excluded.successes,
+    total = total + 1,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+_UPSERT_INTENT = """
+INSERT INTO intent_rollup (tool, intent, successes, total) VALUES (?, ?, ?, 1)
+ON CONFLICT(tool, intent) DO UPDATE SET successes = successes + excluded.successes, total = total + 1
+"""
+_INSERT_ENTITY = "INSERT OR IGNORE INTO pattern_entities (task_type, entity) VALUES (?, ?)"
+_SELECT_DECAYED = """
+SELECT weight, successes, confidence, updated_at FROM decayed_rollup WHERE scope = ? AND tool = ? AND label = ?
+"""
+_UPSERT_DECAYED = """
+INSERT OR REPLACE INTO decayed_rollup (scope, tool, label, weight, successes, confidence, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+# Rollups that predate the decayed table count as if they all happened at open time
+_SEED_DECAYED = """
+INSERT OR IGNORE INTO decayed_rollup
+SELECT 'tool', tool, '', successes + failures, successes, confidence_sum, :now FROM tool_rollup;
+INSERT OR IGNORE INTO decayed_rollup
+SELECT 'task_type', tool, task_type, total, successes, confidence_sum, :now FROM task_type_rollup;
+INSERT OR IGNORE INTO decayed_rollup
+SELECT 'intent', tool, intent, total, successes, 0.0, :now FROM intent_rollup;
+"""
+
+_SELECT_TOOL = "SELECT successes, failures, confidence_sum FROM tool_rollup WHERE tool = ?"
+_SELECT_TOOLS = "SELECT tool FROM tool_rollup"
+_SELECT_TOOL_TASK_TYPES = "SELECT task_type, total FROM task_type_rollup WHERE tool = ?"
+_SELECT_TOOL_INTENTS = "SELECT intent, total FROM intent_rollup WHERE tool = ?"
+_SELECT_RECENT = """
+SELECT COALESCE(SUM(success), 0), COUNT(*)
+FROM (SELECT selected_tool, success FROM feedback_entries ORDER BY id DESC LIMIT ?)
+WHERE selected_tool = ?
+"""
+_SELECT_PATTERN = "SELECT tool, successes, total, confidence_sum FROM task_type_rollup WHERE task_type = ?"
+_SELECT_PATTERN_ENTITIES = "SELECT entity FROM pattern_entities WHERE task_type = ? ORDER BY rowid"
+_SELECT_TRAINING = """
+SELECT task, selected_tool, timestamp FROM feedback_entries
+WHERE success = 1 AND timestamp > ? ORDER BY timestamp
+"""
+_SELECT_RECENT_SUCCESSES = "SELECT task, selected_tool FROM feedback_entries WHERE success = 1 ORDER BY id DESC LIMIT ?"
+_DELETE_OLDER_THAN = "DELETE FROM feedback_entries WHERE timestamp < ?"
+
+
+class SQLiteFeedbackStore:
+    """Feedback store persisted in SQLite, exposing the FeedbackStore API.
+
+    Uses a single WAL-mode connection shared across threads behind a lock.
+    Raw entries can be pruned with prune() without affecting the rollups the
+    boosts are computed from; start_compaction() does so periodically and
+    checkpoints the WAL.
+    """
+
+    def __init__(
+        self, db_file: str | None = None, retention_days: float | None = None, half_life: float | None = None
+    ) -> None:
+        """Open (and create if needed) the feedback database.
+
+        Args:
+            db_file: Database path (defaults to ROUTER_FEEDBACK_DB or the temp dir)
+            retention_days: If set, raw entries older than this are pruned on open
+                and by background compaction
+            half_life: Seconds for an outcome's influence on boosts to halve
+                (defaults to ROUTER_FEEDBACK_HALF_LIFE or one day)
+        """
+        self.half_life = half_life or float(os.getenv(_HALF_LIFE_ENV, str(_DEFAULT_HALF_LIFE)))
+        self._file = Path(db_file or os.getenv(_DB_FILE_ENV, _DEFAULT_DB_FILE))
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        for statement in _SEED_DECAYED.split(";"):
+            if statement.strip():
+                self._conn.execute(statement, {"now": time.time()})
+        # Comprehensive boosts per (task_type, intent) class, dropped on every write
+        self._boost_tables: dict[tuple[str, str], dict[str, float]] = {}
+        self._generation = 0
+        self.retention_days = retention_days
+        self._compaction_thread: threading.Thread | None = None
+        self._compaction_stop = threading.Event()
+        if retention_days is not None:
+            self.prune(retention_days)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        task: str,
+        selected_tool: str,
+        success: bool,
+        context: str = "",
+        confidence: float = 0.0,
+    ) -> None:
+        """Record the outcome of a tool selection and update the rollups."""
+        self.record_many(
+            [
+                {
+                    "task": task,
+                    "selected_tool": selected_tool,
+                    "success": success,
+                    "context": context,
+                    "confidence": confidence,
+                }
+            ]
+        )
+
+    def record_many(self, events: list[dict[str, Any]]) -> None:
+        """Record a batch of outcomes in a single transaction.
+
+        Args:
+            events: Keyword arguments for record(), one dict per outcome
+        """
+        rows = [self._classify_event(**event) for event in events]
+        if not rows:
+            return
+
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    for row in rows:
+                        self._insert(*row)
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+                self._invalidate_boost_tables()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not record feedback: %s", exc)
+            return
+
+        logger.debug("Feedback recorded in SQLite: %d entries", len(rows))
+
+    @staticmethod
+    def _classify_event(
+        task: str,
+        selected_tool: str,
+        success: bool,
+        context: str = "",
+        confidence: float = 0.0,
+    ) -> tuple[Any, ...]:
+        """Classify a task into the column values for one entry."""
+        return (
+            task,
+            selected_tool,
+            int(success),
+            time.time(),
+            context,
+            confidence,
+            classify_task_type(task),
+            classify_intent(task),
+            extract_entities(task),
+        )
+
+    def _insert(
+        self,
+        task: str,
+        selected_tool: str,
+        succeeded: int,
+        timestamp: float,
+        context: str,
+        confidence: float,
+        task_type: str,
+        intent_category: str,
+        entities: list[str],
+    ) -> None:
+        """Insert one entry and update the rollups (caller holds the lock inside a transaction)."""
+        self._conn.execute(
+            _INSERT_ENTRY,
+            (
+                task,
+                selected_tool,
+                succeeded,
+                timestamp,
+                context,
+                confidence,
+                task_type,
+                intent_category,
+                json.dumps(entities),
+            ),
+        )
+        self._conn.execute(_UPSERT_TOOL, (selected_tool, succeeded, 1 - succeeded, confidence))
+        self._conn.execute(_UPSERT_TASK_TYPE, (task_type, selected_tool, succeeded, confidence))
+        self._conn.execute(_UPSERT_INTENT, (selected_tool, intent_category, succeeded))
+        for scope, label in (("tool", ""), ("task_type", task_type), ("intent", intent_category)):
+            row = self._conn.execute(_SELECT_DECAYED, (scope, selected_tool, label)).fetchone()
+            rate = DecayedRate(*row) if row else DecayedRate()
+            rate.add(bool(succeeded), confidence, timestamp, self.half_life)
+            self._conn.execute(
+                _UPSERT_DECAYED,
+                (scope, selected_tool, label, rate.weight, rate.successes, rate.confidence, rate.updated_at),
+            )
+        self._conn.executemany(_INSERT_ENTITY, [(task_type, entity) for entity in entities])
+
+    def _query(self, sql: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_stats(self, tool_name: str) -> ToolStats | None:
+        """Return aggregated stats for a tool, or None if no data."""
+        rows = self._query(_SELECT_TOOL, (tool_name,))
+        if not rows:
+            return None
+        successes, failures, confidence_sum = rows[0]
+        recent_successes, recent_total = self._query(_SELECT_RECENT, (_RECENT_WINDOW, tool_name))[0]
+        total = successes + failures
+        return ToolStats(
+            tool_name=tool_name,
+            success_count=successes,
+            failure_count=failures,
+            avg_confidence=confidence_sum / total if total else 0.0,
+            task_types=dict(self._query(_SELECT_TOOL_TASK_TYPES, (tool_name,))),
+            intent_categories=dict(self._query(_SELECT_TOOL_INTENTS, (tool_name,))),
+            recent_success_rate=recent_successes / recent_total if recent_total else 0.5,
+        )
+
+    def get_all_stats(self) -> dict[str, ToolStats]:
+        """Return stats for all tools that have received feedback."""
+        stats = {}
+        for (tool_name,) in self._query(_SELECT_TOOLS):
+            tool_stats = self.get_stats(tool_name)
+            if tool_stats is not None:
+                stats[tool_name] = tool_stats
+        return stats
+
+    def _decayed(self, scope: str, tool_name: str, label: str = "") -> DecayedRate | None:
+        rows = self._query(_SELECT_DECAYED, (scope, tool_name, label))
+        return DecayedRate(*rows[0]) if rows else None
+
+    def get_boost(self, tool_name: str) -> float:
+        """Return a score multiplier based on time-decayed historical performance."""
+        stats = self.get_stats(tool_name)
+        if stats is None or stats.total < 3:
+            return 1.0  # not enough data
+
+        decayed = self._decayed("tool", tool_name) or DecayedRate()
+        base_boost = 0.5 + decayed.success_rate
+        confidence_boost = 0.0
+        recent_boost = 0.0
+        if stats.success_count > 0:
+            confidence_boost = (decayed.avg_confidence - 0.5) * 0.3
+            recent_boost = (stats.recent_success_rate - 0.5) * 0.2
+
+        return max(0.1, min(1.7, base_boost + confidence_boost + recent_boost))
+
+    def get_task_type_boost(self, tool_name: str, task_type: str) -> float:
+        """Get boost based on time-decayed task type performance."""
+        decayed = self._decayed("task_type", tool_name, task_type)
+        if decayed is None:
+            return 1.0
+        return 0.7 + decayed.success_rate * 0.6  # Range: 0.7 to 1.3
+
+    def get_intent_boost(self, tool_name: str, intent_category: str) -> float:
+        """Get boost based on time-decayed intent category performance."""
+        decayed = self._decayed("intent", tool_name, intent_category)
+        if decayed is None:
+            return 1.0
+        return 0.8 + decayed.success_rate * 0.4  # Range: 0.8 to 1.2
+
+    def get_comprehensive_boost(self, tool_name: str, task: str) -> float:
+        """Get comprehensive boost considering all factors."""
+        task_type = classify_task_type(task)
+        intent_category = classify_intent(task)
+        return self._combine_boosts(tool_name, task_type, intent_category)
+
+    def _combine_boosts(self, tool_name: str, task_type: str, intent_category: str) -> float:
+        return (
+            self.get_boost(tool_name) * 0.5
+            + self.get_task_type_boost(tool_name, task_type) * 0.3
+            + self.get_intent_boost(tool_name, intent_category) * 0.2
+        )
+
+    def get_boost_table(self, task: str) -> Mapping[str, float]:
+        """Return comprehensive boosts for every tool with feedback, for one task.
+
+        Tables are built from the rollups once per (task_type, intent) class
+        and reused until the next write. Tools missing from the table have a
+        neutral boost of 1.0.
+        """
+        key = (
+            classify_task_type(task),
+            classify_intent(task),
+        )
+        table = self._boost_tables.get(key)
+        if table is None:
+            generation = self._generation
+            table = {tool: self._combine_boosts(tool, *key) for (tool,) in self._query(_SELECT_TOOLS)}
+            with self._lock:
+                if generation == self._generation:  # Don't cache a table that raced a write
+                    self._boost_tables[key] = table
+        return MappingProxyType(table)
+
+    def _invalidate_boost_tables(self) -> None:
+        """Drop the materialized boost tables (caller holds the lock)."""
+        self._generation += 1
+        self._boost_tables.clear()
+
+    def get_pattern(self, task_type: str) -> TaskPattern | None:
+        """Return the learned pattern for a task type, or None if unseen."""
+        rows = self._query(_SELECT_PATTERN, (task_type,))
+        if not rows:
+            return None
+        occurrences = sum(total for _, _, total, _ in rows)
+        return TaskPattern(
+            task_type=task_type,
+            preferred_tools={tool: successes / total for tool, successes, total, _ in rows},
+            common_entities=[entity for (entity,) in self._query(_SELECT_PATTERN_ENTITIES, (task_type,))],
+            avg_confidence=sum(confidence_sum for *_, confidence_sum in rows) / occurrences,
+            total_occurrences=occurrences,
+        )
+
+    def get_learning_insights(self, task: str) -> dict[str, Any]:
+        """Get learning insights for a given task."""
+        task_type = classify_task_type(task)
+        insights: dict[str, Any] = {
+            "task_type": task_type,
+            "intent_category": classify_intent(task),
+            "entities": extract_entities(task),
+            "pattern": None,
+            "recommended_tools": [],
+            "confidence_factors": {},
+        }
+
+        pattern = self.get_pattern(task_type)
+        if pattern:
+            insights["pattern"] = {
+                "total_occurrences": pattern.total_occurrences,
+                "avg_confidence": pattern.avg_confidence,
+                "common_entities": pattern.common_entities,
+            }
+            sorted_tools = sorted(pattern.preferred_tools.items(), key=lambda x: x[1], reverse=True)
+            insights["recommended_tools"] = [{"tool": tool, "success_rate": rate} for tool, rate in sorted_tools[:3]]
+
+        return insights
+
+    def get_adaptive_hints(self, task: str) -> list[str]:
+        """Generate adaptive hints based on learning."""
+        insights = self.get_learning_insights(task)
+        task_type = insights["task_type"]
+        hints = []
+
+        if insights["pattern"]:
+            avg_confidence = insights["pattern"]["avg_confidence"]
+            if avg_confidence > 0.8:
+                hints.append(f"High confidence patterns found for {task_type} tasks")
+            elif avg_confidence < 0.5:
+                hints.append(f"Low confidence for {task_type} tasks, consider manual selection")
+
+        if insights["entities"]:
+            hints.append(f"Detected entities: {', '.join(insights['entities'][:3])}")
+
+        if insights["recommended_tools"]:
+            top_tool = insights["recommended_tools"][0]
+            if top_tool["success_rate"] > 0.8:
+                hints.append(f"Consider {top_tool['tool']} with {top_tool['success_rate']:.1%} success rate")
+
+        return hints
+
+    def training_samples(self, since: float = 0.0) -> list[tuple[str, str, float]]:
+        """Return (task, selected_tool, timestamp) for successful entries newer than since."""
+        return [(task, tool, timestamp) for task, tool, timestamp in self._query(_SELECT_TRAINING, (since,))]
+
+    def similar_task_tools(self, task: str, top_n: int = 3) -> list[str]:
+        """Return tool names that succeeded on similar recent tasks (token overlap)."""
+        task_tokens = set(task.lower().split())
+        best: dict[str, float] = {}
+        for entry_task, tool_name in self._query(_SELECT_RECENT_SUCCESSES, (_SIMILARITY_WINDOW,)):
+            entry_tokens = set(entry_task.lower().split())
+            overlap = len(task_tokens & entry_tokens)
+            if overlap > 0:
+                similarity = overlap / max(len(task_tokens), len(entry_tokens))
+                if similarity > best.get(tool_name, 0.0):
+                    best[tool_name] = similarity
+
+        sorted_tools = sorted(best.items(), key=lambda x: -x[1])
+        return [t for t, _ in sorted_tools[:top_n]]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def prune(self, retention_days: float) -> int:
+        """Delete raw entries older than retention_days; rollups are kept.
+
+        Returns:
+            Number of entries deleted
+        """
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            deleted = self._conn.execute(_DELETE_OLDER_THAN, (cutoff,)).rowcount
+            self._invalidate_boost_tables()
+        if deleted:
+            logger.info("Pruned %d feedback entries older than %.1f days", deleted, retention_days)
+        return deleted
+
+    def start_compaction(self, interval: int = 60) -> None:
+        """Start periodically pruning old entries (if retention_days is set) and checkpointing the WAL.
+
+        SQLite's automatic checkpoints never shrink the WAL file; a TRUNCATE
+        checkpoint resets it once readers are done with it.
+        """
+        if self._compaction_thread is not None:
+            logger.warning("Feedback compaction already running")
+            return
+
+        self._compaction_stop.clear()
+
+        def compaction_loop() -> None:
+            while not self._compaction_stop.wait(interval):
+                try:
+                    if self.retention_days is not None:
+                        self.prune(self.retention_days)
+                    self.compact()
+                except sqlite3.Error as exc:
+                    logger.warning("Feedback database compaction failed: %s", exc)
+
+        self._compaction_thread = threading.Thread(target=compaction_loop, name="feedback-compactor", daemon=True)
+        self._compaction_thread.start()
+        logger.info("Started background feedback compaction (interval: %ds)", interval)
+
+    def stop_compaction(self) -> None:
+        """Stop background compaction."""
+        if self._compaction_thread is None:
+            return
+
+        self._compaction_stop.set()
+        self._compaction_thread.join(timeout=5)
+        self._compaction_thread = None
+        logger.info("Stopped background feedback compaction")
+
+    def compact(self) -> None:
+        """Checkpoint the SQLite WAL into the main database file."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        """Stop background compaction and close the database connection."""
+        self.stop_compaction()
+        with self._lock:
+            self._conn.close()
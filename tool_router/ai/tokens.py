@@ -0,0 +1,201 @@
+"""Shared token accounting and budgeted prompt packing for AI components."""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import math
+import os
+import re
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+_VOCAB_FILE_ENV = "ROUTER_TOKENIZER_VOCAB"
+_TOKENS_PER_WORD = 1.3  # Heuristic used when no vocabulary is available
+_DEFAULT_CACHE_SIZE = 4096
+_TRUNCATION_MARKER = "..."
+
+# Marker prefixes used by common vocabularies (GPT-2 BPE, SentencePiece, WordPiece)
+_PIECE_MARKERS = ("Ġ", "▁", "##")
+_PRETOKENIZE_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def _load_vocabulary(path: Path) -> set[str]:
+    """Load vocabulary pieces from a tokenizer file.
+
+    Supports HuggingFace ``tokenizer.json`` files, flat ``{piece: id}`` JSON
+    maps and plain text files with one piece per line.
+    """
+    raw = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        data = json.loads(raw)
+        vocab = data.get("model", {}).get("vocab", data) if isinstance(data, dict) else data
+        if isinstance(vocab, dict):
+            pieces = vocab.keys()
+        elif isinstance(vocab, list):
+            # Unigram vocabularies are stored as [[piece, score], ...]
+            pieces = [item[0] if isinstance(item, list) else item for item in vocab]
+        else:
+            msg = f"Unsupported vocabulary layout in {path}"
+            raise ValueError(msg)
+    else:
+        pieces = (line.split("\t")[0] for line in raw.splitlines())
+
+    normalized: set[str] = set()
+    for piece in pieces:
+        for marker in _PIECE_MARKERS:
+            if piece.startswith(marker):
+                piece = piece[len(marker) :]  # noqa: PLW2901
+                break
+        if piece:
+            normalized.add(piece)
+    return normalized
+
+
+class TokenCounter:
+    """Count tokens with a local vocabulary, falling back to a word heuristic.
+
+    When a vocabulary is loaded, words are split into the longest matching
+    vocabulary pieces (WordPiece-style greedy matching); characters not covered
+    by the vocabulary count as one token each. Counts are memoized per string.
+    """
+
+    def __init__(self, vocab_file: str | None = None, cache_size: int = _DEFAULT_CACHE_SIZE) -> None:
+        self._vocab: set[str] = set()
+        self._max_piece_len = 0
+        self.vocab_file = vocab_file or os.getenv(_VOCAB_FILE_ENV)
+        if self.vocab_file:
+            self._load(Path(self.vocab_file))
+        self._count_cached = functools.lru_cache(maxsize=cache_size)(self._count_uncached)
+
+    @property
+    def uses_vocabulary(self) -> bool:
+        """Whether counts come from a loaded vocabulary rather than the heuristic."""
+        return bool(self._vocab)
+
+    def _load(self, path: Path) -> None:
+        """Load the vocabulary (best-effort)."""
+        try:
+            self._vocab = _load_vocabulary(path)
+            self._max_piece_len = max((len(piece) for piece in self._vocab), default=0)
+            logger.debug("Loaded %d tokenizer pieces from %s", len(self._vocab), path)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not load tokenizer vocabulary, using heuristic: %s", exc)
+            self._vocab = set()
+            self._max_piece_len = 0
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in text."""
+        if not text:
+            return 0
+        return self._count_cached(text)
+
+    def _count_uncached(self, text: str) -> int:
+        if not self._vocab:
+            return math.ceil(len(text.split()) * _TOKENS_PER_WORD)
+        return sum(self._count_word(word) for word in _PRETOKENIZE_PATTERN.findall(text))
+
+    def _count_word(self, word: str) -> int:
+        """Count pieces in a single pre-tokenized word via greedy longest match."""
+        tokens = 0
+        start = 0
+        while start < len(word):
+            end = min(len(word), start + self._max_piece_len)
+            while end > start + 1 and word[start:end] not in self._vocab:
+                end -= 1
+            tokens += 1
+            start = end
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Truncate text to at most max_tokens tokens, appending a marker when cut."""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+
+        budget = max_tokens - self.count(_TRUNCATION_MARKER)
+        words = text.split()
+        kept = self._fitting_prefix(words, " ", budget)
+        if kept:
+            return " ".join(words[:kept]) + _TRUNCATION_MARKER
+        # The first word alone is over budget (e.g. a long path or URL): cut it by characters
+        kept = self._fitting_prefix(words[0], "", budget)
+        return words[0][:kept] + _TRUNCATION_MARKER if kept else ""
+
+    def _fitting_prefix(self, pieces: Sequence[str], separator: str, budget: int) -> int:
+        """Binary search for how many leading pieces, joined by separator, fit in budget tokens."""
+        low, high = 0, len(pieces)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.count(separator.join(pieces[:mid])) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def cache_info(self) -> dict[str, int]:
+        """Return memoization statistics."""
+        info = self._count_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize or 0}
+
+
+def format_tool_line(tool: dict[str, Any], description: str | None = None) -> str:
+    """Format a tool as a single line of a selector prompt tool list."""
+    if description is None:
+        description = tool.get("description") or "No description"
+    return f"- {tool.get('name', 'Unknown')}: {description}"
+
+
+def pack_tool_descriptions(
+    tools: list[dict[str, Any]],
+    budget_tokens: int,
+    max_description_tokens: int = 60,
+    counter: TokenCounter | None = None,
+) -> str:
+    """Build a tool list for a selector prompt within a token budget.
+
+    Tools are expected in ranked order (best first). Long descriptions are
+    truncated to max_description_tokens, and packing stops once the next tool
+    line would exceed the budget. At least one tool is always included.
+
+    Args:
+        tools: Ranked tool definitions with name and description
+        budget_tokens: Maximum tokens the tool list may use
+        max_description_tokens: Per-tool description limit
+        counter: Token counter to use (defaults to the shared counter)
+
+    Returns:
+        Newline-separated tool list
+    """
+    counter = counter or get_token_counter()
+    lines: list[str] = []
+    used = 0
+
+    for tool in tools:
+        description = counter.truncate(tool.get("description") or "No description", max_description_tokens)
+        line = format_tool_line(tool, description)
+        line_tokens = counter.count(line) + 1  # newline separator
+        if lines and used + line_tokens > budget_tokens:
+            break
+        lines.append(line)
+        used += line_tokens
+
+    if len(lines) < len(tools):
+        logger.debug("Packed %d of %d tools into %d-token budget", len(lines), len(tools), budget_tokens)
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=1)
+def get_token_counter() -> TokenCounter:
+    """Get or create the shared token counter (singleton).
+
+    Returns:
+        Global TokenCounter instance
+    """
+    return TokenCounter()
@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
+from tool_router.ai.tokens import get_token_counter
+
 
 logger = logging.getLogger(__name__)
 
@@ -513,7 +515,7 @@ export default {spec.name}Form;
 
     def _estimate_component_tokens(self, code: str) -> int:
         """Estimate token count for component."""
-        return len(code.split()) * 1.3  # Rough estimation
+        return get_token_counter().count(code)
 
 
 class UISpecialist:
@@ -626,7 +628,7 @@ class UISpecialist:
 
         # Update token estimate
         original_tokens = generation_result["token_estimate"]
-        optimized_tokens = len(optimized_code.split()) * 1.3
+        optimized_tokens = get_token_counter().count(optimized_code)
         token_reduction = ((original_tokens - optimized_tokens) / original_tokens) * 100 if original_tokens > 0 else 0
 
         generation_result["component_code"] = optimized_code
@@ -22,17 +22,38 @@ Security Components:
 from .cache_manager import (
     CacheConfig,
     CacheManager,
-    CacheMetrics,
     cache_manager,
     cached,
     clear_all_caches,
     clear_cache,
     create_lru_cache,
+    create_tinylfu_cache,
     create_ttl_cache,
     get_cache_metrics,
     reset_cache_metrics,
 )
 
+# Value codecs for Redis backends
+from .codecs import (
+    CacheCodec,
+    available_compressors,
+    available_serializers,
+)
+
+# Lock-free metrics counters and their snapshots
+from .counters import CacheCounters
+from .types import CacheMetrics
+
+# Stable cache keys
+from .keys import stable_hash
+
+# Memory accounting for byte-bounded caches
+from .sizing import (
+    ByteLRUCache,
+    ByteTTLCache,
+    MemoryBudget,
+)
+
 # Configuration and utilities
 from .config import (
     CacheBackendConfig,
@@ -69,11 +90,21 @@ from .invalidation import (
 )
 
 # Redis cache integration
+from .async_redis_cache import (
+    AsyncRedisCache,
+    create_async_redis_cache,
+)
 from .redis_cache import (
     RedisCache,
     RedisConfig,
     create_redis_cache,
 )
+from .tag_index import RedisTagIndex
+from .tiered_cache import (
+    TieredCache,
+    create_tiered_cache,
+)
+from .tinylfu import TinyLFUCache
 
 
 # Security and compliance features
@@ -141,9 +172,14 @@ __api_features_available__ = API_AVAILABLE
 # Main exports - basic cache management (always available)
 __all__ = [
     "AdvancedInvalidationManager",
+    "AsyncRedisCache",
+    "ByteLRUCache",
+    "ByteTTLCache",
     "CacheAlertManager",
     "CacheBackendConfig",
+    "CacheCodec",
     "CacheConfig",
+    "CacheCounters",
     "CacheManager",
     "CacheMetrics",
     "CachePerformanceCollector",
@@ -151,15 +187,24 @@ __all__ = [
     "DependencyInvalidationManager",
     "EventInvalidationManager",
     "InvalidationStrategy",
+    "MemoryBudget",
     "RedisCache",
     "RedisConfig",
+    "RedisTagIndex",
     "TagInvalidationManager",
+    "TieredCache",
+    "TinyLFUCache",
+    "available_compressors",
+    "available_serializers",
     "cache_manager",
     "cached",
     "clear_all_caches",
     "clear_cache",
+    "create_async_redis_cache",
     "create_lru_cache",
     "create_redis_cache",
+    "create_tiered_cache",
+    "create_tinylfu_cache",
     "create_ttl_cache",
     "get_advanced_invalidation_manager",
     "get_alert_summary",
@@ -174,6 +219,7 @@ __all__ = [
     "invalidate_by_tags",
     "is_redis_enabled",
     "reset_cache_metrics",
+    "stable_hash",
     "start_dashboard_collection",
     "stop_dashboard_collection",
     "validate_cache_config",
@@ -0,0 +1,354 @@
+"""Asynchronous Redis cache backend for use from event-loop code."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict
+from typing import Any
+
+
+try:
+    import redis.asyncio as aioredis
+
+    ASYNC_REDIS_AVAILABLE = True
+except ImportError:
+    ASYNC_REDIS_AVAILABLE = False
+    aioredis = None
+
+from cachetools import TTLCache
+
+from .codecs import DEFAULT_COMPRESS_THRESHOLD, CacheCodec
+from .redis_cache import _GLOB_SPECIAL, _SCAN_BATCH_SIZE, ClearProgress, RedisConfig
+from .types import CacheConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisCache:
+    """redis.asyncio based cache with the RedisCache surface and fallback semantics.
+
+    Every operation is a coroutine, so it can be awaited from FastAPI
+    endpoints without blocking the event loop. The client and its connection
+    pool are created lazily on first use; batched operations are pipelined.
+    When Redis is unreachable, operations fall back to the local TTLCache.
+    """
+
+    def __init__(
+        self,
+        config: RedisConfig,
+        fallback_cache: TTLCache | None = None,
+        key_prefix: str = "mcp_cache:",
+        serializer: str = "pickle",
+        compression: str | None = None,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    ) -> None:
+        self.config = config
+        self.key_prefix = key_prefix
+        self.serializer = serializer
+        self.fallback_cache = fallback_cache
+        self.codec = CacheCodec(serializer, compression=compression, compress_threshold=compress_threshold)
+        self._redis_client = None
+        self._connection_lock = asyncio.Lock()
+        self._last_health_check = 0.0
+        self._is_healthy = False
+        self._clear_progress: ClearProgress | None = None
+
+    def _make_key(self, key: str) -> str:
+        """Create a namespaced key for Redis."""
+        return f"{self.key_prefix}{key}"
+
+    def _create_client(self) -> Any:
+        """Create the client on a connection pool built from the config."""
+        pool_kwargs = {
+            "host": self.config.host,
+            "port": self.config.port,
+            "db": self.config.db,
+            "socket_timeout": self.config.socket_timeout,
+            "socket_connect_timeout": self.config.socket_connect_timeout,
+            "retry_on_timeout": self.config.retry_on_timeout,
+            "max_connections": self.config.max_connections,
+        }
+        if self.config.password:
+            pool_kwargs["password"] = self.config.password
+        if self.config.connection_pool_kwargs:
+            pool_kwargs.update(self.config.connection_pool_kwargs)
+
+        return aioredis.Redis(connection_pool=aioredis.ConnectionPool(**pool_kwargs))
+
+    async def _get_redis(self) -> Any:
+        """Return a healthy client, (re)connecting at most once per health_check_interval.
+
+        Raises:
+            ConnectionError: If Redis is not available
+        """
+        if self._is_healthy and self._redis_client is not None:
+            return self._redis_client
+        if not ASYNC_REDIS_AVAILABLE:
+            raise ConnectionError("redis.asyncio is not available")
+
+        async with self._connection_lock:
+            now = time.time()
+            if not self._is_healthy and now - self._last_health_check >= self.config.health_check_interval:
+                self._last_health_check = now
+                try:
+                    if self._redis_client is None:
+                        self._redis_client = self._create_client()
+                    await self._redis_client.ping()
+                    self._is_healthy = True
+                    logger.info(f"Async Redis cache connected: {self.config.host}:{self.config.port}")
+                except Exception as e:
+                    logger.warning(f"Async Redis health check failed: {e}")
+                    await self._discard_client()
+
+        if self._is_healthy and self._redis_client is not None:
+            return self._redis_client
+        raise ConnectionError("Redis is not available")
+
+    async def _discard_client(self) -> None:
+        client, self._redis_client, self._is_healthy = self._redis_client, None, False
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing async Redis connection: {e}")
+
+    async def _mark_unhealthy(self, e: Exception) -> None:
+        """Force a reconnect attempt after a connection-level failure.
+
+        Connection and timeout errors only trigger a health check; the pool
+        reconnects by itself. A RuntimeError means the pool is bound to
+        another (closed) event loop, so the client is dropped. Other errors,
+        such as values that cannot be encoded, leave the client alone.
+        """
+        if isinstance(e, RuntimeError):
+            await self._discard_client()
+        elif aioredis is not None and isinstance(e, aioredis.ConnectionError | aioredis.TimeoutError):
+            self._is_healthy = False
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Get value from cache, with fallback to local cache."""
+        try:
+            client = await self._get_redis()
+            value = await client.get(self._make_key(key))
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis get failed for key {key}: {e}")
+        else:
+            if value is not None:
+                try:
+                    return self.codec.decode(value)
+                except Exception as e:  # noqa: BLE001
+                    logger.debug(f"Failed to deserialize key {key}: {e}")
+
+        if self.fallback_cache is not None:
+            return self.fallback_cache.get(key, default)
+
+        return default
+
+    async def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
+        """Set value in cache with optional TTL."""
+        try:
+            client = await self._get_redis()
+            redis_key = self._make_key(key)
+            serialized_value = self.codec.encode(value)
+            success = await client.set(redis_key, serialized_value, ex=ttl)
+
+            if success:
+                if self.fallback_cache is not None:
+                    self.fallback_cache[key] = value
+                return True
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis set failed for key {key}: {e}")
+
+        if self.fallback_cache is not None:
+            self.fallback_cache[key] = value
+            return True
+
+        return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete key from cache."""
+        success = False
+        try:
+            client = await self._get_redis()
+            success = bool(await client.unlink(self._make_key(key)))
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis delete failed for key {key}: {e}")
+
+        if self.fallback_cache is not None and key in self.fallback_cache:
+            del self.fallback_cache[key]
+            success = True
+
+        return success
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists in cache."""
+        try:
+            client = await self._get_redis()
+            return bool(await client.exists(self._make_key(key)))
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis exists check failed for key {key}: {e}")
+
+        if self.fallback_cache is not None:
+            return key in self.fallback_cache
+
+        return False
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Get multiple values with one MGET."""
+        result = {}
+        try:
+            client = await self._get_redis()
+            values = await client.mget([self._make_key(key) for key in keys])
+            for key, value in zip(keys, values, strict=True):
+                if value is not None:
+                    try:
+                        result[key] = self.codec.decode(value)
+                    except Exception as e:
+                        logger.debug(f"Failed to deserialize key {key}: {e}")
+                        result[key] = None
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis get_many failed: {e}")
+
+        if self.fallback_cache is not None:
+            for key in keys:
+                if key not in result:
+                    result[key] = self.fallback_cache.get(key)
+
+        return result
+
+    async def set_many(self, mapping: dict[str, Any], ttl: int | None = None) -> bool:
+        """Set multiple values in one pipeline round trip."""
+        try:
+            client = await self._get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(self._make_key(key), self.codec.encode(value), ex=ttl)
+                success = all(await pipe.execute())
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis set_many failed: {e}")
+            success = False
+
+        if self.fallback_cache is not None:
+            for key, value in mapping.items():
+                self.fallback_cache[key] = value
+            success = True
+
+        return success
+
+    async def clear(self, batch_size: int = _SCAN_BATCH_SIZE) -> bool:
+        """Clear all cache entries with SCAN and pipelined UNLINK batches."""
+        success = await self._unlink_matching(self.key_prefix.translate(_GLOB_SPECIAL) + "*", batch_size)
+
+        if self.fallback_cache is not None:
+            self.fallback_cache.clear()
+            success = True
+
+        return success
+
+    async def invalidate_prefix(self, prefix: str, batch_size: int = _SCAN_BATCH_SIZE) -> bool:
+        """Delete every entry whose key starts with prefix."""
+        pattern = f"{self.key_prefix}{prefix}".translate(_GLOB_SPECIAL) + "*"
+        success = await self._unlink_matching(pattern, batch_size)
+
+        if self.fallback_cache is not None:
+            for key in [key for key in list(self.fallback_cache.keys()) if key.startswith(prefix)]:
+                self.fallback_cache.pop(key, None)
+            success = True
+
+        return success
+
+    def get_clear_progress(self) -> dict[str, Any] | None:
+        """Return the progress of the most recent clear or prefix invalidation."""
+        return asdict(self._clear_progress) if self._clear_progress else None
+
+    async def _unlink_matching(self, pattern: str, batch_size: int) -> bool:
+        state = self._clear_progress = ClearProgress(pattern=pattern, started_at=time.time())
+        try:
+            client = await self._get_redis()
+            cursor = 0
+            while True:
+                cursor, keys = await client.scan(cursor=cursor, match=pattern, count=batch_size)
+                if keys:
+                    async with client.pipeline(transaction=False) as pipe:
+                        for start in range(0, len(keys), batch_size):
+                            pipe.unlink(*keys[start : start + batch_size])
+                        deleted = sum(await pipe.execute())
+                    state.scanned += len(keys)
+                    state.deleted += deleted
+                    state.batches += 1
+                if cursor == 0:
+                    break
+        except Exception as e:
+            await self._mark_unhealthy(e)
+            logger.debug(f"Async Redis clear failed for {pattern}: {e}")
+            state.error = str(e)
+            return False
+        finally:
+            state.running = False
+            state.finished_at = time.time()
+
+        return True
+
+    async def get_info(self) -> dict[str, Any]:
+        """Get Redis cache information."""
+        info = {
+            "redis_available": ASYNC_REDIS_AVAILABLE,
+            "redis_connected": self._is_healthy,
+            "fallback_enabled": self.fallback_cache is not None,
+            "key_prefix": self.key_prefix,
+            "serializer": self.serializer,
+            "codec": self.codec.get_stats(),
+        }
+
+        if self._is_healthy and self._redis_client is not None:
+            try:
+                redis_info = await self._redis_client.info()
+                info.update(
+                    {
+                        "redis_version": redis_info.get("redis_version"),
+                        "used_memory": redis_info.get("used_memory"),
+                        "used_memory_human": redis_info.get("used_memory_human"),
+                        "connected_clients": redis_info.get("connected_clients"),
+                        "total_commands_processed": redis_info.get("total_commands_processed"),
+                    }
+                )
+            except Exception as e:
+                logger.debug(f"Failed to get Redis info: {e}")
+
+        if self.fallback_cache is not None:
+            info.update(
+                {
+                    "fallback_size": len(self.fallback_cache),
+                    "fallback_currsize": self.fallback_cache.currsize,
+                    "fallback_maxsize": self.fallback_cache.maxsize,
+                }
+            )
+
+        return info
+
+    async def close(self) -> None:
+        """Close the client and its connection pool."""
+        await self._discard_client()
+
+
+def create_async_redis_cache(
+    config: RedisConfig | None = None, fallback_config: CacheConfig | None = None, **kwargs: Any
+) -> AsyncRedisCache:
+    """Create an async Redis cache instance with fallback."""
+    if config is None:
+        config = RedisConfig()
+
+    fallback_cache = None
+    if fallback_config:
+        fallback_cache = TTLCache(maxsize=fallback_config.max_size, ttl=fallback_config.ttl)
+
+    return AsyncRedisCache(config=config, fallback_cache=fallback_cache, **kwargs)
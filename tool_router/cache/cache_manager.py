@@ -2,189 +2,356 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import functools
+import inspect
 import logging
+import os
 import threading
 import time
 from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from dataclasses import dataclass
 from typing import Any
 
 from cachetools import LRUCache, TTLCache
 
+from .async_redis_cache import AsyncRedisCache, create_async_redis_cache
+from .counters import CacheCounters
+from .keys import key_builder
 from .redis_cache import RedisCache, RedisConfig, create_redis_cache
-from .types import CacheConfig, CacheMetrics
+from .sizing import ByteBoundedCache, ByteLRUCache, ByteTTLCache, MemoryBudget, get_sizeof
+from .snapshot import is_snapshotable, read_snapshot, restore_entry, write_snapshot
+from .stampede import get_or_compute
+from .tiered_cache import TieredCache, create_tiered_cache
+from .tinylfu import TinyLFUCache
+from .types import CacheConfig
 
 
 logger = logging.getLogger(__name__)
 
+_MEMORY_BUDGET_ENV = "CACHE_MEMORY_BUDGET_BYTES"
+_SNAPSHOT_PATH_ENV = "CACHE_SNAPSHOT_PATH"
+_SNAPSHOT_INTERVAL_ENV = "CACHE_SNAPSHOT_INTERVAL"
+_SNAPSHOT_CACHES_ENV = "CACHE_SNAPSHOT_CACHES"  # Comma-separated cache names
+_DEFAULT_SNAPSHOT_INTERVAL = 300.0
+
 
 class CacheManager:
     """Centralized cache management with metrics and cleanup."""
 
-    def __init__(self):
+    def __init__(self, memory_budget: int | None = None) -> None:
+        """Initialize the manager.
+
+        Args:
+            memory_budget: Combined byte limit for all byte-bounded caches
+                (defaults to CACHE_MEMORY_BUDGET_BYTES, unset: no global limit)
+        """
         self._caches: dict[str, Any] = {}
-        self._metrics: dict[str, CacheMetrics] = defaultdict(CacheMetrics)
+        self._metrics: dict[str, CacheCounters] = defaultdict(CacheCounters)
         self._lock = threading.RLock()
         self._last_cleanup = time.time()
         self._cleanup_interval = 300  # 5 minutes
+        self._pending_tasks: set[asyncio.Task] = set()
+
+        if memory_budget is None and os.getenv(_MEMORY_BUDGET_ENV):
+            memory_budget = int(os.environ[_MEMORY_BUDGET_ENV])
+        self._memory_budget = MemoryBudget(memory_budget)
 
         # Global metrics
-        self._global_metrics = CacheMetrics()
-        self._global_metrics.last_reset_time = time.time()
+        self._global_metrics = CacheCounters()
+
+        # Periodic snapshots (enable_snapshots)
+        self._snapshot_thread: threading.Thread | None = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_args: tuple[str, list[str] | None] | None = None
+        # Loaded entries of caches not created yet: name -> [(key, value, monotonic deadline or None)]
+        self._pending_restore: dict[str, list[tuple[Any, Any, float | None]]] = {}
 
     def create_ttl_cache(self, name: str, config: CacheConfig | None = None) -> TTLCache:
-        """Create a TTL cache with optional configuration."""
+        """Create a TTL cache with optional configuration.
+
+        With config.max_bytes set, the cache is bounded by the estimated size
+        of its values and counts against the global memory budget.
+        """
         config = config or CacheConfig()
-        cache = TTLCache(maxsize=config.max_size, ttl=config.ttl)
+        if config.max_bytes:
+            cache = ByteTTLCache(
+                config.max_bytes,
+                ttl=config.ttl,
+                sizeof=get_sizeof(config.sizeof),
+                on_evict=self._eviction_recorder(name, config),
+            )
+        else:
+            cache = TTLCache(maxsize=config.max_size, ttl=config.ttl)
+
+        self._register(name, cache, config)
+        logger.info(f"Created TTL cache '{name}' with {self._capacity(config)}, ttl={config.ttl}s")
+        return cache
+
+    def create_lru_cache(self, name: str, config: CacheConfig | None = None) -> LRUCache:
+        """Create an LRU cache with optional configuration (byte-bounded with config.max_bytes)."""
+        config = config or CacheConfig()
+        if config.max_bytes:
+            cache = ByteLRUCache(
+                config.max_bytes,
+                sizeof=get_sizeof(config.sizeof),
+                on_evict=self._eviction_recorder(name, config),
+            )
+        else:
+            cache = LRUCache(maxsize=config.max_size)
+
+        self._register(name, cache, config)
+        logger.info(f"Created LRU cache '{name}' with {self._capacity(config)}")
+        return cache
 
+    def _eviction_recorder(self, name: str, config: CacheConfig) -> Callable[[Any, Any], None] | None:
+        if not config.enable_metrics:
+            return None
+        return lambda _key, _value: self.record_eviction(name)
+
+    @staticmethod
+    def _capacity(config: CacheConfig) -> str:
+        if config.max_bytes:
+            return f"max_bytes={config.max_bytes} (sizeof={config.sizeof})"
+        return f"max_size={config.max_size}"
+
+    def _register(self, name: str, cache: Any, config: CacheConfig) -> None:
         with self._lock:
             self._caches[name] = cache
             if config.enable_metrics:
-                self._metrics[name] = CacheMetrics()
-                self._metrics[name].last_reset_time = time.time()
+                self._metrics[name] = CacheCounters()
+            pending = self._pending_restore.pop(name, None)
+        # Outside the manager lock: enforcing the budget records evictions, which takes it
+        if isinstance(cache, ByteBoundedCache):
+            self._memory_budget.register(cache)
+        if pending:
+            self._restore_pending(name, cache, pending)
+
+    @staticmethod
+    def _restore_pending(name: str, cache: Any, entries: list[tuple[Any, Any, float | None]]) -> None:
+        """Warm a newly created cache with the snapshot entries loaded for it."""
+        if not is_snapshotable(cache):
+            return
+        now = time.monotonic()
+        restored = sum(
+            restore_entry(cache, key, value, None if deadline is None else deadline - now)
+            for key, value, deadline in entries
+            if deadline is None or deadline > now
+        )
+        logger.info(f"Restored {restored} snapshot entries into cache '{name}'")
+
+    def set_memory_budget(self, max_bytes: int | None) -> None:
+        """Set the combined byte limit of all byte-bounded caches (None: unlimited).
+
+        Shrinking the budget evicts entries, largest caches first, right away.
+        """
+        self._memory_budget.max_bytes = max_bytes
+        evicted = self._memory_budget.enforce()
+        logger.info(f"Set cache memory budget to {max_bytes} bytes ({evicted} entries evicted)")
+
+    def get_memory_usage(self) -> dict[str, int | None]:
+        """Return bytes held by byte-bounded caches and the global budget."""
+        return {"memory_usage": self._memory_budget.used_bytes, "memory_budget": self._memory_budget.max_bytes}
+
+    def create_tinylfu_cache(self, name: str, config: CacheConfig | None = None) -> TinyLFUCache:
+        """Create a W-TinyLFU cache (frequency-based admission, segmented LRU, TTL).
+
+        Evictions are recorded in the cache's metrics automatically.
+        """
+        config = config or CacheConfig()
+        on_evict = (lambda _key, _value: self.record_eviction(name)) if config.enable_metrics else None
+        cache = TinyLFUCache(maxsize=config.max_size, ttl=config.ttl or None, on_evict=on_evict)
+        self._register(name, cache, config)
 
-        logger.info(f"Created TTL cache '{name}' with max_size={config.max_size}, ttl={config.ttl}s")
+        logger.info(f"Created TinyLFU cache '{name}' with max_size={config.max_size}, ttl={config.ttl}s")
         return cache
 
-    def create_lru_cache(self, name: str, config: CacheConfig | None = None) -> LRUCache:
-        """Create an LRU cache with optional configuration."""
-        config = config or CacheConfig()
-        cache = LRUCache(maxsize=config.max_size)
+    def create_redis_cache(
+        self,
+        name: str,
+        redis_config: RedisConfig | None = None,
+        fallback_config: CacheConfig | None = None,
+        async_: bool = False,
+        **kwargs: Any,
+    ) -> RedisCache | AsyncRedisCache:
+        """Create a Redis cache with optional fallback configuration.
+
+        With async_=True an AsyncRedisCache (redis.asyncio) is created, whose
+        operations are awaited instead of blocking the event loop.
+        """
+        redis_config = redis_config or RedisConfig()
+        fallback_config = fallback_config or CacheConfig()
+
+        factory = create_async_redis_cache if async_ else create_redis_cache
+        cache = factory(config=redis_config, fallback_config=fallback_config, **kwargs)
 
         with self._lock:
             self._caches[name] = cache
-            if config.enable_metrics:
-                self._metrics[name] = CacheMetrics()
-                self._metrics[name].last_reset_time = time.time()
+            if fallback_config.enable_metrics:
+                self._metrics[name] = CacheCounters()
 
-        logger.info(f"Created LRU cache '{name}' with max_size={config.max_size}")
+        logger.info(f"Created {'async ' if async_ else ''}Redis cache '{name}' with fallback")
         return cache
 
-    def create_redis_cache(
-        self, name: str, redis_config: RedisConfig | None = None, fallback_config: CacheConfig | None = None, **kwargs
-    ) -> RedisCache:
-        """Create a Redis cache with optional fallback configuration."""
+    def create_tiered_cache(
+        self,
+        name: str,
+        redis_config: RedisConfig | None = None,
+        l1_config: CacheConfig | None = None,
+        fallback_config: CacheConfig | None = None,
+        **kwargs: Any,
+    ) -> TieredCache:
+        """Create a two-tier cache (in-process L1, Redis L2) with pub/sub invalidation."""
         redis_config = redis_config or RedisConfig()
         fallback_config = fallback_config or CacheConfig()
 
-        cache = create_redis_cache(config=redis_config, fallback_config=fallback_config, **kwargs)
+        cache = create_tiered_cache(config=redis_config, l1_config=l1_config, fallback_config=fallback_config, **kwargs)
 
         with self._lock:
             self._caches[name] = cache
             if fallback_config.enable_metrics:
-                self._metrics[name] = CacheMetrics()
-                self._metrics[name].last_reset_time = time.time()
+                self._metrics[name] = CacheCounters()
 
-        logger.info(f"Created Redis cache '{name}' with fallback")
+        logger.info(f"Created tiered cache '{name}' with L1 max_size={cache.l1.maxsize}, ttl={cache.l1.ttl}s")
         return cache
 
+    def get_or_compute(
+        self, cache_name: str, key: str, compute: Callable[[], Any], ttl: int | None = None, **kwargs: Any
+    ) -> Any:
+        """Return a cached value, computing it with stampede protection on a miss.
+
+        Uses XFetch early refresh and per-key locks (see stampede.get_or_compute);
+        Redis caches also accept distributed_lock=True. A call that ran compute
+        counts as a miss, any other as a hit.
+
+        Raises:
+            KeyError: If the cache does not exist
+            TypeError: If the cache is asynchronous
+        """
+        cache = self.get_cache(cache_name)
+        if cache is None:
+            raise KeyError(f"Cache '{cache_name}' not found")
+        if isinstance(cache, AsyncRedisCache):
+            raise TypeError(f"Cache '{cache_name}' is asynchronous")
+
+        computed = False
+
+        def tracked_compute() -> Any:
+            nonlocal computed
+            computed = True
+            return compute()
+
+        if isinstance(cache, RedisCache):
+            value = cache.get_or_compute(key, tracked_compute, ttl=ttl, **kwargs)
+        else:
+            value = get_or_compute(cache, key, tracked_compute, ttl=ttl, **kwargs)
+
+        if computed:
+            self.record_miss(cache_name)
+        else:
+            self.record_hit(cache_name)
+        return value
+
     def get_cache(self, name: str) -> Any:
         """Get a cache by name."""
         with self._lock:
             return self._caches.get(name)
 
     def record_hit(self, cache_name: str) -> None:
-        """Record a cache hit for metrics."""
-        with self._lock:
-            if cache_name in self._metrics:
-                self._metrics[cache_name].hits += 1
-                self._metrics[cache_name].total_requests += 1
-                self._update_hit_rate(cache_name)
+        """Record a cache hit for metrics.
 
-            self._global_metrics.hits += 1
-            self._global_metrics.total_requests += 1
-            self._update_global_hit_rate()
+        Counting takes no lock (see CacheCounters); totals and hit rates are
+        computed when metrics are read.
+        """
+        counters = self._metrics.get(cache_name)
+        if counters is not None:
+            counters.hit()
+        self._global_metrics.hit()
 
     def record_miss(self, cache_name: str) -> None:
         """Record a cache miss for metrics."""
-        with self._lock:
-            if cache_name in self._metrics:
-                self._metrics[cache_name].misses += 1
-                self._metrics[cache_name].total_requests += 1
-                self._update_hit_rate(cache_name)
-
-            self._global_metrics.misses += 1
-            self._global_metrics.total_requests += 1
-            self._update_global_hit_rate()
+        counters = self._metrics.get(cache_name)
+        if counters is not None:
+            counters.miss()
+        self._global_metrics.miss()
 
     def record_eviction(self, cache_name: str) -> None:
         """Record a cache eviction for metrics."""
-        with self._lock:
-            if cache_name in self._metrics:
-                self._metrics[cache_name].evictions += 1
-
-            self._global_metrics.evictions += 1
-
-    def _update_hit_rate(self, cache_name: str) -> None:
-        """Update hit rate for a specific cache."""
-        if cache_name in self._metrics:
-            metrics = self._metrics[cache_name]
-            if metrics.total_requests > 0:
-                metrics.hit_rate = metrics.hits / metrics.total_requests
-
-    def _update_global_hit_rate(self) -> None:
-        """Update global hit rate."""
-        if self._global_metrics.total_requests > 0:
-            self._global_metrics.hit_rate = self._global_metrics.hits / self._global_metrics.total_requests
+        counters = self._metrics.get(cache_name)
+        if counters is not None:
+            counters.eviction()
+        self._global_metrics.eviction()
 
     def get_metrics(self, cache_name: str | None = None) -> dict[str, Any]:
         """Get cache metrics, optionally for a specific cache."""
         with self._lock:
             if cache_name:
                 if cache_name in self._metrics:
-                    metrics = self._metrics[cache_name]
-                    return {
-                        "hits": metrics.hits,
-                        "misses": metrics.misses,
-                        "evictions": metrics.evictions,
-                        "total_requests": metrics.total_requests,
-                        "hit_rate": metrics.hit_rate,
-                        "cache_size": len(self._caches.get(cache_name, [])),
-                        "last_reset_time": metrics.last_reset_time,
-                    }
+                    return self._cache_metrics(cache_name)
                 return {"error": f"Cache '{cache_name}' not found"}
             # Return all cache metrics
+            global_metrics = self._global_metrics.snapshot()
             result = {
                 "global": {
-                    "hits": self._global_metrics.hits,
-                    "misses": self._global_metrics.misses,
-                    "evictions": self._global_metrics.evictions,
-                    "total_requests": self._global_metrics.total_requests,
-                    "hit_rate": self._global_metrics.hit_rate,
-                    "last_reset_time": self._global_metrics.last_reset_time,
+                    "hits": global_metrics.hits,
+                    "misses": global_metrics.misses,
+                    "evictions": global_metrics.evictions,
+                    "total_requests": global_metrics.total_requests,
+                    "hit_rate": global_metrics.hit_rate,
+                    "last_reset_time": global_metrics.last_reset_time,
+                    **self.get_memory_usage(),
                 }
             }
 
-            for name, metrics in self._metrics.items():
-                result[name] = {
-                    "hits": metrics.hits,
-                    "misses": metrics.misses,
-                    "evictions": metrics.evictions,
-                    "total_requests": metrics.total_requests,
-                    "hit_rate": metrics.hit_rate,
-                    "cache_size": len(self._caches.get(name, [])),
-                    "last_reset_time": metrics.last_reset_time,
-                }
+            for name in self._metrics:
+                result[name] = self._cache_metrics(name)
 
             return result
 
+    def _cache_metrics(self, name: str) -> dict[str, Any]:
+        """Build the metrics entry for one cache (caller holds the lock)."""
+        metrics = self._metrics[name].snapshot()
+        cache = self._caches.get(name)
+        result = {
+            "hits": metrics.hits,
+            "misses": metrics.misses,
+            "evictions": metrics.evictions,
+            "total_requests": metrics.total_requests,
+            "hit_rate": metrics.hit_rate,
+            "cache_size": len(cache) if hasattr(cache, "__len__") else 0,
+            "last_reset_time": metrics.last_reset_time,
+        }
+        if isinstance(cache, ByteBoundedCache):
+            result["memory_usage"] = int(cache.currsize)
+            result["max_bytes"] = cache.maxsize
+        if isinstance(cache, TieredCache):
+            tiers = cache.get_tier_stats()
+            result.update(
+                {
+                    "l1_hits": tiers["l1_hits"],
+                    "l2_hits": tiers["l2_hits"],
+                    "l1_hit_ratio": tiers["l1_hit_ratio"],
+                    "l2_hit_ratio": tiers["l2_hit_ratio"],
+                }
+            )
+        return result
+
     def reset_metrics(self, cache_name: str | None = None) -> None:
         """Reset metrics for a specific cache or all caches."""
-        current_time = time.time()
-
         with self._lock:
             if cache_name:
                 if cache_name in self._metrics:
-                    self._metrics[cache_name] = CacheMetrics()
-                    self._metrics[cache_name].last_reset_time = current_time
+                    self._metrics[cache_name] = CacheCounters()
                     logger.info(f"Reset metrics for cache '{cache_name}'")
             else:
                 # Reset all metrics
                 for name in self._metrics:
-                    self._metrics[name] = CacheMetrics()
-                    self._metrics[name].last_reset_time = current_time
+                    self._metrics[name] = CacheCounters()
 
-                self._global_metrics = CacheMetrics()
-                self._global_metrics.last_reset_time = current_time
+                self._global_metrics = CacheCounters()
                 logger.info("Reset all cache metrics")
 
     def cleanup_expired_caches(self) -> None:
@@ -201,6 +368,10 @@ class CacheManager:
                 if isinstance(cache, TTLCache):
                     # No manual cleanup needed for TTLCache
                     continue
+                if isinstance(cache, TinyLFUCache):
+                    # Expired entries are otherwise only dropped when read
+                    cache.expire()
+                    continue
                 if isinstance(cache, LRUCache):
                     # LRU cache doesn't have built-in expiration
                     # Could implement size-based cleanup if needed
@@ -214,9 +385,32 @@ class CacheManager:
             if cache_name in self._caches:
                 cache = self._caches[cache_name]
                 if hasattr(cache, "clear"):
-                    cache.clear()
+                    self._await_result(cache.clear())
                 logger.info(f"Cleared cache '{cache_name}'")
 
+    def _await_result(self, result: Any) -> None:
+        """Complete an async cache operation started from synchronous code.
+
+        Inside a running event loop the coroutine is scheduled as a task.
+        Without one it is rejected: running it on a new loop would bind the
+        cache's connection pool to a loop that is closed right after.
+
+        Raises:
+            RuntimeError: If no event loop is running in this thread
+        """
+        if not inspect.isawaitable(result):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if inspect.iscoroutine(result):
+                result.close()
+            raise RuntimeError("Async caches must be cleared from their event loop (await cache.clear())") from None
+        else:
+            task = loop.create_task(result)
+            self._pending_tasks.add(task)
+            task.add_done_callback(self._pending_tasks.discard)
+
     def clear_all_caches(self) -> None:
         """Clear all caches."""
         with self._lock:
@@ -247,23 +441,187 @@ class CacheManager:
 
             return info
 
+    @staticmethod
+    def _snapshot_names(caches: Iterable[str] | None) -> set[str] | None:
+        """Resolve the cache selection (default: CACHE_SNAPSHOT_CACHES, None: all caches)."""
+        if caches is None and os.getenv(_SNAPSHOT_CACHES_ENV):
+            caches = [name.strip() for name in os.environ[_SNAPSHOT_CACHES_ENV].split(",") if name.strip()]
+        return None if caches is None else set(caches)
+
+    def _snapshot_caches(self, names: set[str] | None) -> dict[str, Any]:
+        """Return the selected in-process caches (caller holds the lock)."""
+        selected = self._caches.items() if names is None else ((name, self._caches.get(name)) for name in names)
+        return {name: cache for name, cache in selected if is_snapshotable(cache)}
+
+    @staticmethod
+    def _snapshot_path(path: str | os.PathLike[str] | None) -> str | os.PathLike[str]:
+        path = path or os.getenv(_SNAPSHOT_PATH_ENV)
+        if not path:
+            raise ValueError(f"No snapshot path given and {_SNAPSHOT_PATH_ENV} is not set")
+        return path
+
+    def save_snapshot(self, path: str | os.PathLike[str] | None = None, caches: Iterable[str] | None = None) -> int:
+        """Write the entries of in-process caches to a snapshot file.
+
+        Redis and tiered caches are skipped (their data outlives the process),
+        as are memoized negative results, which carry monotonic deadlines.
+
+        Args:
+            path: Snapshot file (defaults to CACHE_SNAPSHOT_PATH)
+            caches: Names of the caches to save (defaults to CACHE_SNAPSHOT_CACHES,
+                unset: every in-process cache)
+
+        Returns:
+            Number of entries written
+
+        Raises:
+            ValueError: If no path is given or configured
+            OSError: If the file cannot be written
+        """
+        path = self._snapshot_path(path)
+        names = self._snapshot_names(caches)
+        now = time.monotonic()
+        with self._lock:
+            selected = self._snapshot_caches(names)
+            # Entries loaded for caches not created yet stay in the file until they expire
+            for entries in self._pending_restore.values():
+                entries[:] = [entry for entry in entries if entry[2] is None or entry[2] > now]
+            pending = {
+                name: [(key, value, None if deadline is None else deadline - now) for key, value, deadline in entries]
+                for name, entries in self._pending_restore.items()
+                if names is None or name in names
+            }
+        count = write_snapshot(path, selected, include=_snapshot_value, pending=pending)
+        logger.debug(f"Saved {count} cache entries to {path}")
+        return count
+
+    def load_snapshot(self, path: str | os.PathLike[str] | None = None, caches: Iterable[str] | None = None) -> int:
+        """Restore a snapshot into existing caches and keep the rest for caches created later.
+
+        Entries keep the TTL they had left when saved (counting the downtime);
+        expired entries and keys already cached are skipped. Entries of caches
+        that do not exist yet are applied when a cache with that name is
+        created. A missing or unreadable file restores nothing.
+
+        Args:
+            path: Snapshot file (defaults to CACHE_SNAPSHOT_PATH)
+            caches: Names of the caches to restore (defaults as in save_snapshot)
+
+        Returns:
+            Number of entries restored into existing caches
+
+        Raises:
+            ValueError: If no path is given or configured
+        """
+        path = self._snapshot_path(path)
+        names = self._snapshot_names(caches)
+        restored = pending = 0
+        try:
+            for name, key, value, ttl in read_snapshot(path):
+                if names is not None and name not in names:
+                    continue
+                with self._lock:
+                    cache = self._caches.get(name)
+                    if cache is None:
+                        deadline = None if ttl is None else time.monotonic() + ttl
+                        self._pending_restore.setdefault(name, []).append((key, value, deadline))
+                        pending += 1
+                        continue
+                if is_snapshotable(cache) and restore_entry(cache, key, value, ttl):
+                    restored += 1
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Failed to load cache snapshot {path}: {exc}")
+        logger.info(f"Restored {restored} cache entries from {path} ({pending} kept for caches not created yet)")
+        return restored
+
+    def enable_snapshots(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        interval: float | None = None,
+        caches: Iterable[str] | None = None,
+    ) -> int:
+        """Warm-start caches from a snapshot, then save one every interval seconds.
+
+        Call at startup before the service reports ready. Caches created
+        afterwards are warmed when they are registered (see load_snapshot).
+        disable_snapshots() stops saving and writes a final snapshot.
+
+        Args:
+            path: Snapshot file (defaults to CACHE_SNAPSHOT_PATH)
+            interval: Seconds between snapshots (defaults to CACHE_SNAPSHOT_INTERVAL, else 300)
+            caches: Names of the caches to persist (defaults as in save_snapshot)
+
+        Returns:
+            Number of entries restored into caches that already exist
+
+        Raises:
+            ValueError: If no path is given or configured
+        """
+        path = self._snapshot_path(path)
+        if interval is None:
+            interval = float(os.getenv(_SNAPSHOT_INTERVAL_ENV, _DEFAULT_SNAPSHOT_INTERVAL))
+        caches = None if caches is None else list(caches)
+
+        self.disable_snapshots(save=False)
+        restored = self.load_snapshot(path, caches)
+
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._snapshot_loop, args=(stop, path, interval, caches), name="cache-snapshots", daemon=True
+        )
+        with self._lock:
+            self._snapshot_stop, self._snapshot_thread = stop, thread
+            self._snapshot_args = (path, caches)
+        thread.start()
+        return restored
+
+    def _snapshot_loop(
+        self, stop: threading.Event, path: str | os.PathLike[str], interval: float, caches: list[str] | None
+    ) -> None:
+        while not stop.wait(interval):
+            try:
+                self.save_snapshot(path, caches)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Periodic cache snapshot to {path} failed: {exc}")
+
+    def disable_snapshots(self, save: bool = True) -> None:
+        """Stop periodic snapshots, writing a final one unless save is False."""
+        with self._lock:
+            thread, args = self._snapshot_thread, self._snapshot_args
+            self._snapshot_thread = self._snapshot_args = None
+            self._snapshot_stop.set()
+        if thread is None:
+            return
+        thread.join()
+        if save and args is not None:
+            try:
+                self.save_snapshot(*args)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Final cache snapshot to {args[0]} failed: {exc}")
+
 
 # Global cache manager instance
 cache_manager = CacheManager()
 
 
-def create_ttl_cache(name: str, max_size: int = 1000, ttl: int = 3600) -> TTLCache:
+def create_ttl_cache(name: str, max_size: int = 1000, ttl: int = 3600, max_bytes: int | None = None) -> TTLCache:
     """Convenience function to create a TTL cache."""
-    config = CacheConfig(max_size=max_size, ttl=ttl)
+    config = CacheConfig(max_size=max_size, ttl=ttl, max_bytes=max_bytes)
     return cache_manager.create_ttl_cache(name, config)
 
 
-def create_lru_cache(name: str, max_size: int = 1000) -> LRUCache:
+def create_lru_cache(name: str, max_size: int = 1000, max_bytes: int | None = None) -> LRUCache:
     """Convenience function to create an LRU cache."""
-    config = CacheConfig(max_size=max_size)
+    config = CacheConfig(max_size=max_size, max_bytes=max_bytes)
     return cache_manager.create_lru_cache(name, config)
 
 
+def create_tinylfu_cache(name: str, max_size: int = 1000, ttl: int = 3600) -> TinyLFUCache:
+    """Convenience function to create a W-TinyLFU cache."""
+    config = CacheConfig(max_size=max_size, ttl=ttl)
+    return cache_manager.create_tinylfu_cache(name, config)
+
+
 def get_cache_metrics(cache_name: str | None = None) -> dict[str, Any]:
     """Convenience function to get cache metrics."""
     return cache_manager.get_metrics(cache_name)
@@ -285,36 +643,268 @@ def clear_all_caches() -> None:
 
 
 # Cache decorator factory
-def cached(ttl: int = 3600, max_size: int = 1000, cache_name: str | None = None):
-    """Decorator factory for caching function results."""
+_MEMO_BACKENDS = ("ttl", "lru", "tinylfu", "redis")
+_MISSING = object()
 
-    def decorator(func):
-        cache_name = cache_name or f"function_{func.__name__}"
-        cache = create_ttl_cache(cache_name, max_size=max_size, ttl=ttl)
 
-        def wrapper(*args, **kwargs):
-            # Create cache key from args and kwargs
-            try:
-                # Simple key generation - in production, use a more robust method
-                key = str(hash((args, tuple(sorted(kwargs.items())))))
-            except TypeError:
-                # Fallback for unhashable arguments
-                key = str(args) + str(sorted(kwargs.items()))
+@dataclass(frozen=True)
+class _Expiring:
+    """Memoized entry with its own deadline (its TTL differs from the cache's)."""
+
+    value: Any
+    deadline: float  # time.monotonic()
+
+
+@dataclass(frozen=True)
+class _CachedError:
+    """Exception memoized as a negative result, re-raised on every hit."""
 
-            # Check cache
+    error: BaseException
+
+
+def _snapshot_value(value: Any) -> bool:
+    """Return whether a cached value can go into a snapshot (see CacheManager.save_snapshot)."""
+    return not isinstance(value, (_Expiring, _CachedError))
+
+
+def _is_none(value: Any) -> bool:
+    return value is None
+
+
+def _memo_cache(
+    manager: CacheManager,
+    backend: str,
+    name: str,
+    ttl: int | None,
+    max_size: int,
+    is_async: bool,
+    redis_config: RedisConfig | None,
+) -> Any:
+    config = CacheConfig(max_size=max_size, ttl=ttl or 0)
+    if backend == "ttl":
+        if not ttl:
+            raise ValueError("The ttl backend needs a positive ttl")
+        return manager.create_ttl_cache(name, config)
+    if backend == "lru":
+        return manager.create_lru_cache(name, config)
+    if backend == "tinylfu":
+        return manager.create_tinylfu_cache(name, config)
+    return manager.create_redis_cache(name, redis_config, fallback_config=config, async_=is_async)
+
+
+def _memo_load(cache: Any, key: str) -> Any:
+    if isinstance(cache, RedisCache):
+        return cache.get(key, _MISSING)
+    entry = cache.get(key, _MISSING)
+    if isinstance(entry, _Expiring):
+        if entry.deadline <= time.monotonic():
+            cache.pop(key, None)
+            return _MISSING
+        return entry.value
+    return entry
+
+
+def _memo_store(cache: Any, key: str, entry: Any, ttl: int | None) -> None:
+    try:
+        if isinstance(cache, RedisCache):
+            cache.set(key, entry, ttl)
+            return
+        if ttl is not None and ttl != getattr(cache, "ttl", None):
+            entry = _Expiring(entry, time.monotonic() + ttl)
+        cache[key] = entry
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(f"Could not store memoized result for {key}: {exc}")
+
+
+async def _memo_aload(cache: Any, key: str) -> Any:
+    if isinstance(cache, AsyncRedisCache):
+        return await cache.get(key, _MISSING)
+    return _memo_load(cache, key)
+
+
+async def _memo_astore(cache: Any, key: str, entry: Any, ttl: int | None) -> None:
+    if isinstance(cache, AsyncRedisCache):
+        try:
+            await cache.set(key, entry, ttl)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Could not store memoized result for {key}: {exc}")
+        return
+    _memo_store(cache, key, entry, ttl)
+
+
+def _fresh_error(error: BaseException) -> BaseException:
+    """Return a copy of error without its traceback.
+
+    Raising one stored exception object again and again would keep appending
+    frames to its __traceback__ (and keep them alive for negative_ttl).
+    """
+    try:
+        fresh = copy.copy(error)
+    except Exception:  # noqa: BLE001
+        fresh = error  # Not reconstructible from its args: at least drop the frames
+    return fresh.with_traceback(None)
+
+
+def _memo_result(entry: Any) -> Any:
+    if isinstance(entry, _CachedError):
+        raise _fresh_error(entry.error)
+    return entry
+
+
+def cached(
+    ttl: int | None = 3600,
+    max_size: int = 1000,
+    cache_name: str | None = None,
+    *,
+    backend: str = "ttl",
+    key: Callable[..., Any] | None = None,
+    ignore: Iterable[str] = (),
+    negative_ttl: int | None = None,
+    is_negative: Callable[[Any], bool] = _is_none,
+    negative_exceptions: tuple[type[BaseException], ...] = (),
+    redis_config: RedisConfig | None = None,
+    manager: CacheManager | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator factory memoizing sync and async functions.
+
+    Keys are stable across processes and replicas: a BLAKE2b digest of the
+    canonical encoding of the bound arguments (see keys.key_builder). Calls
+    whose arguments have no stable encoding run uncached. Concurrent calls
+    with the same key share a single execution.
+
+    Negative results (is_negative(result), None by default) and exceptions
+    listed in negative_exceptions are kept for negative_ttl seconds instead
+    of ttl (None: same as ttl, 0: not cached). With the "ttl" and "tinylfu"
+    backends an entry never outlives the cache's own ttl.
+
+    Args:
+        ttl: Lifetime of results in seconds (None: no expiry, lru/redis only)
+        max_size: Maximum number of entries (in-process backends and the Redis fallback)
+        cache_name: Name registered with the cache manager (default "function_<name>")
+        backend: "ttl", "lru", "tinylfu" or "redis" (shared across replicas;
+            async functions get an AsyncRedisCache)
+        key: Custom key function called with the function's arguments
+        ignore: Parameter names left out of the key (e.g. "self")
+        negative_ttl: Lifetime of negative results
+        is_negative: Predicate marking a result as negative
+        negative_exceptions: Exception types cached as negative results
+        redis_config: Connection settings for the redis backend
+        manager: Cache manager owning the cache (default: the global one)
+    """
+    if backend not in _MEMO_BACKENDS:
+        raise ValueError(f"backend must be one of {_MEMO_BACKENDS}")
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        owner = manager or cache_manager
+        name = cache_name or f"function_{func.__name__}"
+        is_async = inspect.iscoroutinefunction(func)
+        cache = _memo_cache(owner, backend, name, ttl, max_size, is_async, redis_config)
+        make_key = key_builder(func, key=key, ignore=ignore)
+        in_flight: dict[Any, Any] = {}
+        in_flight_lock = threading.Lock()
+
+        def key_for(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str | None:
+            try:
+                return make_key(*args, **kwargs)
+            except TypeError as exc:
+                logger.debug(f"Calling {func.__qualname__} uncached: {exc}")
+                return None
+
+        def outcome(result: Any = None, error: BaseException | None = None) -> tuple[Any, int | None] | None:
+            """Return the (entry, ttl) to store for a call's outcome, or None to skip it."""
+            if error is not None:
+                if not isinstance(error, negative_exceptions):
+                    return None
+                entry, negative = _CachedError(_fresh_error(error)), True
+            else:
+                entry, negative = result, is_negative(result)
+            entry_ttl = negative_ttl if negative and negative_ttl is not None else ttl
+            if entry_ttl == 0:
+                return None
+            return entry, entry_ttl
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache_key = key_for(args, kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
+
+            entry = _memo_load(cache, cache_key)
+            if entry is not _MISSING:
+                owner.record_hit(name)
+                return _memo_result(entry)
+
+            with in_flight_lock:
+                future = in_flight.get(cache_key)
+                leader = future is None
+                if leader:
+                    future = in_flight[cache_key] = Future()
+            if not leader:
+                # Served by the call already running for this key
+                owner.record_hit(name)
+                return future.result()
+
+            owner.record_miss(name)
             try:
-                result = cache[key]
-                cache_manager.record_hit(cache_name)
-                return result
-            except KeyError:
-                cache_manager.record_miss(cache_name)
                 result = func(*args, **kwargs)
-                cache[key] = result
+            except BaseException as exc:
+                stored = outcome(error=exc)
+                if stored is not None:
+                    _memo_store(cache, cache_key, *stored)
+                future.set_exception(exc)
+                raise
+            else:
+                stored = outcome(result=result)
+                if stored is not None:
+                    _memo_store(cache, cache_key, *stored)
+                future.set_result(result)
                 return result
+            finally:
+                with in_flight_lock:
+                    in_flight.pop(cache_key, None)
 
-        wrapper.cache = cache
-        wrapper.cache_name = cache_name
-        wrapper.cache_manager = cache_manager
-        return wrapper
+        async def run(cache_key: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as exc:
+                stored = outcome(error=exc)
+                if stored is not None:
+                    await _memo_astore(cache, cache_key, *stored)
+                raise
+            stored = outcome(result=result)
+            if stored is not None:
+                await _memo_astore(cache, cache_key, *stored)
+            return result
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache_key = key_for(args, kwargs)
+            if cache_key is None:
+                return await func(*args, **kwargs)
+
+            entry = await _memo_aload(cache, cache_key)
+            if entry is not _MISSING:
+                owner.record_hit(name)
+                return _memo_result(entry)
+
+            # Tasks belong to one event loop: share calls per loop
+            flight_key = (id(asyncio.get_running_loop()), cache_key)
+            task = in_flight.get(flight_key)
+            if task is None:
+                owner.record_miss(name)
+                task = asyncio.ensure_future(run(cache_key, args, kwargs))
+                in_flight[flight_key] = task
+                task.add_done_callback(lambda _task: in_flight.pop(flight_key, None))
+            else:
+                owner.record_hit(name)
+            # Shielded: a cancelled caller does not cancel the call others are waiting on
+            return await asyncio.shield(task)
+
+        memoized = async_wrapper if is_async else wrapper
+        memoized.cache = cache
+        memoized.cache_name = name
+        memoized.cache_manager = owner
+        memoized.cache_key = make_key
+        return memoized
 
     return decorator
@@ -0,0 +1,245 @@
+"""Value codecs for the Redis cache backends.
+
+A codec pairs a serializer (pickle, json, orjson, msgpack) with an optional
+compressor (zlib, zstd, lz4) applied to payloads above a size threshold.
+Every encoded value starts with one header byte naming the serializer and
+compressor that produced it, so values written with different settings, and
+values written before headers existed, all decode correctly.
+
+Header bytes are 0xC0 | serializer_id << 3 | compressor_id. Legacy pickle
+payloads start with 0x80 and legacy JSON with an ASCII character, so neither
+can be mistaken for a header.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+    lz4_frame = None
+
+
+logger = logging.getLogger(__name__)
+
+_HEADER_BASE = 0xC0
+DEFAULT_COMPRESS_THRESHOLD = 1024  # Bytes; smaller payloads are stored uncompressed
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """A registered value serializer."""
+
+    name: str
+    codec_id: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    """A registered payload compressor."""
+
+    name: str
+    codec_id: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+_serializers: dict[str, Serializer] = {}
+_compressors: dict[str, Compressor] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """Register a serializer under its name and header id (0-7)."""
+    if not 0 <= serializer.codec_id <= 7:
+        raise ValueError("Serializer id must be between 0 and 7")
+    _serializers[serializer.name] = serializer
+
+
+def register_compressor(compressor: Compressor) -> None:
+    """Register a compressor under its name and header id (1-7; 0 means uncompressed)."""
+    if not 1 <= compressor.codec_id <= 7:
+        raise ValueError("Compressor id must be between 1 and 7")
+    _compressors[compressor.name] = compressor
+
+
+def available_serializers() -> list[str]:
+    """Return the names of the registered serializers."""
+    return sorted(_serializers)
+
+
+def available_compressors() -> list[str]:
+    """Return the names of the registered compressors."""
+    return sorted(_compressors)
+
+
+register_serializer(Serializer("pickle", 0, pickle.dumps, pickle.loads))
+register_serializer(Serializer("json", 1, lambda value: json.dumps(value).encode("utf-8"), json.loads))
+if ORJSON_AVAILABLE:
+    register_serializer(Serializer("orjson", 2, orjson.dumps, orjson.loads))
+if MSGPACK_AVAILABLE:
+    register_serializer(
+        Serializer(
+            "msgpack",
+            3,
+            lambda value: msgpack.packb(value, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False),
+        )
+    )
+
+register_compressor(Compressor("zlib", 1, zlib.compress, zlib.decompress))
+if ZSTD_AVAILABLE:
+    # Module-level functions use a new context per call: ZstdCompressor/ZstdDecompressor
+    # instances must not be shared between threads
+    register_compressor(Compressor("zstd", 2, zstandard.compress, zstandard.decompress))
+if LZ4_AVAILABLE:
+    register_compressor(Compressor("lz4", 3, lz4_frame.compress, lz4_frame.decompress))
+
+
+class CacheCodec:
+    """Encode and decode cache values with a header-tagged format.
+
+    Payloads of at least compress_threshold bytes are compressed, and the
+    compressed form is kept only if it is smaller. Decoding reads the header
+    byte, so any registered serializer/compressor combination can be read back
+    regardless of the codec's own settings.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "pickle",
+        compression: str | None = None,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    ) -> None:
+        """Initialize the codec.
+
+        Args:
+            serializer: Name of a registered serializer
+            compression: Name of a registered compressor, or None to disable
+            compress_threshold: Minimum serialized size in bytes to compress
+
+        Raises:
+            ValueError: If the serializer or compressor is not registered
+        """
+        if serializer not in _serializers:
+            raise ValueError(f"Unsupported serializer: {serializer}")
+        if compression is not None and compression not in _compressors:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self.serializer = _serializers[serializer]
+        self.compressor = _compressors[compression] if compression else None
+        self.compress_threshold = compress_threshold
+        # Values written before headers were introduced use the configured serializer
+        self._legacy = self.serializer if serializer in ("pickle", "json") else _serializers["pickle"]
+        self._by_id = {entry.codec_id: entry for entry in _serializers.values()}
+        self._compressors_by_id = {entry.codec_id: entry for entry in _compressors.values()}
+
+        self._stats_lock = threading.Lock()
+        self._encoded = 0
+        self._decoded = 0
+        self._compressed = 0
+        self._raw_bytes = 0
+        self._stored_bytes = 0
+        self._encode_seconds = 0.0
+        self._decode_seconds = 0.0
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize (and possibly compress) a value, prefixed with its header byte."""
+        start = time.perf_counter()
+        payload = self.serializer.dumps(value)
+        raw_size = len(payload)
+        compressor_id = 0
+        if self.compressor and raw_size >= self.compress_threshold:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < raw_size:
+                payload = compressed
+                compressor_id = self.compressor.codec_id
+        data = bytes((_HEADER_BASE | self.serializer.codec_id << 3 | compressor_id,)) + payload
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._encoded += 1
+            self._compressed += compressor_id != 0
+            self._raw_bytes += raw_size
+            self._stored_bytes += len(data)
+            self._encode_seconds += elapsed
+        return data
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a value written by any codec, or a legacy header-less value."""
+        start = time.perf_counter()
+        if data and data[0] >= _HEADER_BASE:
+            header = data[0]
+            serializer = self._by_id.get(header >> 3 & 0x7)
+            if serializer is None:
+                raise ValueError(f"Unknown serializer in cache header {header:#x}")
+            payload = data[1:]
+            compressor_id = header & 0x7
+            if compressor_id:
+                compressor = self._compressors_by_id.get(compressor_id)
+                if compressor is None:
+                    raise ValueError(f"Unknown compressor in cache header {header:#x}")
+                payload = compressor.decompress(payload)
+            value = serializer.loads(payload)
+        else:
+            value = self._legacy.loads(data)
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._decoded += 1
+            self._decode_seconds += elapsed
+        return value
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return compression ratio and average encode/decode times (milliseconds)."""
+        with self._stats_lock:
+            return {
+                "serializer": self.serializer.name,
+                "compression": self.compressor.name if self.compressor else None,
+                "encoded": self._encoded,
+                "decoded": self._decoded,
+                "compressed": self._compressed,
+                "raw_bytes": self._raw_bytes,
+                "stored_bytes": self._stored_bytes,
+                "compression_ratio": self._raw_bytes / self._stored_bytes if self._stored_bytes else 1.0,
+                "avg_encode_ms": self._encode_seconds * 1000 / self._encoded if self._encoded else 0.0,
+                "avg_decode_ms": self._decode_seconds * 1000 / self._decoded if self._decoded else 0.0,
+            }
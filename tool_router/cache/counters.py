@@ -0,0 +1,88 @@
+"""Low-contention hit/miss/eviction counters.
+
+Every thread increments its own cell, so recording a hit takes no lock and
+threads never wait on each other. Readers sum the cells on demand and derive
+the hit rate at read time; cells of finished threads are folded into a
+running total so the cell list stays bounded by the number of live threads.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+
+from .types import CacheMetrics
+
+
+_HITS, _MISSES, _EVICTIONS = range(3)
+
+
+class CacheCounters:
+    """Per-thread counters for one cache, aggregated lazily by snapshot()."""
+
+    __slots__ = ("_cells", "_local", "_lock", "_retired", "last_reset_time")
+
+    def __init__(self) -> None:
+        self.last_reset_time = time.time()
+        self._local = threading.local()
+        self._cells: list[tuple[weakref.ref[threading.Thread], list[int]]] = []
+        self._retired = [0, 0, 0]
+        self._lock = threading.Lock()  # Guards the cell list only, never taken when counting
+
+    def _new_cell(self) -> list[int]:
+        cell = [0, 0, 0]
+        self._local.cell = cell
+        with self._lock:
+            self._cells.append((weakref.ref(threading.current_thread()), cell))
+        return cell
+
+    def hit(self) -> None:
+        """Count a hit."""
+        try:
+            self._local.cell[_HITS] += 1
+        except AttributeError:
+            self._new_cell()[_HITS] += 1
+
+    def miss(self) -> None:
+        """Count a miss."""
+        try:
+            self._local.cell[_MISSES] += 1
+        except AttributeError:
+            self._new_cell()[_MISSES] += 1
+
+    def eviction(self) -> None:
+        """Count an eviction."""
+        try:
+            self._local.cell[_EVICTIONS] += 1
+        except AttributeError:
+            self._new_cell()[_EVICTIONS] += 1
+
+    def snapshot(self) -> CacheMetrics:
+        """Return the summed counters with the hit rate computed from them."""
+        with self._lock:
+            totals = self._retired.copy()
+            live = []
+            for thread_ref, cell in self._cells:
+                counts = cell.copy()
+                for i, count in enumerate(counts):
+                    totals[i] += count
+                thread = thread_ref()
+                if thread is not None and thread.is_alive():
+                    live.append((thread_ref, cell))
+                else:
+                    # The thread is gone, so its cell can no longer change
+                    for i, count in enumerate(counts):
+                        self._retired[i] += count
+            self._cells = live
+
+        hits, misses, evictions = totals
+        total_requests = hits + misses
+        return CacheMetrics(
+            hits=hits,
+            misses=misses,
+            evictions=evictions,
+            total_requests=total_requests,
+            hit_rate=hits / total_requests if total_requests else 0.0,
+            last_reset_time=self.last_reset_time,
+        )
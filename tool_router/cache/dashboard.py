@@ -10,7 +10,9 @@ from dataclasses import dataclass
 from typing import Any
 
 from .cache_manager import CacheManager
+from .counters import CacheCounters
 from .redis_cache import RedisCache
+from .sizing import ByteBoundedCache, estimate_cache_bytes
 from .types import CacheMetrics
 
 
@@ -36,6 +38,7 @@ class CachePerformanceMetrics:
     current_size: int = 0
     max_size: int = 0
     memory_usage: int = 0  # bytes
+    memory_budget: int = 0  # bytes, byte-bounded caches only
 
     # Performance timing
     avg_get_time: float = 0.0  # milliseconds
@@ -47,6 +50,11 @@ class CachePerformanceMetrics:
     redis_memory_usage: int = 0  # bytes
     redis_key_count: int = 0
 
+    # Codec metrics (Redis backends)
+    compression_ratio: float = 1.0  # serialized bytes / stored bytes
+    avg_encode_time: float = 0.0  # milliseconds
+    avg_decode_time: float = 0.0  # milliseconds
+
     # Invalidation metrics
     invalidations_count: int = 0
     last_invalidation_time: float | None = None
@@ -98,6 +106,8 @@ class CachePerformanceCollector:
         with self._lock:
             cache = self.cache_manager.get_cache(cache_name)
             metrics = self.cache_manager._metrics.get(cache_name, CacheMetrics())
+            if isinstance(metrics, CacheCounters):
+                metrics = metrics.snapshot()
 
             # Basic metrics
             hit_rate = (metrics.hits / max(metrics.total_requests, 1)) * 100
@@ -113,6 +123,7 @@ class CachePerformanceCollector:
             current_size = 0
             max_size = 0
             memory_usage = 0
+            memory_budget = 0
 
             if hasattr(cache, "__len__"):
                 try:
@@ -120,13 +131,20 @@ class CachePerformanceCollector:
                 except:
                     current_size = 0
 
-            if hasattr(cache, "maxsize"):
-                max_size = cache.maxsize
+            if isinstance(cache, ByteBoundedCache):
+                # maxsize is a byte budget, not an entry count
+                memory_usage = int(cache.currsize)
+                memory_budget = int(cache.maxsize)
+            else:
+                if hasattr(cache, "maxsize"):
+                    max_size = cache.maxsize
+                memory_usage = estimate_cache_bytes(cache)
 
             # Redis-specific metrics
             redis_connected = False
             redis_memory_usage = 0
             redis_key_count = 0
+            codec_stats = {}
 
             if isinstance(cache, RedisCache):
                 redis_connected = cache._is_healthy
@@ -134,6 +152,7 @@ class CachePerformanceCollector:
                     info = cache.get_info()
                     redis_memory_usage = info.get("memory_usage", 0)
                     redis_key_count = info.get("key_count", 0)
+                    codec_stats = info.get("codec", {})
                 except Exception as e:
                     logger.warning(f"Failed to get Redis info: {e}")
 
@@ -161,12 +180,16 @@ class CachePerformanceCollector:
                 current_size=current_size,
                 max_size=max_size,
                 memory_usage=memory_usage,
+                memory_budget=memory_budget,
                 avg_get_time=avg_get_time,
                 avg_set_time=avg_set_time,
                 avg_delete_time=avg_delete_time,
                 redis_connected=redis_connected,
                 redis_memory_usage=redis_memory_usage,
                 redis_key_count=redis_key_count,
+                compression_ratio=codec_stats.get("compression_ratio", 1.0),
+                avg_encode_time=codec_stats.get("avg_encode_ms", 0.0),
+                avg_decode_time=codec_stats.get("avg_decode_ms", 0.0),
                 health_status=health_status,
                 last_health_check=time.time(),
             )
@@ -238,8 +261,8 @@ class CacheAlertManager:
                     self._alerts[alert_id] = alert
 
             # Check memory usage
-            if metrics.max_size > 0:
-                usage_percent = (metrics.current_size / metrics.max_size) * 100
+            usage_percent = self._usage_percent(metrics)
+            if usage_percent is not None:
                 if usage_percent > self._alert_rules["memory_usage"]["threshold"]:
                     alert_id = f"memory_usage_{metrics.cache_name}"
                     if alert_id not in self._alerts or not self._alerts[alert_id].resolved:
@@ -248,7 +271,7 @@ class CacheAlertManager:
                             alert_type="memory_usage",
                             severity=self._alert_rules["memory_usage"]["severity"],
                             message=f"High memory usage: {usage_percent:.1f}%",
-                            cache_name=cache_name,
+                            cache_name=metrics.cache_name,
                             timestamp=metrics.timestamp,
                         )
                         alerts.append(alert)
@@ -294,8 +317,7 @@ class CacheAlertManager:
                 elif alert.alert_type == "low_hit_rate":
                     should_resolve = metrics.hit_rate >= self._alert_rules["low_hit_rate"]["threshold"]
                 elif alert.alert_type == "memory_usage":
-                    if metrics.max_size > 0:
-                        usage_percent = (metrics.current_size / metrics.max_size) * 100
+                    if usage_percent is not None:
                         should_resolve = usage_percent <= self._alert_rules["memory_usage"]["threshold"]
                 elif alert.alert_type == "connection_error":
                     should_resolve = metrics.redis_connected
@@ -308,6 +330,15 @@ class CacheAlertManager:
 
         return alerts
 
+    @staticmethod
+    def _usage_percent(metrics: CachePerformanceMetrics) -> float | None:
+        """Capacity used, in bytes for byte-bounded caches and entries otherwise."""
+        if metrics.memory_budget > 0:
+            return (metrics.memory_usage / metrics.memory_budget) * 100
+        if metrics.max_size > 0:
+            return (metrics.current_size / metrics.max_size) * 100
+        return None
+
     def get_active_alerts(self) -> list[Alert]:
         """Get all active alerts."""
         with self._lock:
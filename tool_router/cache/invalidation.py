@@ -7,11 +7,13 @@ import threading
 import time
 from collections import defaultdict
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from typing import Any
 
 from .cache_manager import CacheManager
+from .redis_cache import RedisCache
+from .tag_index import RedisTagIndex
 
 
 logger = logging.getLogger(__name__)
@@ -60,10 +62,18 @@ class CacheDependency:
 
 
 class TagInvalidationManager:
-    """Manages tag-based cache invalidation."""
+    """Manages tag-based cache invalidation.
 
-    def __init__(self, cache_manager: CacheManager):
+    By default tag membership is tracked in this process. With a
+    RedisTagIndex it is shared by all replicas: tags added anywhere can be
+    invalidated from any node, and keys of Redis-backed caches are unlinked
+    in pipelined batches (tiered caches also drop them from every replica's
+    L1). Tag descriptions and invalidation counts stay per process.
+    """
+
+    def __init__(self, cache_manager: CacheManager, index: RedisTagIndex | None = None):
         self.cache_manager = cache_manager
+        self.index = index
         self._tags: dict[str, CacheTag] = {}
         self._key_to_tags: dict[str, set[str]] = defaultdict(set)
         self._lock = threading.RLock()
@@ -80,12 +90,20 @@ class TagInvalidationManager:
             logger.info(f"Created cache tag: {name}")
             return tag
 
-    def add_to_tag(self, tag_name: str, cache_key: str) -> bool:
-        """Add a cache key to a tag."""
+    def add_to_tag(self, tag_name: str, cache_key: str, ttl: int | None = None) -> bool:
+        """Add a cache key to a tag (ttl: lifetime of the shared index entry)."""
         with self._lock:
             if tag_name not in self._tags:
                 self.create_tag(tag_name)
 
+            if self.index is not None:
+                try:
+                    self.index.add(tag_name, [cache_key], ttl)
+                except Exception as e:
+                    logger.error(f"Failed to add cache key '{cache_key}' to tag '{tag_name}': {e}")
+                    return False
+                return True
+
             self._tags[tag_name].cache_keys.add(cache_key)
             self._key_to_tags[cache_key].add(tag_name)
             logger.debug(f"Added cache key '{cache_key}' to tag '{tag_name}'")
@@ -93,6 +111,9 @@ class TagInvalidationManager:
 
     def invalidate_tag(self, tag_name: str, reason: str | None = None) -> int:
         """Invalidate all cache entries associated with a tag."""
+        if self.index is not None:
+            return self._invalidate_indexed_tag(tag_name, reason)
+
         with self._lock:
             if tag_name not in self._tags:
                 logger.warning(f"Tag '{tag_name}' not found for invalidation")
@@ -128,6 +149,46 @@ class TagInvalidationManager:
 
             return invalidated_count
 
+    def _invalidate_indexed_tag(self, tag_name: str, reason: str | None) -> int:
+        """Invalidate a tag through the shared index, one batch of keys at a time."""
+        invalidated_count = 0
+        try:
+            for cache_keys in self.index.pop_members(tag_name):
+                invalidated_count += self._delete_keys(cache_keys)
+        except Exception as e:
+            logger.error(f"Failed to invalidate tag '{tag_name}' after {invalidated_count} entries: {e}")
+
+        with self._lock:
+            if tag_name not in self._tags:
+                self.create_tag(tag_name)
+            self._tags[tag_name].invalidation_count += 1
+
+        logger.info(f"Invalidated tag '{tag_name}': {invalidated_count} cache entries")
+        if reason:
+            logger.info(f"Invalidation reason: {reason}")
+        return invalidated_count
+
+    def _delete_keys(self, cache_keys: list[str]) -> int:
+        """Delete keys from their caches, batching per Redis-backed cache."""
+        by_cache: dict[str, list[str]] = defaultdict(list)
+        for cache_key in cache_keys:
+            by_cache[self._extract_cache_name(cache_key)].append(cache_key)
+
+        deleted = 0
+        for cache_name, keys in by_cache.items():
+            cache = self.cache_manager.get_cache(cache_name)
+            if isinstance(cache, RedisCache):
+                cache.delete_many(keys)
+                deleted += len(keys)
+            elif cache is not None and hasattr(cache, "delete"):
+                for cache_key in keys:
+                    try:
+                        cache.delete(cache_key)
+                        deleted += 1
+                    except Exception as e:
+                        logger.error(f"Failed to invalidate cache key '{cache_key}': {e}")
+        return deleted
+
     def invalidate_multiple_tags(self, tag_names: list[str], reason: str | None = None) -> int:
         """Invalidate multiple tags."""
         total_invalidated = 0
@@ -137,14 +198,25 @@ class TagInvalidationManager:
 
     def get_tag_info(self, tag_name: str) -> CacheTag | None:
         """Get information about a tag."""
-        return self._tags.get(tag_name)
+        if self.index is None:
+            return self._tags.get(tag_name)
+        cache_keys = self.index.members(tag_name)
+        tag = self._tags.get(tag_name)
+        if tag is None:
+            return CacheTag(name=tag_name, cache_keys=cache_keys) if cache_keys else None
+        return replace(tag, cache_keys=cache_keys)
 
     def list_tags(self) -> list[CacheTag]:
         """List all tags."""
-        return list(self._tags.values())
+        if self.index is None:
+            return list(self._tags.values())
+        tags = (self.get_tag_info(name) for name in set(self._tags) | self.index.tags())
+        return [tag for tag in tags if tag is not None]
 
     def get_tags_for_key(self, cache_key: str) -> set[str]:
         """Get all tags associated with a cache key."""
+        if self.index is not None:
+            return self.index.tags_for(cache_key)
         return self._key_to_tags.get(cache_key, set())
 
     def _extract_cache_name(self, cache_key: str) -> str:
@@ -288,9 +360,9 @@ class DependencyInvalidationManager:
 class AdvancedInvalidationManager:
     """Advanced cache invalidation manager combining multiple strategies."""
 
-    def __init__(self, cache_manager: CacheManager):
+    def __init__(self, cache_manager: CacheManager, tag_index: RedisTagIndex | None = None):
         self.cache_manager = cache_manager
-        self.tag_manager = TagInvalidationManager(cache_manager)
+        self.tag_manager = TagInvalidationManager(cache_manager, tag_index)
         self.event_manager = EventInvalidationManager(cache_manager)
         self.dependency_manager = DependencyInvalidationManager(cache_manager)
 
@@ -338,7 +410,7 @@ class AdvancedInvalidationManager:
     ) -> bool:
         """Create a cache entry with tags."""
         cache = self.cache_manager.get_cache(cache_name)
-        if not cache:
+        if cache is None:
             logger.error(f"Cache '{cache_name}' not found")
             return False
 
@@ -349,7 +421,7 @@ class AdvancedInvalidationManager:
 
         # Add to tags
         for tag in tags:
-            self.tag_manager.add_to_tag(tag, full_key)
+            self.tag_manager.add_to_tag(tag, full_key, ttl)
 
         return True
 
@@ -0,0 +1,132 @@
+"""Stable cache keys for memoized calls.
+
+Arguments are reduced to a canonical byte encoding (type-tagged and
+length-prefixed, dict and set items sorted) and hashed with BLAKE2b, so the
+same call produces the same key in every process and on every replica,
+unlike ``hash()``, which is salted per process for str and bytes.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import decimal
+import hashlib
+import inspect
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from enum import Enum
+from pathlib import PurePath
+from typing import Any
+
+
+_DIGEST_SIZE = 16  # 128-bit keys: collisions are negligible at cache scale
+_STR_LIKE = (dt.date, dt.time, dt.timedelta, decimal.Decimal, uuid.UUID, PurePath)
+
+
+def _type_name(value: Any) -> bytes:
+    cls = type(value)
+    return f"{cls.__module__}.{cls.__qualname__}".encode()
+
+
+def _first(pair: tuple[bytes, Any]) -> bytes:
+    return pair[0]
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out += b"N"
+    elif isinstance(value, bool):
+        out += b"T" if value else b"F"
+    elif isinstance(value, Enum):
+        name = _type_name(value)
+        out += b"E%d:%s" % (len(name), name)
+        _encode(value.value, out)
+    elif isinstance(value, int):
+        out += b"i%d;" % value
+    elif isinstance(value, float):
+        out += b"f%s;" % repr(value).encode()
+    elif isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        out += b"s%d:%s" % (len(data), data)
+    elif isinstance(value, bytes | bytearray | memoryview):
+        data = bytes(value)
+        out += b"b%d:%s" % (len(data), data)
+    elif isinstance(value, list | tuple):
+        out += b"%s%d:" % (b"l" if isinstance(value, list) else b"t", len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, Mapping):
+        out += b"d%d:" % len(value)
+        for key, item in sorted(((canonical_encode(key), item) for key, item in value.items()), key=_first):
+            out += key
+            _encode(item, out)
+    elif isinstance(value, set | frozenset):
+        out += b"S%d:" % len(value)
+        for item in sorted(canonical_encode(item) for item in value):
+            out += item
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        name = _type_name(value)
+        out += b"D%d:%s" % (len(name), name)
+        _encode({field.name: getattr(value, field.name) for field in dataclasses.fields(value)}, out)
+    elif hasattr(value, "model_dump") and not isinstance(value, type):
+        # Pydantic models
+        name = _type_name(value)
+        out += b"P%d:%s" % (len(name), name)
+        _encode(value.model_dump(), out)
+    elif isinstance(value, _STR_LIKE):
+        name, text = _type_name(value), str(value).encode()
+        out += b"o%d:%s%d:%s" % (len(name), name, len(text), text)
+    else:
+        raise TypeError(f"Cannot build a stable cache key from {type(value).__name__}")
+
+
+def canonical_encode(value: Any) -> bytes:
+    """Encode value deterministically (equal structures give equal bytes).
+
+    Raises:
+        TypeError: For objects without a stable encoding (e.g. arbitrary class
+            instances whose repr contains their address)
+    """
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def stable_hash(value: Any) -> str:
+    """Return the hex BLAKE2b digest of value's canonical encoding."""
+    return hashlib.blake2b(canonical_encode(value), digest_size=_DIGEST_SIZE).hexdigest()
+
+
+def key_builder(
+    func: Callable[..., Any],
+    key: Callable[..., Any] | None = None,
+    ignore: Iterable[str] = (),
+) -> Callable[..., str]:
+    """Return a function mapping a call's arguments to func's cache key.
+
+    Keys are ``<module>.<qualname>:<digest>``. By default the digest covers
+    the bound arguments with defaults applied, so ``f(1)``, ``f(a=1)`` and
+    ``f(1, b=<default>)`` share an entry.
+
+    Args:
+        func: The memoized function
+        key: Custom key function called with the same arguments; its result is hashed
+        ignore: Parameter names left out of the key (e.g. "self", clients)
+    """
+    prefix = f"{func.__module__}.{func.__qualname__}:"
+    if key is not None:
+        return lambda *args, **kwargs: prefix + stable_hash(key(*args, **kwargs))
+
+    ignored = frozenset(ignore)
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return lambda *args, **kwargs: prefix + stable_hash((args, kwargs))
+
+    def build(*args: Any, **kwargs: Any) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return prefix + stable_hash({name: value for name, value in bound.arguments.items() if name not in ignored})
+
+    return build
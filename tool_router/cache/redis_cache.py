@@ -2,13 +2,12 @@
 
 from __future__ import annotations
 
-import json
 import logging
-import pickle
 import threading
 import time
+from collections.abc import Callable
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Any
 
 
@@ -22,11 +21,16 @@ except ImportError:
 
 from cachetools import TTLCache
 
+from .codecs import DEFAULT_COMPRESS_THRESHOLD, CacheCodec
+from .stampede import RedisLock, get_or_compute
 from .types import CacheConfig
 
 
 logger = logging.getLogger(__name__)
 
+_SCAN_BATCH_SIZE = 500  # Keys requested per SCAN call and unlinked per pipeline
+_GLOB_SPECIAL = str.maketrans({char: f"\\{char}" for char in "*?[]\\"})
+
 
 @dataclass
 class RedisConfig:
@@ -44,6 +48,20 @@ class RedisConfig:
     connection_pool_kwargs: dict[str, Any] | None = None
 
 
+@dataclass
+class ClearProgress:
+    """Progress of a SCAN/UNLINK pass over the keys matching a pattern."""
+
+    pattern: str
+    scanned: int = 0
+    deleted: int = 0
+    batches: int = 0
+    started_at: float = 0.0
+    finished_at: float | None = None
+    running: bool = True
+    error: str | None = None
+
+
 class RedisCache:
     """Redis-based cache implementation with fallback to TTLCache."""
 
@@ -52,16 +70,20 @@ class RedisCache:
         config: RedisConfig,
         fallback_cache: TTLCache | None = None,
         key_prefix: str = "mcp_cache:",
-        serializer: str = "pickle",  # "pickle" or "json"
+        serializer: str = "pickle",  # "pickle", "json", "orjson" or "msgpack"
+        compression: str | None = None,  # "zlib", "zstd", "lz4" or None
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
     ):
         self.config = config
         self.key_prefix = key_prefix
         self.serializer = serializer
+        self.codec = CacheCodec(serializer, compression=compression, compress_threshold=compress_threshold)
         self.fallback_cache = fallback_cache
         self._redis_client = None
         self._connection_lock = threading.Lock()
         self._last_health_check = 0
         self._is_healthy = False
+        self._clear_progress: ClearProgress | None = None
 
         # Initialize Redis connection
         self._init_redis()
@@ -111,11 +133,7 @@ class RedisCache:
     def _serialize(self, value: Any) -> bytes:
         """Serialize value for Redis storage."""
         try:
-            if self.serializer == "pickle":
-                return pickle.dumps(value)
-            if self.serializer == "json":
-                return json.dumps(value).encode("utf-8")
-            raise ValueError(f"Unsupported serializer: {self.serializer}")
+            return self.codec.encode(value)
         except Exception as e:
             logger.error(f"Failed to serialize value: {e}")
             raise
@@ -123,11 +141,7 @@ class RedisCache:
     def _deserialize(self, value: bytes) -> Any:
         """Deserialize value from Redis storage."""
         try:
-            if self.serializer == "pickle":
-                return pickle.loads(value)
-            if self.serializer == "json":
-                return json.loads(value.decode("utf-8"))
-            raise ValueError(f"Unsupported serializer: {self.serializer}")
+            return self.codec.decode(value)
         except Exception as e:
             logger.error(f"Failed to deserialize value: {e}")
             raise
@@ -200,15 +214,15 @@ class RedisCache:
 
                 if success:
                     # Also set in fallback cache for resilience
-                    if self.fallback_cache:
-                        self.fallback_cache.set(key, value, ttl)
+                    if self.fallback_cache is not None:
+                        self.fallback_cache[key] = value
                     return True
         except (ConnectionError, Exception) as e:
             logger.debug(f"Redis set failed for key {key}: {e}")
 
         # Fallback to local cache only
-        if self.fallback_cache:
-            self.fallback_cache.set(key, value, ttl)
+        if self.fallback_cache is not None:
+            self.fallback_cache[key] = value
             return True
 
         return False
@@ -234,28 +248,133 @@ class RedisCache:
 
         return success
 
-    def clear(self) -> bool:
-        """Clear all cache entries."""
-        success = False
-
-        # Try Redis first
+    def delete_many(self, keys: list[str], batch_size: int = _SCAN_BATCH_SIZE) -> int:
+        """Delete several keys with pipelined UNLINK; returns how many existed in Redis."""
+        deleted = 0
         try:
             with self._get_redis() as redis_client:
-                # Delete all keys with our prefix
-                pattern = f"{self.key_prefix}*"
-                keys = redis_client.keys(pattern)
-                if keys:
-                    success = redis_client.delete(*keys)
+                pipe = redis_client.pipeline(transaction=False)
+                for start in range(0, len(keys), batch_size):
+                    pipe.unlink(*[self._make_key(key) for key in keys[start : start + batch_size]])
+                deleted = sum(pipe.execute()) if keys else 0
         except (ConnectionError, Exception) as e:
-            logger.debug(f"Redis clear failed: {e}")
+            logger.debug(f"Redis delete of {len(keys)} keys failed: {e}")
+
+        if self.fallback_cache is not None:
+            for key in keys:
+                self.fallback_cache.pop(key, None)
+
+        return deleted
+
+    def clear(
+        self,
+        background: bool = False,
+        batch_size: int = _SCAN_BATCH_SIZE,
+        progress: Callable[[ClearProgress], None] | None = None,
+    ) -> bool:
+        """Clear all cache entries.
+
+        Keys are found with cursor-based SCAN and removed with pipelined UNLINK
+        in batches of batch_size, so the server is never blocked on the whole
+        keyspace. With background=True the Redis pass runs on a daemon thread
+        and this returns once it has started; see get_clear_progress().
+        """
+        pattern = self.key_prefix.translate(_GLOB_SPECIAL) + "*"
+        success = self._unlink_matching(pattern, background, batch_size, progress)
 
         # Also clear fallback cache
-        if self.fallback_cache:
+        if self.fallback_cache is not None:
             self.fallback_cache.clear()
             success = True
 
         return success
 
+    def invalidate_prefix(
+        self,
+        prefix: str,
+        background: bool = False,
+        batch_size: int = _SCAN_BATCH_SIZE,
+        progress: Callable[[ClearProgress], None] | None = None,
+    ) -> bool:
+        """Delete every entry whose key starts with prefix (same batching as clear())."""
+        pattern = f"{self.key_prefix}{prefix}".translate(_GLOB_SPECIAL) + "*"
+        success = self._unlink_matching(pattern, background, batch_size, progress)
+
+        if self.fallback_cache is not None:
+            for key in [key for key in list(self.fallback_cache.keys()) if key.startswith(prefix)]:
+                self.fallback_cache.pop(key, None)
+            success = True
+
+        return success
+
+    def get_clear_progress(self) -> dict[str, Any] | None:
+        """Return the progress of the most recent clear or prefix invalidation."""
+        with self._connection_lock:
+            return asdict(self._clear_progress) if self._clear_progress else None
+
+    def _unlink_matching(
+        self,
+        pattern: str,
+        background: bool,
+        batch_size: int,
+        progress: Callable[[ClearProgress], None] | None,
+    ) -> bool:
+        state = ClearProgress(pattern=pattern, started_at=time.time())
+        try:
+            with self._get_redis() as redis_client:
+                with self._connection_lock:
+                    self._clear_progress = state
+                if background:
+                    threading.Thread(
+                        target=self._run_unlink,
+                        args=(redis_client, state, batch_size, progress),
+                        name="redis-cache-clear",
+                        daemon=True,
+                    ).start()
+                    return True
+                return self._run_unlink(redis_client, state, batch_size, progress)
+        except (ConnectionError, Exception) as e:
+            logger.debug(f"Redis clear failed for {pattern}: {e}")
+            return False
+
+    def _run_unlink(
+        self,
+        redis_client: Any,
+        state: ClearProgress,
+        batch_size: int,
+        progress: Callable[[ClearProgress], None] | None,
+    ) -> bool:
+        """SCAN the pattern and UNLINK each batch; returns False on a Redis error."""
+        try:
+            cursor = 0
+            while True:
+                cursor, keys = redis_client.scan(cursor=cursor, match=state.pattern, count=batch_size)
+                if keys:
+                    pipe = redis_client.pipeline(transaction=False)
+                    for start in range(0, len(keys), batch_size):
+                        pipe.unlink(*keys[start : start + batch_size])
+                    deleted = sum(pipe.execute())
+                    with self._connection_lock:
+                        state.scanned += len(keys)
+                        state.deleted += deleted
+                        state.batches += 1
+                    if progress:
+                        progress(state)
+                if cursor == 0:
+                    break
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Redis clear of {state.pattern} stopped after {state.deleted} keys: {e}")
+            with self._connection_lock:
+                state.error = str(e)
+            return False
+        finally:
+            with self._connection_lock:
+                state.running = False
+                state.finished_at = time.time()
+
+        logger.info(f"Cleared {state.deleted} Redis keys matching {state.pattern} in {state.batches} batches")
+        return True
+
     def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
         # Try Redis first
@@ -322,12 +441,32 @@ class RedisCache:
             success = False
 
         # Also set in fallback cache
-        if self.fallback_cache:
+        if self.fallback_cache is not None:
             for key, value in mapping.items():
-                self.fallback_cache.set(key, value, ttl)
+                self.fallback_cache[key] = value
 
         return success
 
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int | None = None,
+        distributed_lock: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """Return the cached value for key, recomputing it with stampede protection.
+
+        Values are stored with XFetch metadata and should be read back through
+        this method. With distributed_lock=True one replica at a time recomputes
+        a key, coordinated by a Redis lock next to the entry. Remaining kwargs
+        go to stampede.get_or_compute().
+        """
+        lock = None
+        if distributed_lock and self._redis_client is not None and self._is_healthy:
+            lock = RedisLock(self._redis_client, self._make_key(f"lock:{key}"))
+        return get_or_compute(self, key, compute, ttl=ttl, distributed_lock=lock, **kwargs)
+
     def get_info(self) -> dict[str, Any]:
         """Get Redis cache information."""
         info = {
@@ -336,6 +475,7 @@ class RedisCache:
             "fallback_enabled": self.fallback_cache is not None,
             "key_prefix": self.key_prefix,
             "serializer": self.serializer,
+            "codec": self.codec.get_stats(),
         }
 
         if self._is_healthy and self._redis_client:
@@ -0,0 +1,225 @@
+"""Memory accounting for cache entries.
+
+Provides the sizeof strategies used by byte-bounded caches, the cache
+classes themselves (cachetools caches weighted by value size) and a
+MemoryBudget that caps the combined size of several caches.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import pickle
+import sys
+import threading
+import weakref
+from collections import deque
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any
+
+from cachetools import LRUCache, TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SAMPLE = 32  # Items measured per container before extrapolating
+_SCALARS = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def pickled_size(value: Any) -> int:
+    """Return the pickled length of value (recursive getsizeof if it cannot be pickled)."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:  # noqa: BLE001
+        return deep_getsizeof(value)
+
+
+def deep_getsizeof(value: Any, sample: int = _DEFAULT_SAMPLE) -> int:
+    """Return the recursive in-memory size of value in bytes.
+
+    Containers with more than sample items are measured on an evenly spaced
+    sample and extrapolated, which keeps the cost bounded for large values.
+    Objects reachable more than once are counted once.
+    """
+    seen: set[int] = set()
+
+    def size(obj: Any) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        total = sys.getsizeof(obj)
+        if isinstance(obj, _SCALARS):
+            return total
+
+        if isinstance(obj, Mapping):
+            items, count = obj.items(), len(obj)
+
+            def measure(item: tuple[Any, Any]) -> int:
+                return size(item[0]) + size(item[1])
+
+        elif isinstance(obj, list | tuple | set | frozenset | deque):
+            items, count, measure = obj, len(obj), size
+        elif hasattr(obj, "__dict__"):
+            return total + size(vars(obj))
+        elif hasattr(obj, "__slots__"):
+            slots = [getattr(obj, name) for name in obj.__slots__ if hasattr(obj, name)]
+            return total + sum(size(item) for item in slots)
+        else:
+            return total
+
+        if count <= sample:
+            return total + sum(measure(item) for item in items)
+        sampled = list(itertools.islice(items, 0, None, count // sample))[:sample]
+        return total + sum(measure(item) for item in sampled) * count // len(sampled)
+
+    return size(value)
+
+
+SIZEOF_STRATEGIES: dict[str, Callable[[Any], int]] = {
+    "pickle": pickled_size,
+    "deep": deep_getsizeof,
+}
+
+
+def get_sizeof(strategy: str) -> Callable[[Any], int]:
+    """Return the sizeof function for a strategy name ("pickle" or "deep").
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    try:
+        return SIZEOF_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown sizeof strategy: {strategy}") from None
+
+
+def estimate_cache_bytes(cache: Any, sample: int = _DEFAULT_SAMPLE) -> int:
+    """Estimate the memory held by a cache's values.
+
+    Byte-bounded caches report their exact weighted size; other mappings are
+    estimated from a sample of their values.
+    """
+    if isinstance(cache, ByteBoundedCache):
+        return int(cache.currsize)
+    if not isinstance(cache, Mapping):
+        return 0
+    try:
+        count = len(cache)
+        if count == 0:
+            return 0
+        values = list(itertools.islice(cache.values(), sample))
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not sample cache values: %s", exc)
+        return 0
+    return sum(deep_getsizeof(value) for value in values) * count // max(len(values), 1)
+
+
+class MemoryBudget:
+    """Byte limit shared by several byte-bounded caches.
+
+    When the combined size exceeds max_bytes, entries are evicted (by each
+    cache's own policy) from the largest cache until the total fits again.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        # Caches are mappings and therefore unhashable: keep weak references by id
+        self._caches: dict[int, weakref.ref[ByteBoundedCache]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, cache: ByteBoundedCache) -> None:
+        """Count a cache against this budget."""
+        key = id(cache)
+        self._caches[key] = weakref.ref(cache, lambda _ref: self._caches.pop(key, None))
+        cache.budget = self
+
+    def _live_caches(self) -> list[ByteBoundedCache]:
+        return [cache for ref in list(self._caches.values()) if (cache := ref()) is not None]
+
+    @property
+    def used_bytes(self) -> int:
+        """Combined size of all registered caches."""
+        return int(sum(cache.currsize for cache in self._live_caches()))
+
+    def enforce(self) -> int:
+        """Evict entries until the registered caches fit; returns the number evicted."""
+        if self.max_bytes is None:
+            return 0
+        evicted = 0
+        with self._lock:
+            caches = self._live_caches()
+            used = sum(cache.currsize for cache in caches)
+            while used > self.max_bytes:
+                victim = max(caches, key=lambda cache: cache.currsize)
+                before = victim.currsize
+                if not before:
+                    break
+                victim.popitem()
+                used -= before - victim.currsize
+                evicted += 1
+        return evicted
+
+
+class ByteBoundedCache:
+    """Mixin bounding a cachetools cache by the byte size of its values.
+
+    maxsize is a byte budget and each value is weighted by the sizeof
+    strategy. Values larger than the whole budget are not stored. on_evict is
+    called for capacity evictions (own or global budget), not for clear().
+    """
+
+    budget: MemoryBudget | None = None
+    on_evict: Callable[[Hashable, Any], None] | None = None
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        try:
+            super().__setitem__(key, value)
+        except ValueError:
+            logger.debug("Value for %r exceeds the cache budget of %d bytes, not cached", key, self.maxsize)
+            self.pop(key, None)
+            return
+        if self.budget is not None:
+            self.budget.enforce()
+
+    def popitem(self) -> tuple[Hashable, Any]:
+        key, value = super().popitem()
+        if self.on_evict is not None:
+            try:
+                self.on_evict(key, value)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Eviction callback failed for %r: %s", key, exc)
+        return key, value
+
+    def clear(self) -> None:
+        on_evict, self.on_evict = self.on_evict, None
+        try:
+            super().clear()
+        finally:
+            self.on_evict = on_evict
+
+
+class ByteLRUCache(ByteBoundedCache, LRUCache):
+    """LRU cache bounded by bytes."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = deep_getsizeof,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+    ) -> None:
+        super().__init__(maxsize=max_bytes, getsizeof=sizeof)
+        self.on_evict = on_evict
+
+
+class ByteTTLCache(ByteBoundedCache, TTLCache):
+    """TTL cache bounded by bytes."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        sizeof: Callable[[Any], int] = deep_getsizeof,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+    ) -> None:
+        super().__init__(maxsize=max_bytes, ttl=ttl, getsizeof=sizeof)
+        self.on_evict = on_evict
@@ -0,0 +1,246 @@
+"""Snapshot files for warm-starting in-process caches.
+
+A snapshot holds the entries of named in-process caches (TTL, LRU,
+byte-bounded and TinyLFU caches) so a restarted process can begin with its
+hot keys instead of an empty cache. Layout, little endian:
+
+- header: magic ``MCPCSNAP``, format version (u16), record count (u64),
+  write time (f64, epoch seconds)
+- records: payload length (u32) followed by the pickled tuple
+  ``(cache name, key, value, deadline)``; deadline is an epoch timestamp or
+  None for entries without expiry
+
+Deadlines are wall-clock times, so the TTL left at save time keeps counting
+while the process is down and expired entries are skipped on load. Files are
+written to a temporary path and renamed into place, and read through mmap so
+records are unpickled straight from the mapped pages.
+
+Snapshots are unpickled on load: only point this at files the service
+writes itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+from cachetools import Cache, LRUCache, TTLCache
+
+from .tinylfu import TinyLFUCache
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+_MAGIC = b"MCPCSNAP"
+_HEADER = struct.Struct("<8sHxxQd")
+_RECORD = struct.Struct("<I")
+
+Entry = tuple[Hashable, Any, float | None]  # key, value, seconds left (None: no expiry)
+
+_fallback_logged: set[str] = set()  # Cache types already reported as read without cachetools internals
+
+
+def is_snapshotable(cache: Any) -> bool:
+    """Return whether cache is an in-process cache snapshots can hold."""
+    return isinstance(cache, (TTLCache, LRUCache, TinyLFUCache))
+
+
+def cache_entries(cache: Any) -> list[Entry]:
+    """Return a cache's live entries in restore order, without touching recency.
+
+    TTL caches are ordered by expiry (the order cachetools expects entries to
+    be inserted in), LRU caches from least to most recently used. Both orders
+    come from cachetools internals; on a cachetools release without them the
+    cache is read through its public interface instead, in insertion order
+    and with every TTL entry given the cache's full ttl.
+    """
+    if isinstance(cache, TinyLFUCache):
+        return cache.entries()
+
+    entries = []
+    if isinstance(cache, TTLCache):
+        links = getattr(cache, "_TTLCache__links", None)
+        if links is None:
+            return _public_entries(cache, cache.ttl)
+        now = cache.timer()
+        for link in sorted(links.values(), key=lambda link: link.expires):
+            if link.expires > now:
+                try:
+                    entries.append((link.key, Cache.__getitem__(cache, link.key), link.expires - now))
+                except KeyError:
+                    continue  # Removed while we were reading
+        return entries
+
+    order = getattr(cache, "_LRUCache__order", None)
+    if order is None:
+        return _public_entries(cache, None)
+    for key in list(order):
+        try:
+            entries.append((key, Cache.__getitem__(cache, key), None))
+        except KeyError:
+            continue
+    return entries
+
+
+def _public_entries(cache: Any, ttl: float | None) -> list[Entry]:
+    kind = type(cache).__name__
+    if kind not in _fallback_logged:
+        _fallback_logged.add(kind)
+        logger.warning(f"cachetools {kind} internals not found, snapshotting it in insertion order")
+    entries = []
+    for key in list(cache):
+        try:
+            entries.append((key, Cache.__getitem__(cache, key), ttl))
+        except KeyError:
+            continue
+    return entries
+
+
+def restore_entry(cache: Any, key: Hashable, value: Any, ttl: float | None) -> bool:
+    """Insert one entry unless the cache already holds the key.
+
+    ttl (seconds) shortens the entry's lifetime to what was left when the
+    snapshot was written; it is never extended past the cache's own ttl.
+
+    Returns:
+        True if the entry was stored
+    """
+    if key in cache:
+        return False
+    if isinstance(cache, TinyLFUCache):
+        cache.restore(key, value, ttl)
+        return key in cache
+
+    cache[key] = value
+    link = getattr(cache, "_TTLCache__links", {}).get(key)
+    if link is not None and ttl is not None:
+        link.expires = min(link.expires, cache.timer() + ttl)
+    return key in cache
+
+
+def write_snapshot(
+    path: str | os.PathLike[str],
+    caches: Mapping[str, Any],
+    include: Callable[[Any], bool] | None = None,
+    pending: Mapping[str, Iterable[Entry]] | None = None,
+) -> int:
+    """Write the entries of caches to path atomically.
+
+    Entries that cannot be pickled, or whose value include() rejects, are
+    skipped. pending holds entries of caches that do not exist (yet), keyed
+    by cache name; they are written as they are so a save does not drop
+    what the previous snapshot held for those caches.
+
+    Returns:
+        Number of entries written
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.tmp")
+    now = time.time()
+    count = skipped = 0
+
+    sections: list[tuple[str, Iterable[Entry]]] = list((pending or {}).items())
+    for name, cache in caches.items():
+        try:
+            sections.append((name, cache_entries(cache)))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Skipping cache '{name}' in snapshot: {exc}")
+
+    with temp.open("wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, 0, now))
+        for name, entries in sections:
+            for key, value, ttl in entries:
+                if include is not None and not include(value):
+                    continue
+                try:
+                    payload = pickle.dumps(
+                        (name, key, value, None if ttl is None else now + ttl), protocol=pickle.HIGHEST_PROTOCOL
+                    )
+                except Exception:  # noqa: BLE001
+                    skipped += 1
+                    continue
+                fh.write(_RECORD.pack(len(payload)))
+                fh.write(payload)
+                count += 1
+        fh.seek(0)
+        fh.write(_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, count, now))
+        fh.flush()
+        os.fsync(fh.fileno())
+    temp.replace(path)
+
+    if skipped:
+        logger.info(f"Snapshot skipped {skipped} entries that could not be pickled")
+    return count
+
+
+def read_snapshot(path: str | os.PathLike[str]) -> Iterator[tuple[str, Hashable, Any, float | None]]:
+    """Yield (cache name, key, value, seconds left) for unexpired entries in path.
+
+    Missing files yield nothing. A file with an unknown format version is
+    ignored; a truncated or partly unreadable one yields what can be read.
+    """
+    try:
+        with Path(path).open("rb") as fh:
+            if os.fstat(fh.fileno()).st_size < _HEADER.size:
+                logger.warning(f"Ignoring cache snapshot {path}: file too short")
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, count, _written_at = _HEADER.unpack_from(mapped, 0)
+                if magic != _MAGIC or version != SNAPSHOT_VERSION:
+                    logger.warning(f"Ignoring cache snapshot {path}: unsupported format (version {version})")
+                    return
+                yield from _records(mapped, count, str(path))
+    except FileNotFoundError:
+        return
+
+
+def _records(mapped: mmap.mmap, count: int, path: str) -> Iterator[tuple[str, Hashable, Any, float | None]]:
+    offset, size, read = _HEADER.size, len(mapped), 0
+    with memoryview(mapped) as view:
+        while read < count and offset + _RECORD.size <= size:
+            (length,) = _RECORD.unpack_from(mapped, offset)
+            start, offset = offset + _RECORD.size, offset + _RECORD.size + length
+            if offset > size:
+                break
+            read += 1
+            try:
+                with view[start:offset] as payload:
+                    name, key, value, deadline = pickle.loads(payload)  # noqa: S301 - written by this service
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Skipping unreadable snapshot record: {exc}")
+                continue
+            if deadline is None:
+                yield name, key, value, None
+            elif (ttl := deadline - time.time()) > 0:
+                yield name, key, value, ttl
+    if read < count:
+        logger.warning(f"Cache snapshot {path} is truncated: read {read} of {count} entries")
+
+
+def load_snapshot(path: str | os.PathLike[str], caches: Mapping[str, Any]) -> int:
+    """Restore the entries in path into the matching caches.
+
+    Entries for caches not in caches, already expired or whose key is
+    already cached are skipped.
+
+    Returns:
+        Number of entries restored
+    """
+    restored = 0
+    for name, key, value, ttl in read_snapshot(path):
+        cache = caches.get(name)
+        if cache is not None and restore_entry(cache, key, value, ttl):
+            restored += 1
+    return restored
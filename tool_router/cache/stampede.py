@@ -0,0 +1,226 @@
+"""Stampede protection for expensive cache entries.
+
+get_or_compute() stores each value together with the time it took to compute
+(delta) and its logical expiry. Every read recomputes early with a
+probability that rises as the expiry approaches (XFetch): a reader refreshes
+when ``now - delta * beta * log(random()) >= expiry``, so slow-to-compute
+entries are refreshed earlier. Recomputation is serialized per key by an
+in-process lock and, optionally, a Redis lock shared by all replicas. Callers
+that lose the race keep serving the current value; callers that have no
+value wait for the winner instead of computing it again.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator, MutableMapping
+from contextlib import contextmanager
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+_ENVELOPE_TAG = "__xfetch__"
+_DEFAULT_BETA = 1.0  # >1 favours earlier refreshes, <1 later ones
+_DEFAULT_LOCK_TIMEOUT = 10.0  # Seconds a caller without a value waits for another worker
+_DEFAULT_LOCK_TTL = 30.0  # Seconds before an abandoned Redis lock expires
+_LOCK_POLL_INTERVAL = 0.05
+
+
+class KeyLocks:
+    """In-process locks per key, dropped once no caller holds or waits on them."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, list[Any]] = {}  # key -> [lock, users]
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: str, blocking: bool = True, timeout: float = -1) -> Iterator[bool]:
+        """Acquire the key's lock for the duration of the block; yields whether it was acquired."""
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(blocking, timeout if blocking else -1)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._locks)
+
+
+class RedisLock:
+    """Lock shared across replicas through SET NX PX.
+
+    Release only deletes the key if it still holds this lock's token, checked
+    inside a WATCH/MULTI transaction so no server-side scripting is needed.
+    """
+
+    def __init__(self, client: Any, name: str, ttl: float = _DEFAULT_LOCK_TTL) -> None:
+        self.client = client
+        self.name = name
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        """Try to take the lock without waiting."""
+        try:
+            return bool(self.client.set(self.name, self.token, nx=True, px=int(self.ttl * 1000)))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not acquire Redis lock %s: %s", self.name, exc)
+            return False
+
+    def release(self) -> None:
+        """Release the lock if this instance still owns it."""
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(self.name)
+                if pipe.get(self.name) == self.token.encode():
+                    pipe.multi()
+                    pipe.delete(self.name)
+                    pipe.execute()
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Redis lock %s changed hands before release: %s", self.name, exc)
+
+
+_key_locks = KeyLocks()
+
+
+def _wrap(value: Any, delta: float, expiry: float | None) -> dict[str, Any]:
+    return {_ENVELOPE_TAG: 1, "value": value, "delta": delta, "expiry": expiry}
+
+
+def unwrap(entry: Any) -> Any:
+    """Return the value stored by get_or_compute(), or entry itself if it is a plain value."""
+    if isinstance(entry, dict) and _ENVELOPE_TAG in entry:
+        return entry["value"]
+    return entry
+
+
+def _read(cache: Any, key: str) -> dict[str, Any] | None:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if isinstance(entry, dict) and _ENVELOPE_TAG in entry:
+        return entry
+    # A plain value written by set(): serve it and never refresh it early
+    return _wrap(entry, 0.0, None)
+
+
+def _write(cache: Any, key: str, entry: dict[str, Any], ttl: int | None) -> None:
+    try:
+        if isinstance(cache, MutableMapping):
+            cache[key] = entry
+        else:
+            cache.set(key, entry, ttl)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not store computed value for %s: %s", key, exc)
+
+
+def should_refresh(entry: dict[str, Any], beta: float = _DEFAULT_BETA, now: float | None = None) -> bool:
+    """Decide whether a reader recomputes this entry now (XFetch)."""
+    if entry["expiry"] is None:
+        return False
+    now = time.time() if now is None else now
+    # 1 - random() lies in (0, 1], so the logarithm is defined
+    return now - entry["delta"] * beta * math.log(1.0 - random.random()) >= entry["expiry"]  # noqa: S311
+
+
+def _compute(
+    cache: Any,
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int | None,
+    cache_if: Callable[[Any], bool] | None,
+) -> Any:
+    start = time.time()
+    value = compute()
+    finished = time.time()
+    if cache_if is None or cache_if(value):
+        expiry = finished + ttl if ttl is not None else None
+        _write(cache, key, _wrap(value, finished - start, expiry), ttl)
+    return value
+
+
+def get_or_compute(
+    cache: Any,
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int | None = None,
+    beta: float = _DEFAULT_BETA,
+    lock_timeout: float = _DEFAULT_LOCK_TIMEOUT,
+    distributed_lock: RedisLock | None = None,
+    cache_if: Callable[[Any], bool] | None = None,
+) -> Any:
+    """Return the cached value for key, computing it at most once at a time.
+
+    Args:
+        cache: A mapping (TTLCache, LRUCache) or a cache with get()/set(key, value, ttl)
+        key: Cache key
+        compute: Zero-argument function producing the value
+        ttl: Logical lifetime in seconds (defaults to the cache's own ttl, if any;
+            without one the value is never refreshed early)
+        beta: XFetch aggressiveness
+        lock_timeout: Seconds to wait for another worker computing a missing value
+            before computing it anyway
+        distributed_lock: Redis lock coordinating recomputation across replicas
+        cache_if: Predicate deciding whether a computed value is stored
+
+    Returns:
+        The fresh, stale-but-being-refreshed, or newly computed value
+    """
+    if ttl is None:
+        ttl = getattr(cache, "ttl", None)  # TTLCache: refresh ahead of its own expiry
+    entry = _read(cache, key)
+    if entry is not None:
+        if not should_refresh(entry, beta):
+            return entry["value"]
+        # Early refresh: one worker recomputes, everyone else keeps the current value
+        with _key_locks.hold(f"{id(cache)}:{key}", blocking=False) as acquired:
+            if not acquired:
+                return entry["value"]
+            if distributed_lock is None:
+                return _compute(cache, key, compute, ttl, cache_if)
+            if not distributed_lock.acquire():
+                return entry["value"]
+            try:
+                return _compute(cache, key, compute, ttl, cache_if)
+            finally:
+                distributed_lock.release()
+
+    deadline = time.monotonic() + lock_timeout
+    with _key_locks.hold(f"{id(cache)}:{key}", timeout=lock_timeout) as acquired:
+        if acquired:
+            entry = _read(cache, key)
+            if entry is not None:
+                return entry["value"]  # Computed by the worker we waited for
+        if distributed_lock is None:
+            return _compute(cache, key, compute, ttl, cache_if)
+
+        while not distributed_lock.acquire():
+            entry = _read(cache, key)
+            if entry is not None:
+                return entry["value"]
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for lock %s, computing anyway", distributed_lock.name)
+                return _compute(cache, key, compute, ttl, cache_if)
+            time.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            entry = _read(cache, key)
+            if entry is not None:
+                return entry["value"]
+            return _compute(cache, key, compute, ttl, cache_if)
+        finally:
+            distributed_lock.release()
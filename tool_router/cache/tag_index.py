@@ -0,0 +1,138 @@
+"""Tag membership index stored in Redis.
+
+Every replica reads and writes the same sets, so a tag registered on one node
+can be invalidated from any other. Layout under ``<key_prefix>tagidx:``:
+
+- ``tag:<tag>``: set of cache keys carrying the tag
+- ``key:<cache key>``: set of tags on the key (to detach it from its other
+  tags when one of them is invalidated)
+
+Invalidation renames the tag set away first, so keys tagged while it runs
+belong to a fresh set, then walks the detached set with SSCAN and cleans up
+each batch in pipelines: a tag with N keys costs a few round trips per
+batch_size keys instead of one per key.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .redis_cache import _GLOB_SPECIAL, _SCAN_BATCH_SIZE, RedisCache, redis
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisTagIndex:
+    """Tag to key index shared by all replicas through Redis sets.
+
+    Uses the connection (and health checks) of a RedisCache. Index keys live
+    under the cache's key prefix, so clearing that cache also drops the index.
+    """
+
+    def __init__(self, cache: RedisCache, batch_size: int = _SCAN_BATCH_SIZE) -> None:
+        self.cache = cache
+        self.batch_size = batch_size
+        self.prefix = f"{cache.key_prefix}tagidx:"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _key_tags(self, key: str) -> str:
+        return f"{self.prefix}key:{key}"
+
+    def add(self, tag: str, keys: Iterable[str], ttl: int | None = None) -> None:
+        """Tag keys; with ttl, index entries expire with the data they point to.
+
+        A tag set lives as long as its longest-lived member; adding a key
+        without ttl makes it persistent.
+
+        Raises:
+            ConnectionError: If Redis is unavailable
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        tag_key = self._tag_key(tag)
+        with self.cache._get_redis() as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.ttl(tag_key)
+            pipe.sadd(tag_key, *keys)
+            for key in keys:
+                pipe.sadd(self._key_tags(key), tag)
+                if ttl is not None:
+                    pipe.expire(self._key_tags(key), ttl)
+                else:
+                    pipe.persist(self._key_tags(key))
+            if ttl is None:
+                pipe.persist(tag_key)
+            previous_ttl = pipe.execute()[0]
+
+            # -2: the set is new, -1: it already holds a key without expiry
+            if ttl is not None and (previous_ttl == -2 or 0 <= previous_ttl < ttl):
+                client.expire(tag_key, ttl)
+
+    def members(self, tag: str) -> set[str]:
+        """Return the keys carrying a tag."""
+        with self.cache._get_redis() as client:
+            return {_text(key) for key in client.sscan_iter(self._tag_key(tag), count=self.batch_size)}
+
+    def tags_for(self, key: str) -> set[str]:
+        """Return the tags on a key."""
+        with self.cache._get_redis() as client:
+            return {_text(tag) for tag in client.smembers(self._key_tags(key))}
+
+    def tags(self) -> set[str]:
+        """Return every tag that currently has keys."""
+        prefix = self._tag_key("")
+        pattern = prefix.translate(_GLOB_SPECIAL) + "*"
+        with self.cache._get_redis() as client:
+            return {_text(name)[len(prefix) :] for name in client.scan_iter(match=pattern, count=self.batch_size)}
+
+    def pop_members(self, tag: str) -> Iterator[list[str]]:
+        """Detach a tag from all its keys, yielding them in batches.
+
+        Each yielded key is also removed from its other tags. The caller
+        deletes the cached data for every batch.
+
+        Raises:
+            ConnectionError: If Redis is unavailable
+        """
+        draining = f"{self.prefix}draining:{tag}:{uuid.uuid4().hex}"
+        with self.cache._get_redis() as client:
+            try:
+                client.rename(self._tag_key(tag), draining)
+            except redis.ResponseError:
+                if client.exists(self._tag_key(tag)):
+                    raise
+                return  # Nothing tagged, or another node is invalidating it
+            try:
+                cursor = 0
+                while True:
+                    cursor, batch = client.sscan(draining, cursor=cursor, count=self.batch_size)
+                    if batch:
+                        keys = [_text(key) for key in batch]
+                        self._detach(client, tag, keys)
+                        yield keys
+                    if cursor == 0:
+                        break
+            finally:
+                client.unlink(draining)
+
+    def _detach(self, client: Any, tag: str, keys: list[str]) -> None:
+        """Drop keys' reverse entries and their membership in other tags (two round trips)."""
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.smembers(self._key_tags(key))
+        tag_sets = pipe.execute()
+
+        pipe = client.pipeline(transaction=False)
+        for key, tags in zip(keys, tag_sets, strict=True):
+            for other in tags:
+                if _text(other) != tag:
+                    pipe.srem(self._tag_key(_text(other)), key)
+            pipe.unlink(self._key_tags(key))
+        pipe.execute()
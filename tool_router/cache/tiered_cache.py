@@ -0,0 +1,343 @@
+"""Two-tier near cache: in-process L1 in front of a shared Redis L2.
+
+Each replica keeps a small TTL-bounded L1 so hot keys are served without a
+network round trip. Writes go to Redis first and are then announced on a
+pub/sub channel; every other replica drops the announced keys from its L1.
+The L1 TTL bounds staleness if an invalidation message is ever lost (for
+example while the subscriber is reconnecting).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import threading
+import uuid
+from typing import Any
+
+from cachetools import TTLCache
+
+from .codecs import DEFAULT_COMPRESS_THRESHOLD
+from .redis_cache import RedisCache, RedisConfig
+from .types import CacheConfig
+
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_L1_MAX_SIZE = 1024
+_DEFAULT_L1_TTL = 60  # Seconds; upper bound on staleness without invalidations
+_LISTENER_POLL_TIMEOUT = 1.0  # Seconds a get_message() call blocks
+_RECONNECT_DELAY = 5.0
+_MISSING = object()
+
+
+class TieredCache(RedisCache):
+    """Redis cache with a per-process L1 kept coherent through pub/sub.
+
+    Reads check L1, then Redis (L2), populating L1 on an L2 hit. Writes,
+    deletes and clears update Redis, then the local L1, and publish the
+    affected keys on ``<key_prefix>invalidate`` so other replicas evict them.
+    Messages carry the publishing instance id and are ignored by their sender.
+    """
+
+    def __init__(
+        self,
+        config: RedisConfig,
+        l1_config: CacheConfig | None = None,
+        fallback_cache: TTLCache | None = None,
+        key_prefix: str = "mcp_cache:",
+        serializer: str = "pickle",
+        compression: str | None = None,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        start_listener: bool = True,
+    ) -> None:
+        """Initialize the cache and (optionally) the invalidation listener.
+
+        Args:
+            config: Redis connection settings for the L2
+            l1_config: L1 size and TTL (defaults to 1024 entries, 60s)
+            fallback_cache: Local cache used when Redis is unreachable
+            key_prefix: Namespace for Redis keys and the invalidation channel
+            serializer: Registered serializer name (see codecs)
+            compression: Registered compressor name, or None
+            compress_threshold: Minimum serialized size in bytes to compress
+            start_listener: Subscribe to invalidations immediately
+        """
+        l1_config = l1_config or CacheConfig(max_size=_DEFAULT_L1_MAX_SIZE, ttl=_DEFAULT_L1_TTL)
+        self.l1 = TTLCache(maxsize=l1_config.max_size, ttl=l1_config.ttl)
+        self.instance_id = uuid.uuid4().hex
+        self._l1_lock = threading.Lock()
+        self._epoch = 0  # Bumped on every invalidation; guards L1 fills racing with one
+        self._l1_hits = 0
+        self._l2_hits = 0
+        self._misses = 0
+        self._published = 0
+        self._received = 0
+        self._stop_event = threading.Event()
+        self._listener: threading.Thread | None = None
+        super().__init__(
+            config,
+            fallback_cache=fallback_cache,
+            key_prefix=key_prefix,
+            serializer=serializer,
+            compression=compression,
+            compress_threshold=compress_threshold,
+        )
+        self.channel = f"{self.key_prefix}invalidate"
+
+        if start_listener:
+            self.start_listener()
+
+    # -- reads ---------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value from L1, falling back to Redis."""
+        with self._l1_lock:
+            value = self.l1.get(key, _MISSING)
+            if value is not _MISSING:
+                self._l1_hits += 1
+                return value
+            epoch = self._epoch
+
+        value = super().get(key, _MISSING)
+        with self._l1_lock:
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._l2_hits += 1
+            if epoch == self._epoch:
+                self.l1[key] = value
+        return value
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Get several values, fetching only L1 misses from Redis."""
+        result = {}
+        with self._l1_lock:
+            for key in keys:
+                value = self.l1.get(key, _MISSING)
+                if value is not _MISSING:
+                    result[key] = value
+            self._l1_hits += len(result)
+            epoch = self._epoch
+
+        remaining = [key for key in keys if key not in result]
+        if not remaining:
+            return result
+
+        fetched = super().get_many(remaining)
+        with self._l1_lock:
+            for key in remaining:
+                value = fetched.get(key)
+                if value is None:
+                    self._misses += 1
+                    continue
+                self._l2_hits += 1
+                if epoch == self._epoch:
+                    self.l1[key] = value
+        result.update(fetched)
+        return result
+
+    def exists(self, key: str) -> bool:
+        """Check L1, then Redis, for a key."""
+        with self._l1_lock:
+            if key in self.l1:
+                return True
+        return bool(super().exists(key))
+
+    # -- writes --------------------------------------------------------------
+
+    def _l1_accepts(self, ttl: int | None) -> bool:
+        """Whether a write with ttl may be cached in L1 without outliving its Redis entry."""
+        return ttl is None or ttl >= self.l1.ttl
+
+    def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
+        """Write through to Redis, update L1 and invalidate other replicas.
+
+        Values with a ttl shorter than the L1 TTL are not kept in L1, so they
+        are never served after Redis has expired them.
+        """
+        success = super().set(key, value, ttl)
+        self._invalidate_local([key])
+        if success and self._l1_accepts(ttl):
+            with self._l1_lock:
+                self.l1[key] = value
+        self._publish([key])
+        return success
+
+    def set_many(self, mapping: dict[str, Any], ttl: int | None = None) -> bool:
+        """Write several values through to Redis and invalidate other replicas (see set for L1)."""
+        success = super().set_many(mapping, ttl)
+        keys = list(mapping)
+        self._invalidate_local(keys)
+        if success and self._l1_accepts(ttl):
+            with self._l1_lock:
+                for key, value in mapping.items():
+                    self.l1[key] = value
+        self._publish(keys)
+        return success
+
+    def delete(self, key: str) -> bool:
+        """Delete a key everywhere."""
+        success = super().delete(key)
+        self._invalidate_local([key])
+        self._publish([key])
+        return success
+
+    def delete_many(self, keys: list[str], **kwargs: Any) -> int:
+        """Delete keys in Redis (pipelined UNLINK), the local L1 and every other replica's L1."""
+        deleted = super().delete_many(keys, **kwargs)
+        self._invalidate_local(keys)
+        self._publish(keys)
+        return deleted
+
+    def clear(self, **kwargs: Any) -> bool:
+        """Clear Redis, the local L1 and every other replica's L1 (see RedisCache.clear)."""
+        success = super().clear(**kwargs)
+        self._invalidate_local(None)
+        self._publish(None)
+        return success
+
+    def invalidate_prefix(self, prefix: str, **kwargs: Any) -> bool:
+        """Delete keys starting with prefix in Redis and in every replica's L1."""
+        success = super().invalidate_prefix(prefix, **kwargs)
+        self._invalidate_local_prefix(prefix)
+        self._publish(None, prefix=prefix)
+        return success
+
+    # -- invalidation --------------------------------------------------------
+
+    def _invalidate_local(self, keys: list[str] | None) -> None:
+        """Drop keys (or everything, for None) from L1."""
+        with self._l1_lock:
+            self._epoch += 1
+            if keys is None:
+                self.l1.clear()
+                return
+            for key in keys:
+                self.l1.pop(key, None)
+
+    def _invalidate_local_prefix(self, prefix: str) -> None:
+        with self._l1_lock:
+            self._epoch += 1
+            for key in [key for key in self.l1 if key.startswith(prefix)]:
+                self.l1.pop(key, None)
+
+    def _publish(self, keys: list[str] | None, prefix: str | None = None) -> None:
+        message = json.dumps({"origin": self.instance_id, "keys": keys, "prefix": prefix})
+        try:
+            with self._get_redis() as redis_client:
+                redis_client.publish(self.channel, message)
+            with self._l1_lock:
+                self._published += 1
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not publish cache invalidation on %s: %s", self.channel, exc)
+
+    def _handle_message(self, data: bytes | str) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.debug("Ignoring malformed invalidation message on %s", self.channel)
+            return
+        if message.get("origin") == self.instance_id:
+            return
+        with self._l1_lock:
+            self._received += 1
+        if message.get("prefix") is not None:
+            self._invalidate_local_prefix(message["prefix"])
+        else:
+            self._invalidate_local(message.get("keys"))
+
+    def start_listener(self) -> None:
+        """Start the background invalidation subscriber."""
+        if self._listener is not None:
+            logger.warning("Invalidation listener already running for %s", self.channel)
+            return
+
+        self._stop_event.clear()
+        self._listener = threading.Thread(target=self._listen, name="tiered-cache-invalidation", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self, timeout: float = 5.0) -> None:
+        """Stop the background invalidation subscriber."""
+        if self._listener is None:
+            return
+
+        self._stop_event.set()
+        self._listener.join(timeout=timeout)
+        self._listener = None
+
+    def _listen(self) -> None:
+        pubsub = None
+        while not self._stop_event.is_set():
+            try:
+                if pubsub is None:
+                    with self._get_redis() as redis_client:
+                        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                        pubsub.subscribe(self.channel)
+                    # Invalidations may have been missed while unsubscribed
+                    self._invalidate_local(None)
+                message = pubsub.get_message(timeout=_LISTENER_POLL_TIMEOUT)
+                if message and message.get("type") == "message":
+                    self._handle_message(message["data"])
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Invalidation listener for %s failed: %s", self.channel, exc)
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        pubsub.close()
+                    pubsub = None
+                self._stop_event.wait(_RECONNECT_DELAY)
+
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Error closing invalidation subscriber: %s", exc)
+
+    # -- reporting -----------------------------------------------------------
+
+    def get_tier_stats(self) -> dict[str, Any]:
+        """Return L1/L2 hit counters and ratios."""
+        with self._l1_lock:
+            lookups = self._l1_hits + self._l2_hits + self._misses
+            return {
+                "l1_hits": self._l1_hits,
+                "l2_hits": self._l2_hits,
+                "misses": self._misses,
+                "l1_hit_ratio": self._l1_hits / lookups if lookups else 0.0,
+                "l2_hit_ratio": self._l2_hits / lookups if lookups else 0.0,
+                "l1_size": len(self.l1),
+                "invalidations_published": self._published,
+                "invalidations_received": self._received,
+            }
+
+    def get_info(self) -> dict[str, Any]:
+        """Get Redis information plus the tier statistics."""
+        info = super().get_info()
+        info["tiers"] = self.get_tier_stats()
+        return info
+
+    def __len__(self) -> int:
+        return len(self.l1)
+
+    def close(self) -> None:
+        """Stop the listener and close the Redis connection."""
+        self.stop_listener()
+        super().close()
+
+
+def create_tiered_cache(
+    config: RedisConfig | None = None,
+    l1_config: CacheConfig | None = None,
+    fallback_config: CacheConfig | None = None,
+    **kwargs: Any,
+) -> TieredCache:
+    """Create a two-tier cache with an optional local fallback for Redis outages."""
+    if config is None:
+        config = RedisConfig()
+
+    fallback_cache = None
+    if fallback_config:
+        fallback_cache = TTLCache(maxsize=fallback_config.max_size, ttl=fallback_config.ttl)
+
+    return TieredCache(config=config, l1_config=l1_config, fallback_cache=fallback_cache, **kwargs)
@@ -0,0 +1,369 @@
+"""Window TinyLFU cache with admission control.
+
+New entries enter a small LRU window. When the window overflows, its oldest
+entry becomes a candidate for the main region, a segmented LRU (probation +
+protected). The candidate is admitted only if its estimated access
+frequency beats that of the main region's eviction victim, so a burst of
+one-off keys cannot flush frequently used entries.
+
+Frequencies are estimated with a count-min sketch of small saturating
+counters, fronted by a doorkeeper Bloom filter that absorbs keys seen only
+once. Both are periodically halved/reset so the estimate follows recent
+popularity.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator, MutableMapping
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+_WINDOW_RATIO = 0.01  # Share of capacity given to the admission window
+_PROTECTED_RATIO = 0.8  # Share of the main region reserved for re-accessed entries
+_SKETCH_DEPTH = 4
+_COUNTER_MAX = 15  # 4-bit saturating counters
+_SAMPLE_FACTOR = 10  # Age the sketch after this many counted accesses per unit of capacity
+_DOORKEEPER_HASHES = 3
+_DOORKEEPER_BITS_PER_KEY = 8  # ~3% false positives once a full sample of distinct keys is seen
+_MIX = 0x9E3779B97F4A7C15  # 64-bit golden ratio, spreads the per-row seeds
+_MASK64 = (1 << 64) - 1
+
+
+def _hashes(key: Hashable, count: int) -> Iterator[int]:
+    """Yield count independent-enough 64-bit hashes of key (double hashing)."""
+    h1 = hash(key) & _MASK64
+    h2 = ((h1 * _MIX) & _MASK64) | 1
+    for i in range(count):
+        yield (h1 + i * h2) & _MASK64
+
+
+class CountMinSketch:
+    """Approximate access counts with saturating counters.
+
+    Every sample_size increments all counters are halved, so old popularity
+    decays instead of accumulating forever.
+    """
+
+    def __init__(self, width: int, depth: int = _SKETCH_DEPTH, sample_size: int | None = None) -> None:
+        self.width = max(16, width)
+        self.depth = depth
+        self.sample_size = sample_size or self.width * _SAMPLE_FACTOR
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+        self._additions = 0
+        self.resets = 0
+
+    def increment(self, key: Hashable) -> bool:
+        """Count one access; returns True if this triggered an aging reset."""
+        for row, h in zip(self._rows, _hashes(key, self.depth), strict=True):
+            index = h % self.width
+            if row[index] < _COUNTER_MAX:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+            return True
+        return False
+
+    def estimate(self, key: Hashable) -> int:
+        """Return the (over-)estimated access count of key."""
+        return min(row[h % self.width] for row, h in zip(self._rows, _hashes(key, self.depth), strict=True))
+
+    def _age(self) -> None:
+        for row in self._rows:
+            for index, count in enumerate(row):
+                if count:
+                    row[index] = count >> 1
+        self._additions //= 2
+        self.resets += 1
+
+
+class Doorkeeper:
+    """Bloom filter recording keys seen at least once since the last reset."""
+
+    def __init__(self, size: int, hashes: int = _DOORKEEPER_HASHES) -> None:
+        self.size = max(64, size)
+        self.hashes = hashes
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: Hashable) -> bool:
+        """Insert key; returns True if it was (probably) already present."""
+        present = True
+        for h in _hashes(key, self.hashes):
+            index = h % self.size
+            byte, bit = divmod(index, 8)
+            if not self._bits[byte] & (1 << bit):
+                present = False
+                self._bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, key: Hashable) -> bool:
+        for h in _hashes(key, self.hashes):
+            byte, bit = divmod(h % self.size, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+
+
+class TinyLFUCache(MutableMapping):
+    """Mapping with W-TinyLFU admission, segmented LRU eviction and optional TTL.
+
+    Behaves like the cachetools caches (maxsize, currsize, ttl, expire()).
+    Reads through ``cache[key]`` or get() count as accesses for the
+    frequency estimate; ``key in cache`` does not. on_evict(key, value) is
+    called for capacity evictions and rejected candidates, not for expiry or
+    explicit deletion.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float | None = None,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds an entry lives after it was written (None: no expiry)
+            on_evict: Callback for entries dropped to respect maxsize
+            timer: Clock used for TTL expiry
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.timer = timer
+
+        self._window_size = min(max(1, int(maxsize * _WINDOW_RATIO)), maxsize - 1)
+        main_size = maxsize - self._window_size
+        self._protected_size = max(1, int(main_size * _PROTECTED_RATIO)) if main_size > 1 else 0
+        self._main_size = main_size
+
+        self._window: OrderedDict[Hashable, Any] = OrderedDict()
+        self._probation: OrderedDict[Hashable, Any] = OrderedDict()
+        self._protected: OrderedDict[Hashable, Any] = OrderedDict()
+        self._expires: dict[Hashable, float] = {}
+
+        sample_size = maxsize * _SAMPLE_FACTOR
+        self._sketch = CountMinSketch(width=maxsize * 4, sample_size=sample_size)
+        self._doorkeeper = Doorkeeper(size=sample_size * _DOORKEEPER_BITS_PER_KEY)
+        self._lock = threading.RLock()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    # -- frequency -----------------------------------------------------------
+
+    def _record(self, key: Hashable) -> None:
+        if self._doorkeeper.add(key) and self._sketch.increment(key):
+            self._doorkeeper.clear()
+
+    def frequency(self, key: Hashable) -> int:
+        """Return the estimated recent access frequency of key."""
+        with self._lock:
+            return self._sketch.estimate(key) + (1 if key in self._doorkeeper else 0)
+
+    # -- mapping interface ---------------------------------------------------
+
+    def _region(self, key: Hashable) -> OrderedDict[Hashable, Any] | None:
+        for region in (self._window, self._probation, self._protected):
+            if key in region:
+                return region
+        return None
+
+    def _expired(self, key: Hashable) -> bool:
+        expires = self._expires.get(key)
+        return expires is not None and expires <= self.timer()
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            self._record(key)
+            region = self._region(key)
+            if region is None:
+                raise KeyError(key)
+            if self._expired(key):
+                self._remove(key)
+                raise KeyError(key)
+
+            value = region[key]
+            if region is self._probation and self._protected_size:
+                del self._probation[key]
+                self._protected[key] = value
+                if len(self._protected) > self._protected_size:
+                    demoted, demoted_value = self._protected.popitem(last=False)
+                    self._probation[demoted] = demoted_value
+            else:
+                region.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        evicted = None
+        with self._lock:
+            self._record(key)
+            if self.ttl is not None:
+                self._purge_expired()
+                # Re-insert so _expires stays ordered by expiry
+                self._expires.pop(key, None)
+                self._expires[key] = self.timer() + self.ttl
+            region = self._region(key)
+            if region is not None:
+                region[key] = value
+                region.move_to_end(key)
+                return
+
+            self._window[key] = value
+            if len(self._window) > self._window_size:
+                candidate, candidate_value = self._window.popitem(last=False)
+                evicted = self._admit(candidate, candidate_value)
+
+        # Outside the lock: callbacks may take locks of their own (e.g. CacheManager metrics)
+        if evicted is not None and self.on_evict is not None:
+            try:
+                self.on_evict(*evicted)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Eviction callback failed for %r: %s", evicted[0], exc)
+
+    def _admit(self, candidate: Hashable, value: Any) -> tuple[Hashable, Any] | None:
+        """Move a window overflow candidate into the main region if it earns a place.
+
+        Returns:
+            The entry dropped to make room (victim or rejected candidate), if any
+        """
+        if len(self._probation) + len(self._protected) < self._main_size:
+            self._probation[candidate] = value
+            return None
+
+        victim_region = self._probation if self._probation else self._protected
+        victim = next(iter(victim_region))
+        if self.frequency(candidate) > self.frequency(victim):
+            victim_value = victim_region.pop(victim)
+            self._expires.pop(victim, None)
+            self._probation[candidate] = value
+            self.admitted += 1
+            self.evictions += 1
+            return victim, victim_value
+
+        self._expires.pop(candidate, None)
+        self.rejected += 1
+        self.evictions += 1
+        return candidate, value
+
+    def _purge_expired(self) -> None:
+        """Drop expired entries so they do not hold slots or win admission (caller holds the lock).
+
+        _expires is in write order, which is expiry order for a fixed ttl, so
+        this stops at the first live entry. Restored entries with a shorter
+        ttl may sit behind it until they are read or expire() runs.
+        """
+        now = self.timer()
+        while self._expires:
+            key = next(iter(self._expires))
+            if self._expires[key] > now:
+                break
+            self._expires.pop(key)
+            region = self._region(key)
+            if region is not None:
+                del region[key]
+
+    def _remove(self, key: Hashable) -> Any:
+        region = self._region(key)
+        if region is None:
+            raise KeyError(key)
+        self._expires.pop(key, None)
+        return region.pop(key)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._region(key) is not None and not self._expired(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            now = self.timer()
+            keys = [
+                key
+                for region in (self._window, self._probation, self._protected)
+                for key in region
+                if self._expires.get(key, now + 1) > now
+            ]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(maxsize={self.maxsize}, currsize={len(self)})"
+
+    @property
+    def currsize(self) -> int:
+        """Current number of entries (cachetools compatible)."""
+        return len(self)
+
+    def clear(self) -> None:
+        """Remove all entries; the frequency sketch is kept."""
+        with self._lock:
+            self._window.clear()
+            self._probation.clear()
+            self._protected.clear()
+            self._expires.clear()
+
+    def expire(self) -> list[tuple[Hashable, Any]]:
+        """Remove expired entries and return them (cachetools compatible)."""
+        with self._lock:
+            now = self.timer()
+            expired = [key for key, expires in self._expires.items() if expires <= now]
+            return [(key, self._remove(key)) for key in expired]
+
+    def entries(self) -> list[tuple[Hashable, Any, float | None]]:
+        """Return live (key, value, seconds left or None) without counting accesses.
+
+        Ordered coldest first (probation, window, protected), so inserting
+        them in order leaves the hottest entries most recently used.
+        """
+        with self._lock:
+            now = self.timer()
+            result = []
+            for region in (self._probation, self._window, self._protected):
+                for key, value in region.items():
+                    expires = self._expires.get(key)
+                    if expires is None:
+                        result.append((key, value, None))
+                    elif expires > now:
+                        result.append((key, value, expires - now))
+            return result
+
+    def restore(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Insert an entry expiring after ttl seconds (capped at the cache's ttl)."""
+        with self._lock:
+            self[key] = value
+            if ttl is not None and key in self._expires:
+                self._expires[key] = min(self._expires[key], self.timer() + ttl)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return region sizes and admission counters."""
+        with self._lock:
+            return {
+                "window_size": len(self._window),
+                "probation_size": len(self._probation),
+                "protected_size": len(self._protected),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+                "sketch_resets": self._sketch.resets,
+            }
@@ -7,6 +7,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
+from .sizing import SIZEOF_STRATEGIES
+
 
 @dataclass
 class CacheConfig:
@@ -17,6 +19,11 @@ class CacheConfig:
     cleanup_interval: int = 300  # 5 minutes
     enable_metrics: bool = True
 
+    # Byte budget: when set, entries are weighted by their estimated size and
+    # max_bytes replaces max_size as the capacity (sizeof: "deep" or "pickle")
+    max_bytes: int | None = None
+    sizeof: str = "deep"
+
     # Security configuration
     encryption_enabled: bool = True
     audit_enabled: bool = True
@@ -56,6 +63,10 @@ class CacheConfig:
             raise ValueError("ttl must be non-negative")
         if self.cleanup_interval < 0:
             raise ValueError("cleanup_interval must be non-negative")
+        if self.max_bytes is not None and self.max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+        if self.sizeof not in SIZEOF_STRATEGIES:
+            raise ValueError(f"sizeof must be one of {sorted(SIZEOF_STRATEGIES)}")
         if self.audit_max_entries < 1:
             raise ValueError("audit_max_entries must be positive")
         if self.audit_retention_days < 1:
@@ -66,6 +66,8 @@ class AIConfig:
     timeout_ms: int = 2000
     weight: float = 0.7  # Weight for AI score in hybrid scoring
     min_confidence: float = 0.3  # Minimum confidence threshold to use AI result
+    classifier_enabled: bool = True  # Serve confident predictions from the local classifier
+    classifier_min_confidence: float = 0.85  # Below this the LLM selector is consulted
 
     @classmethod
     def load_from_environment(cls) -> AIConfig:
@@ -93,6 +95,17 @@ class AIConfig:
             msg = f"ROUTER_AI_MIN_CONFIDENCE must be a valid float, got: {os.getenv('ROUTER_AI_MIN_CONFIDENCE')}"
             raise ValueError(msg) from e
 
+        classifier_enabled = os.getenv("ROUTER_CLASSIFIER_ENABLED", "true").lower() == "true"
+
+        try:
+            classifier_min_confidence = float(os.getenv("ROUTER_CLASSIFIER_MIN_CONFIDENCE", "0.85"))
+        except ValueError as e:
+            msg = (
+                "ROUTER_CLASSIFIER_MIN_CONFIDENCE must be a valid float, "
+                f"got: {os.getenv('ROUTER_CLASSIFIER_MIN_CONFIDENCE')}"
+            )
+            raise ValueError(msg) from e
+
         return cls(
             enabled=enabled,
             provider=provider,
@@ -101,6 +114,8 @@ class AIConfig:
             timeout_ms=timeout_ms,
             weight=weight,
             min_confidence=min_confidence,
+            classifier_enabled=classifier_enabled,
+            classifier_min_confidence=classifier_min_confidence,
         )
 
 
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import yaml
 
+from tool_router.ai.classifier import ClassifierTrainer, ToolClassifier
 from tool_router.ai.enhanced_selector import EnhancedAISelector
 from tool_router.ai.enhanced_selector import OllamaSelector as EnhancedOllamaSelector
-from tool_router.ai.feedback import FeedbackStore
+from tool_router.ai.fast_path import DirectRouteTable
+from tool_router.ai.feedback import FeedbackStore, create_feedback_store
+from tool_router.ai.feedback_writer import FeedbackWriter
 from tool_router.ai.prompt_architect import PromptArchitect
 from tool_router.ai.selector import OllamaSelector
 from tool_router.ai.ui_specialist import UISpecialist
 from tool_router.args.builder import build_arguments
+from tool_router.cache.cache_manager import cache_manager
 from tool_router.core.config import ToolRouterConfig
 from tool_router.gateway.client import call_tool, get_tools
 from tool_router.observability import get_logger, get_metrics
@@ -22,6 +29,11 @@ from tool_router.security import SecurityContext, SecurityMiddleware
 from tool_router.specialist_coordinator import SpecialistCoordinator, SpecialistType, TaskCategory, TaskRequest
 
 
+if TYPE_CHECKING:
+    from tool_router.ai.redis_feedback import RedisFeedbackStore
+    from tool_router.ai.sqlite_feedback import SQLiteFeedbackStore
+
+
 try:
     from mcp.server.fastmcp import FastMCP
 except ImportError:
@@ -36,7 +48,11 @@ metrics = get_metrics()
 _ai_selector: OllamaSelector | None = None
 _enhanced_ai_selector: EnhancedAISelector | None = None
 _specialist_coordinator: SpecialistCoordinator | None = None
-_feedback_store: FeedbackStore | None = None
+_feedback_store: FeedbackStore | RedisFeedbackStore | SQLiteFeedbackStore | None = None
+_feedback_writer: FeedbackWriter | None = None
+_tool_classifier: ToolClassifier | None = None
+_classifier_trainer: ClassifierTrainer | None = None
+_route_table: DirectRouteTable | None = None
 _config: ToolRouterConfig | None = None
 _security_middleware: SecurityMiddleware | None = None
 
@@ -44,8 +60,29 @@ _security_middleware: SecurityMiddleware | None = None
 def initialize_ai(config: ToolRouterConfig) -> None:
     """Initialize AI selector, specialist coordinator, feedback store, and security middleware."""
     global _ai_selector, _enhanced_ai_selector, _specialist_coordinator, _feedback_store, _config, _security_middleware  # noqa: PLW0603
+    global _tool_classifier, _classifier_trainer, _feedback_writer, _route_table  # noqa: PLW0603
     _config = config
-    _feedback_store = FeedbackStore()
+    if os.getenv("CACHE_SNAPSHOT_PATH"):
+        # Before any tool call: caches created from here on are warmed as they register
+        cache_manager.enable_snapshots()
+        atexit.unregister(cache_manager.disable_snapshots)
+        atexit.register(cache_manager.disable_snapshots)
+    # Re-initialization: flush and stop the previous writer, compactor and trainer
+    # before replacing them, so old threads do not leak or append to the same log
+    shutdown_feedback()
+    _tool_classifier = _classifier_trainer = _feedback_writer = None
+    _route_table = DirectRouteTable()
+    _feedback_store = create_feedback_store()
+    _feedback_store.start_compaction()
+    _feedback_writer = FeedbackWriter(_feedback_store)
+    _feedback_writer.start()
+    atexit.unregister(shutdown_feedback)  # Re-initialization must not register the hook twice
+    atexit.register(shutdown_feedback)
+
+    if config.ai.enabled and config.ai.classifier_enabled:
+        _tool_classifier = ToolClassifier.load(min_confidence=config.ai.classifier_min_confidence)
+        _classifier_trainer = ClassifierTrainer(_tool_classifier, _feedback_store)
+        _classifier_trainer.start()  # First pass runs on the trainer thread, not during startup
 
     # Initialize security middleware
     security_config_path = Path(__file__).parent.parent.parent / "config" / "security.yaml"
@@ -118,6 +155,53 @@ def initialize_ai(config: ToolRouterConfig) -> None:
         _specialist_coordinator = None
 
 
+def shutdown_feedback() -> None:
+    """Apply queued feedback, then stop background feedback work and release the store."""
+    if _classifier_trainer:
+        _classifier_trainer.stop()
+    if _feedback_writer:
+        _feedback_writer.stop()
+    if _feedback_store:
+        _feedback_store.close()
+
+
+def _submit_feedback(task: str, tool_name: str, success: bool, context: str, observe_route: bool = True) -> None:
+    """Queue feedback for the background writer, recording inline if it is not running.
+
+    observe_route=False keeps the outcome out of the direct route table: steps of
+    a multi-tool task share the task's template, and would break each other's streaks.
+    """
+    if _route_table and observe_route:
+        _route_table.observe(task, tool_name, success)
+    if _feedback_writer:
+        if not _feedback_writer.submit(task=task, selected_tool=tool_name, success=success, context=context):
+            metrics.increment_counter("feedback.dropped")
+    elif _feedback_store:
+        _feedback_store.record(task=task, selected_tool=tool_name, success=success, context=context)
+
+
+def _lookup_direct_route(tools: list[dict], task: str) -> dict | None:
+    """Return the tool directly routed for the task's template, if it is still registered."""
+    if _route_table is None:
+        return None
+
+    with TimingContext("execute_task.fast_path_lookup"):
+        routed_name = _route_table.lookup(task)
+    if routed_name is None:
+        metrics.increment_counter("execute_task.fast_path.miss")
+        return None
+
+    tool = next((t for t in tools if t.get("name") == routed_name), None)
+    if tool is None:
+        logger.info("Directly routed tool %s is no longer registered", routed_name)
+        _route_table.demote(task)
+        metrics.increment_counter("execute_task.fast_path.miss")
+        return None
+
+    metrics.increment_counter("execute_task.fast_path.hit")
+    return tool
+
+
 @mcp.tool()
 def execute_task(task: str, context: str = "") -> str:
     """Run the best matching gateway tool for the given task."""
@@ -144,26 +228,35 @@ def execute_task(task: str, context: str = "") -> str:
             metrics.increment_counter("execute_task.no_tools")
             return "No tools registered in the gateway."
 
-        try:
-            with TimingContext("execute_task.pick_best_tools"):
-                if _ai_selector and _config:
-                    best_matching_tools = select_top_matching_tools_hybrid(
-                        tools,
-                        task,
-                        context,
-                        top_n=1,
-                        ai_selector=_ai_selector,
-                        ai_weight=_config.ai.weight,
-                        feedback_store=_feedback_store,
-                    )
-                    metrics.increment_counter("execute_task.ai_selection_attempt")
-                else:
-                    best_matching_tools = select_top_matching_tools(tools, task, context, top_n=1)
-                    metrics.increment_counter("execute_task.keyword_only_selection")
-        except Exception as selection_error:
-            logger.exception("Error picking tool: %s: %s", type(selection_error).__name__, selection_error)
-            metrics.increment_counter("execute_task.errors.pick_tools")
-            return f"Error picking tool: {type(selection_error).__name__}: {selection_error}"
+        # Templates that keep succeeding with one tool skip scoring entirely
+        routed_tool = _lookup_direct_route(tools, task)
+        if routed_tool:
+            best_matching_tools = [routed_tool]
+        else:
+            try:
+                pick_started = time.perf_counter()
+                with TimingContext("execute_task.pick_best_tools"):
+                    if _ai_selector and _config:
+                        best_matching_tools = select_top_matching_tools_hybrid(
+                            tools,
+                            task,
+                            context,
+                            top_n=1,
+                            ai_selector=_ai_selector,
+                            ai_weight=_config.ai.weight,
+                            feedback_store=_feedback_store,
+                            tool_classifier=_tool_classifier,
+                        )
+                        metrics.increment_counter("execute_task.ai_selection_attempt")
+                    else:
+                        best_matching_tools = select_top_matching_tools(tools, task, context, top_n=1)
+                        metrics.increment_counter("execute_task.keyword_only_selection")
+                if _route_table:
+                    _route_table.record_scoring_latency((time.perf_counter() - pick_started) * 1000)
+            except Exception as selection_error:
+                logger.exception("Error picking tool: %s: %s", type(selection_error).__name__, selection_error)
+                metrics.increment_counter("execute_task.errors.pick_tools")
+                return f"Error picking tool: {type(selection_error).__name__}: {selection_error}"
 
         if not best_matching_tools:
             logger.warning("No matching tool found for task")
@@ -192,9 +285,8 @@ def execute_task(task: str, context: str = "") -> str:
             result = call_tool(name, tool_arguments)
 
         # Record feedback (success = no error string returned)
-        if _feedback_store:
-            success = not result.startswith("Error") and not result.startswith("Failed")
-            _feedback_store.record(task=task, selected_tool=name, success=success, context=context)
+        success = not result.startswith("Error") and not result.startswith("Failed")
+        _submit_feedback(task, name, success, context)
 
         logger.info("Task completed successfully with tool: %s", name)
         metrics.increment_counter("execute_task.success")
@@ -245,6 +337,7 @@ def execute_tasks(task: str, context: str = "", max_tools: int = 3) -> str:
 
         results: list[str] = []
         accumulated_context = context
+        single_tool = len(selected_names) == 1  # Only single-tool routes can become direct routes
 
         for step_num, tool_name in enumerate(selected_names, 1):
             tool = tool_map.get(tool_name)
@@ -260,23 +353,14 @@ def execute_tasks(task: str, context: str = "", max_tools: int = 3) -> str:
             except Exception as build_error:  # noqa: BLE001
                 logger.warning("Error building arguments for %s: %s", tool_name, build_error)
                 results.append(f"[{tool_name}] Error building arguments: {build_error}")
-                if _feedback_store:
-                    _feedback_store.record(
-                        task=task, selected_tool=tool_name, success=False, context=accumulated_context
-                    )
+                _submit_feedback(task, tool_name, False, accumulated_context, observe_route=single_tool)
                 continue
 
             step_result = call_tool(tool_name, tool_arguments)
             results.append(f"[{tool_name}] {step_result}")
 
             step_success = not step_result.startswith("Error") and not step_result.startswith("Failed")
-            if _feedback_store:
-                _feedback_store.record(
-                    task=task,
-                    selected_tool=tool_name,
-                    success=step_success,
-                    context=accumulated_context,
-                )
+            _submit_feedback(task, tool_name, step_success, accumulated_context, observe_route=single_tool)
 
             # Accumulate context for next step
             accumulated_context = f"{accumulated_context}\nPrevious result: {step_result[:200]}"
@@ -293,13 +377,35 @@ def record_feedback(tool_name: str, task: str, success: bool, context: str = "")
     """Record explicit feedback on a tool selection outcome for context learning."""
     if _feedback_store is None:
         return "Feedback store not initialized."
-    _feedback_store.record(task=task, selected_tool=tool_name, success=success, context=context)
+    # The outcome is applied in the background, so report the rate including it
     stats = _feedback_store.get_stats(tool_name)
-    rate = stats.success_rate if stats else 0.5
+    successes = (stats.success_count if stats else 0) + int(success)
+    total = (stats.total if stats else 0) + 1
+    rate = successes / total
+    _submit_feedback(task, tool_name, success, context)
     logger.info("Feedback recorded: tool=%s success=%s rate=%.2f", tool_name, success, rate)
     return f"Feedback recorded for '{tool_name}'. Current success rate: {rate:.0%}"
 
 
+@mcp.tool()
+def get_fast_path_stats() -> str:
+    """Get hit rate and estimated latency savings of learned direct routes."""
+    if _route_table is None:
+        return "Direct route table not initialized."
+
+    stats = _route_table.get_stats()
+    return "\n".join(
+        [
+            "Direct Route Statistics:",
+            f"  Routes: {stats['routes']} (of {stats['templates']} tracked templates)",
+            f"  Hit rate: {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)",
+            f"  Promotions: {stats['promotions']}, demotions: {stats['demotions']}",
+            f"  Average lookup: {stats['avg_lookup_ms']:.3f}ms vs scored selection: {stats['avg_scored_ms']:.1f}ms",
+            f"  Estimated time saved: {stats['estimated_saved_ms']:.0f}ms",
+        ]
+    )
+
+
 @mcp.tool()
 def search_tools(query: str, limit: int = 10) -> str:
     """Search available tools by name or description. Returns a list of matching tools with their details."""
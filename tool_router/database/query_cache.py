@@ -5,14 +5,44 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable
 from dataclasses import asdict, dataclass
 from typing import Any
 
 from ..cache import cache_manager, create_ttl_cache, get_cache_metrics
+from ..cache.stampede import get_or_compute, unwrap
 
 
 logger = logging.getLogger(__name__)
 
+_ANY_TABLE = "*"  # Dependency of queries whose tables could not be determined
+_EPOCH = ""  # Snapshot slot bumped by invalidate_all()
+_IDENT = r'(?:[`"\[]?[A-Za-z_][\w$]*[`"\]]?\.)*[`"\[]?[A-Za-z_][\w$]*[`"\]]?'
+_TABLE_REF = re.compile(rf"\b(?:from|join|update|into|table)\s+({_IDENT})", re.IGNORECASE)
+_FROM_LIST = re.compile(
+    rf"\bfrom\s+({_IDENT}(?:\s+(?:as\s+)?\w+)?(?:\s*,\s*{_IDENT}(?:\s+(?:as\s+)?\w+)?)+)", re.IGNORECASE
+)
+
+
+def _normalize_table(name: str) -> str:
+    """Lowercase, unquote and drop the schema: '"Public"."Users"' -> 'users'."""
+    return name.strip().split(".")[-1].strip('`"[]').lower()
+
+
+def extract_tables(query: str) -> frozenset[str]:
+    """Return the tables a SQL statement reads or writes (FROM, JOIN, UPDATE, INTO).
+
+    Best effort: names that merely look like tables (CTE names, functions in
+    FROM) are included too, which only makes invalidation more conservative.
+    """
+    tables = {_normalize_table(match) for match in _TABLE_REF.findall(query)}
+    for from_list in _FROM_LIST.findall(query):
+        tables.update(_normalize_table(part.split()[0]) for part in from_list.split(","))
+    return frozenset(tables)
+
 
 @dataclass
 class QueryCacheConfig:
@@ -33,6 +63,14 @@ class DatabaseQueryCache:
         self.config = config or QueryCacheConfig()
         self._cache = None
 
+        # Table dependency tracking: a per-table generation counter makes every
+        # entry of a table stale in O(1); the reverse index finds those entries
+        # to drop them without touching queries on other tables.
+        self._index_lock = threading.RLock()
+        self._generations: dict[str, int] = defaultdict(int)
+        self._table_keys: dict[str, set[str]] = defaultdict(set)
+        self._key_snapshots: dict[str, tuple[tuple[str, int], ...]] = {}
+
         if self.config.enabled:
             self._cache = create_ttl_cache(
                 f"{self.config.cache_key_prefix}_cache", max_size=self.config.max_size, ttl=self.config.default_ttl
@@ -43,13 +81,15 @@ class DatabaseQueryCache:
         else:
             logger.info("Database query cache disabled")
 
-    def _generate_cache_key(self, query: str, params: tuple | None = None, table: str | None = None) -> str:
+    def _generate_cache_key(
+        self, query: str, params: tuple | None = None, table: str | Iterable[str] | None = None
+    ) -> str:
         """Generate a cache key for a database query."""
         # Create a deterministic key from query and parameters
         key_data = {
             "query": query.strip().lower(),
             "params": params if params else (),
-            "table": table if table else None,
+            "table": sorted(table) if table and not isinstance(table, str) else table or None,
         }
 
         # Use JSON serialization for consistent key generation
@@ -58,15 +98,16 @@ class DatabaseQueryCache:
 
         return f"{self.config.cache_key_prefix}:{key_hash}"
 
-    def get(self, query: str, params: tuple | None = None, table: str | None = None) -> Any | None:
+    def get(self, query: str, params: tuple | None = None, table: str | Iterable[str] | None = None) -> Any | None:
         """Get cached query result."""
-        if not self.config.enabled or not self.config.cache_reads or not self._cache:
+        if not self.config.enabled or not self.config.cache_reads or self._cache is None:
             return None
 
         cache_key = self._generate_cache_key(query, params, table)
 
         try:
-            result = self._cache[cache_key]
+            self._check_current(cache_key)
+            result = unwrap(self._cache[cache_key])
             cache_manager.record_hit(f"{self.config.cache_key_prefix}_cache")
             logger.debug(f"Cache hit for query: {query[:50]}...")
             return result
@@ -76,10 +117,15 @@ class DatabaseQueryCache:
             return None
 
     def set(
-        self, query: str, result: Any, params: tuple | None = None, table: str | None = None, ttl: int | None = None
+        self,
+        query: str,
+        result: Any,
+        params: tuple | None = None,
+        table: str | Iterable[str] | None = None,
+        ttl: int | None = None,
     ) -> None:
         """Cache a query result."""
-        if not self.config.enabled or not self.config.cache_reads or not self._cache:
+        if not self.config.enabled or not self.config.cache_reads or self._cache is None:
             return
 
         # Don't cache None results or empty lists
@@ -89,49 +135,168 @@ class DatabaseQueryCache:
         cache_key = self._generate_cache_key(query, params, table)
 
         try:
-            self._cache[cache_key] = result
+            with self._index_lock:
+                self._track(cache_key, self._tables_for(query, table))
+                self._cache[cache_key] = result
             logger.debug(f"Cached result for query: {query[:50]}...")
         except Exception as e:
             logger.warning(f"Failed to cache query result: {e}")
 
-    def invalidate(self, query: str, params: tuple | None = None, table: str | None = None) -> None:
+    def get_or_compute(
+        self,
+        query: str,
+        compute: Callable[[], Any],
+        params: tuple | None = None,
+        table: str | Iterable[str] | None = None,
+        ttl: int | None = None,
+    ) -> Any:
+        """Return the cached query result, running compute at most once at a time on a miss.
+
+        Concurrent misses for the same query wait for a single execution, and
+        popular entries are refreshed shortly before they expire (XFetch).
+        None and empty list results are returned but not cached, as in set().
+        A result computed while one of its tables is invalidated is treated
+        as stale on its next read.
+        """
+        if not self.config.enabled or not self.config.cache_reads or self._cache is None:
+            return compute()
+
+        cache_name = f"{self.config.cache_key_prefix}_cache"
+        cache_key = self._generate_cache_key(query, params, table)
+        with self._index_lock:
+            try:
+                self._check_current(cache_key)
+            except KeyError:
+                # Snapshot the generations before running the query; keep the
+                # snapshot of a caller already computing it, so its result is
+                # still checked against the generations it started from
+                if cache_key not in self._key_snapshots:
+                    self._track(cache_key, self._tables_for(query, table))
+        computed = False
+
+        def tracked_compute() -> Any:
+            nonlocal computed
+            computed = True
+            return compute()
+
+        result = get_or_compute(
+            self._cache,
+            cache_key,
+            tracked_compute,
+            ttl=ttl or self.config.default_ttl,
+            cache_if=lambda value: not (value is None or (isinstance(value, list) and len(value) == 0)),
+        )
+        if computed:
+            cache_manager.record_miss(cache_name)
+        else:
+            cache_manager.record_hit(cache_name)
+        return result
+
+    def invalidate(self, query: str, params: tuple | None = None, table: str | Iterable[str] | None = None) -> None:
         """Invalidate a specific cached query."""
-        if not self.config.enabled or not self._cache:
+        if not self.config.enabled or self._cache is None:
             return
 
         cache_key = self._generate_cache_key(query, params, table)
-        self._cache.pop(cache_key, None)
+        with self._index_lock:
+            self._cache.pop(cache_key, None)
+            self._untrack(cache_key)
         logger.debug(f"Invalidated cache for query: {query[:50]}...")
 
-    def invalidate_table(self, table: str) -> None:
-        """Invalidate all cached queries for a specific table."""
-        if not self.config.enabled or not self._cache:
-            return
-
-        # This is a simple implementation - in production, you might want to track
-        # cache keys by table for more efficient invalidation
-        keys_to_remove = []
-        for key in self._cache.keys():
-            if key.startswith(f"{self.config.cache_key_prefix}:"):
-                # For now, we'll clear all cache entries when a table is invalidated
-                # In a more sophisticated implementation, we could track table dependencies
-                keys_to_remove.append(key)
-
-        for key in keys_to_remove:
-            self._cache.pop(key, None)
-
-        if keys_to_remove:
-            logger.info(f"Invalidated {len(keys_to_remove)} cache entries for table: {table}")
+    def invalidate_table(self, table: str, lazy: bool = False) -> int:
+        """Invalidate the cached queries that depend on a table.
+
+        Bumping the table's generation makes its entries stale immediately;
+        unless lazy, they are also removed now through the reverse index.
+        Queries on other tables are untouched, except those whose tables
+        could not be determined.
+
+        Returns:
+            The number of entries removed
+        """
+        if not self.config.enabled or self._cache is None:
+            return 0
+
+        table = _normalize_table(table)
+        with self._index_lock:
+            self._generations[table] += 1
+            self._generations[_ANY_TABLE] += 1
+            if lazy:
+                return 0
+            keys = self._table_keys.get(table, set()) | self._table_keys.get(_ANY_TABLE, set())
+            removed = 0
+            for key in keys:
+                if self._cache.pop(key, None) is not None:
+                    removed += 1
+                self._untrack(key)
+
+        if removed:
+            logger.info(f"Invalidated {removed} cache entries for table: {table}")
+        return removed
 
     def invalidate_all(self) -> None:
-        """Invalidate all cached queries."""
-        if not self.config.enabled or not self._cache:
+        """Invalidate all cached queries, including results still being computed."""
+        if not self.config.enabled or self._cache is None:
             return
 
-        cache_size = len(self._cache)
-        self._cache.clear()
+        with self._index_lock:
+            cache_size = len(self._cache)
+            self._generations[_EPOCH] += 1
+            self._cache.clear()
+            self._table_keys.clear()
+            self._key_snapshots.clear()
         logger.info(f"Invalidated {cache_size} cache entries")
 
+    # -- table dependency tracking ---------------------------------------------
+
+    def _tables_for(self, query: str, table: str | Iterable[str] | None) -> frozenset[str]:
+        """Tables a query depends on: parsed from the SQL plus the declared ones."""
+        declared = [table] if isinstance(table, str) else list(table or ())
+        tables = extract_tables(query) | {_normalize_table(name) for name in declared}
+        return tables or frozenset({_ANY_TABLE})
+
+    def _snapshot(self, tables: frozenset[str]) -> tuple[tuple[str, int], ...]:
+        return tuple((name, self._generations[name]) for name in sorted(tables | {_EPOCH}))
+
+    def _track(self, cache_key: str, tables: frozenset[str]) -> None:
+        """Record the tables and current generations of an entry (caller holds the lock)."""
+        self._untrack(cache_key)
+        self._key_snapshots[cache_key] = self._snapshot(tables)
+        for name in tables:
+            self._table_keys[name].add(cache_key)
+        if len(self._key_snapshots) > 2 * self.config.max_size:
+            self._prune()
+
+    def _untrack(self, cache_key: str) -> None:
+        snapshot = self._key_snapshots.pop(cache_key, ())
+        for name, _ in snapshot:
+            keys = self._table_keys.get(name)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._table_keys[name]
+
+    def _check_current(self, cache_key: str) -> None:
+        """Drop an entry whose tables changed since it was computed.
+
+        Raises:
+            KeyError: If the entry is missing or stale
+        """
+        with self._index_lock:
+            if cache_key not in self._cache:
+                raise KeyError(cache_key)
+            snapshot = self._key_snapshots.get(cache_key)
+            # Without a snapshot the entry cannot be checked: treat it as stale
+            if snapshot is None or any(self._generations[name] != generation for name, generation in snapshot):
+                self._cache.pop(cache_key, None)
+                self._untrack(cache_key)
+                raise KeyError(cache_key)
+
+    def _prune(self) -> None:
+        """Forget entries the cache has expired or evicted (caller holds the lock)."""
+        for cache_key in [key for key in self._key_snapshots if key not in self._cache]:
+            self._untrack(cache_key)
+
     def get_metrics(self) -> dict[str, Any]:
         """Get cache performance metrics."""
         if not self.config.enabled:
@@ -139,18 +304,23 @@ class DatabaseQueryCache:
 
         cache_metrics = get_cache_metrics(f"{self.config.cache_key_prefix}_cache")
 
+        with self._index_lock:
+            tracked_tables = len(self._table_keys)
+
         return {
             "enabled": True,
             "config": asdict(self.config),
-            "cache_size": len(self._cache) if self._cache else 0,
+            "cache_size": len(self._cache) if self._cache is not None else 0,
+            "tracked_tables": tracked_tables,
             "metrics": cache_metrics,
         }
 
     def cleanup(self) -> None:
-        """Clean up expired cache entries."""
-        if self._cache and hasattr(self._cache, "expire"):
-            # TTLCache handles expiration automatically
-            pass
+        """Clean up expired cache entries and their table index entries."""
+        if self._cache is not None and hasattr(self._cache, "expire"):
+            with self._index_lock:
+                self._cache.expire()
+                self._prune()
 
 
 # Global query cache instance
@@ -162,8 +332,12 @@ def get_query_cache() -> DatabaseQueryCache:
     return query_cache
 
 
-def cached_query(ttl: int | None = None, table: str | None = None):
-    """Decorator for caching database query functions."""
+def cached_query(ttl: int | None = None, table: str | Iterable[str] | None = None):
+    """Decorator for caching database query functions.
+
+    Tables are parsed from the SQL; table declares extra (or all) tables the
+    result depends on, e.g. ``table=("users", "orders")`` for a view.
+    """
 
     def decorator(func):
         def wrapper(*args, **kwargs):
@@ -176,18 +350,8 @@ def cached_query(ttl: int | None = None, table: str | None = None):
             if not query:
                 return func(*args, **kwargs)
 
-            # Try to get from cache
-            cached_result = query_cache.get(query, params, table)
-            if cached_result is not None:
-                return cached_result
-
-            # Execute the query
-            result = func(*args, **kwargs)
-
-            # Cache the result
-            query_cache.set(query, result, params, table, ttl)
-
-            return result
+            # Only one caller executes a missing query; the others wait for its result
+            return query_cache.get_or_compute(query, lambda: func(*args, **kwargs), params, table, ttl)
 
         wrapper.cache = query_cache
         return wrapper
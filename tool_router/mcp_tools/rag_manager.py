@@ -12,6 +12,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+from tool_router.ai.keywords import RAG_INTENT_RULES, get_task_classifier
 from tool_router.training.data_extraction import PatternCategory
 
 # Import existing knowledge base
@@ -99,40 +100,11 @@ class RAGManagerTool:
 
     def _classify_intent(self, query: str, agent_type: str) -> str:
         """Classify query intent based on research-backed categories"""
-        query_lower = query.lower()
-
-        # UI Specialist patterns
-        if agent_type == "ui_specialist":
-            if any(word in query_lower for word in ["create", "generate", "build", "make"]):
-                return "implicit_fact"  # Component creation requires reasoning
-            if any(word in query_lower for word in ["how to", "why", "what is", "explain"]):
-                return "interpretable_rationale"
-            if any(word in query_lower for word in ["fix", "debug", "error", "problem"]):
-                return "hidden_rationale"
-            return "explicit_fact"
-
-        # Prompt Architect patterns
-        if agent_type == "prompt_architect":
-            if any(word in query_lower for word in ["optimize", "improve", "enhance"]):
-                return "interpretable_rationale"
-            if any(word in query_lower for word in ["template", "pattern", "structure"]):
-                return "implicit_fact"
-            if any(word in query_lower for word in ["technique", "method", "approach"]):
-                return "hidden_rationale"
+        rule_set = RAG_INTENT_RULES.get(agent_type)
+        if rule_set is None:
+            # Default classification
             return "explicit_fact"
-
-        # Router Specialist patterns
-        if agent_type == "router_specialist":
-            if any(word in query_lower for word in ["route", "assign", "delegate"]):
-                return "interpretable_rationale"
-            if any(word in query_lower for word in ["performance", "optimize", "speed"]):
-                return "hidden_rationale"
-            if any(word in query_lower for word in ["specialist", "agent", "service"]):
-                return "implicit_fact"
-            return "explicit_fact"
-
-        # Default classification
-        return "explicit_fact"
+        return get_task_classifier().label(query, rule_set.name)
 
     def _extract_entities(self, query: str) -> list[str]:
         """Extract entities from query using simple patterns"""
@@ -116,11 +116,14 @@ def select_top_matching_tools_hybrid(  # noqa: PLR0913
     ai_selector: OllamaSelector | None = None,
     ai_weight: float = 0.7,
     feedback_store: Any = None,
+    tool_classifier: Any = None,
 ) -> list[dict[str, Any]]:
     """Select the best matching tools using enhanced hybrid AI + keyword scoring.
 
     When a feedback_store is provided, comprehensive learning signals are used to
-    boost or penalise tool scores via multi-factor analysis.
+    boost or penalise tool scores via multi-factor analysis. When a
+    tool_classifier is provided and confident, its prediction stands in for the
+    AI selector and the LLM is not called.
     """
     if not tools:
         return []
@@ -130,6 +133,9 @@ def select_top_matching_tools_hybrid(  # noqa: PLR0913
     for tool in tools:
         keyword_scores[tool.get("name", "")] = calculate_tool_relevance_score(task, context or "", tool)
 
+    # Rank by keyword score so a token-budgeted selector prompt keeps the best candidates
+    ranked_tools = sorted(tools, key=lambda t: -keyword_scores[t.get("name", "")])
+
     # Retrieve similar tools from feedback history for the AI prompt
     similar_tools: list[str] = []
     if feedback_store:
@@ -140,9 +146,18 @@ def select_top_matching_tools_hybrid(  # noqa: PLR0913
     ai_score = 0.0
     selected_tool_name = None
 
-    if ai_selector:
+    # Try the local classifier first; only consult the LLM when it is not confident
+    if tool_classifier:
+        prediction = tool_classifier.predict(task)
+        if prediction and prediction[0] in keyword_scores:
+            selected_tool_name, ai_score = prediction
+            logger.info("Classifier selected tool: %s with confidence: %.2f", selected_tool_name, ai_score)
+
+    if ai_selector and selected_tool_name is None:
         try:
-            ai_result = ai_selector.select_tool(task, tools, context=context or "", similar_tools=similar_tools or None)
+            ai_result = ai_selector.select_tool(
+                task, ranked_tools, context=context or "", similar_tools=similar_tools or None
+            )
             if ai_result:
                 selected_tool_name = ai_result.get("tool_name")
                 ai_score = ai_result.get("confidence", 0.0)
@@ -150,6 +165,9 @@ def select_top_matching_tools_hybrid(  # noqa: PLR0913
         except Exception as e:  # noqa: BLE001
             logger.warning("AI selection failed: %s", e)
 
+    # Classify the task once; per-tool feedback boosts are then plain lookups
+    boost_table = feedback_store.get_boost_table(task) if feedback_store else {}
+
     # Calculate enhanced hybrid scores
     hybrid_scores = []
     for tool in tools:
@@ -174,11 +192,8 @@ def select_top_matching_tools_hybrid(  # noqa: PLR0913
             # Non-AI-selected tools get keyword-only scoring
             hybrid_score = normalized_keyword_score * (1 - ai_weight)
 
-        # Apply enhanced feedback boost multipliers
-        if feedback_store:
-            # Use comprehensive boost that considers multiple factors
-            boost = feedback_store.get_comprehensive_boost(tool_name, task)
-            hybrid_score *= boost
+        # Apply the comprehensive feedback boost (tools without feedback stay neutral)
+        hybrid_score *= boost_table.get(tool_name, 1.0)
 
         hybrid_scores.append((tool, hybrid_score))
 
@@ -213,6 +228,9 @@ def select_top_matching_tools_enhanced(  # noqa: PLR0913
     if feedback_store and use_nlp_hints:
         intent_hints = feedback_store.get_adaptive_hints(task)
 
+    # Rank by keyword score so a token-budgeted selector prompt keeps the best candidates
+    ranked_tools = sorted(tools, key=lambda t: -keyword_scores[t.get("name", "")])
+
     # Retrieve similar tools and learning insights
     similar_tools: list[str] = []
     learning_insights = {}
@@ -227,7 +245,9 @@ def select_top_matching_tools_enhanced(  # noqa: PLR0913
 
     if ai_selector:
         try:
-            ai_result = ai_selector.select_tool(task, tools, context=context or "", similar_tools=similar_tools or None)
+            ai_result = ai_selector.select_tool(
+                task, ranked_tools, context=context or "", similar_tools=similar_tools or None
+            )
             if ai_result:
                 selected_tool_name = ai_result.get("tool_name")
                 ai_score = ai_result.get("confidence", 0.0)
@@ -235,6 +255,8 @@ def select_top_matching_tools_enhanced(  # noqa: PLR0913
         except Exception as e:  # noqa: BLE001
             logger.warning("Enhanced AI selection failed: %s", e)
 
+    boost_table = feedback_store.get_boost_table(task) if feedback_store else {}
+
     # Calculate enhanced hybrid scores
     enhanced_scores = []
     for tool in tools:
@@ -249,10 +271,7 @@ def select_top_matching_tools_enhanced(  # noqa: PLR0913
             base_score = normalized_keyword_score * (1 - ai_weight)
 
         # Apply comprehensive feedback boost
-        final_score = base_score
-        if feedback_store:
-            comprehensive_boost = feedback_store.get_comprehensive_boost(tool_name, task)
-            final_score *= comprehensive_boost
+        final_score = base_score * boost_table.get(tool_name, 1.0)
 
         # Add learning-based adjustments
         if learning_insights:
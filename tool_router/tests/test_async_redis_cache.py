@@ -0,0 +1,127 @@
+"""Test the asynchronous Redis cache backend."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from tool_router.cache.async_redis_cache import AsyncRedisCache
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.redis_cache import RedisConfig
+from tool_router.cache.types import CacheConfig
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def fake_client():
+    """Patch redis.asyncio.Redis to an in-memory fake client."""
+    client = fakeredis.FakeAsyncRedis()
+    with patch("tool_router.cache.async_redis_cache.aioredis.Redis", return_value=client):
+        yield client
+
+
+class TestAsyncRedisCache:
+    """Test AsyncRedisCache operations and fallback."""
+
+    @pytest.mark.asyncio
+    async def test_basic_operations(self, fake_client):
+        """Test get/set/delete/exists against Redis."""
+        cache = AsyncRedisCache(RedisConfig())
+
+        assert await cache.set("key", {"value": 1}) is True
+        assert await cache.get("key") == {"value": 1}
+        assert await cache.exists("key") is True
+        assert await fake_client.exists("mcp_cache:key") == 1
+
+        assert await cache.delete("key") is True
+        assert await cache.get("key", "default") == "default"
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_operations_and_clear(self, fake_client):
+        """Test pipelined set_many, get_many and SCAN based clear."""
+        cache = AsyncRedisCache(RedisConfig(), serializer="json", compression="zlib", compress_threshold=0)
+        await fake_client.set("other:keep", b"1")
+
+        assert await cache.set_many({f"k{i}": i for i in range(20)}, ttl=60) is True
+        assert await cache.get_many(["k1", "k2", "missing"]) == {"k1": 1, "k2": 2}
+
+        assert await cache.clear(batch_size=7) is True
+        assert await fake_client.keys("*") == [b"other:keep"]
+        assert cache.get_clear_progress()["deleted"] == 20
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_redis_unavailable(self):
+        """Test operations use the fallback cache when Redis cannot be reached."""
+        manager = CacheManager()
+        with patch("tool_router.cache.async_redis_cache.ASYNC_REDIS_AVAILABLE", False):
+            cache = manager.create_redis_cache("async", fallback_config=CacheConfig(max_size=10, ttl=60), async_=True)
+            assert isinstance(cache, AsyncRedisCache)
+
+            assert await cache.set("key", "value") is True
+            assert await cache.get("key") == "value"
+            assert await cache.get_many(["key"]) == {"key": "value"}
+            assert await cache.delete("key") is True
+            assert await cache.exists("key") is False
+
+    @pytest.mark.asyncio
+    async def test_loop_binding_error_discards_client(self, fake_client):
+        """Test a client bound to a closed event loop is dropped instead of reused."""
+        cache = AsyncRedisCache(RedisConfig())
+        assert await cache.set("key", "value") is True
+        assert cache._is_healthy is True
+
+        with patch.object(fake_client, "get", AsyncMock(side_effect=RuntimeError("Event loop is closed"))):
+            assert await cache.get("key", "default") == "default"
+        assert cache._is_healthy is False
+        assert cache._redis_client is None
+
+    @pytest.mark.asyncio
+    async def test_unencodable_value_keeps_client(self, fake_client):
+        """Test a value that cannot be pickled does not affect other keys."""
+        cache = AsyncRedisCache(RedisConfig())
+        assert await cache.set("a", "value") is True
+
+        assert await cache.set("b", lambda: 0) is False
+        assert cache._is_healthy is True
+        assert await cache.get("a") == "value"
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_undecodable_value_keeps_client(self, fake_client):
+        """Test a corrupt stored value is a miss, not a connection failure."""
+        cache = AsyncRedisCache(RedisConfig())
+        await fake_client.set("mcp_cache:key", b"\xff garbage")
+
+        assert await cache.get("key", "default") == "default"
+        assert cache._is_healthy is True
+        await cache.close()
+
+
+class TestManagerClear:
+    """Test clearing async caches through the synchronous CacheManager API."""
+
+    def test_sync_clear_without_loop_rejected(self, fake_client):
+        """Test clearing outside an event loop raises instead of using a throwaway loop."""
+        manager = CacheManager()
+        cache = manager.create_redis_cache("async", async_=True)
+
+        with pytest.raises(RuntimeError, match="event loop"):
+            manager.clear_cache("async")
+        assert cache._redis_client is None
+
+    @pytest.mark.asyncio
+    async def test_clear_inside_loop_is_scheduled(self, fake_client):
+        """Test clearing from a running loop completes on that loop."""
+        manager = CacheManager()
+        cache = manager.create_redis_cache("async", async_=True)
+        await cache.set("key", "value")
+
+        manager.clear_cache("async")
+        await asyncio.gather(*manager._pending_tasks)
+        assert await fake_client.keys("*") == []
+        await cache.close()
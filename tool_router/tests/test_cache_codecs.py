@@ -0,0 +1,53 @@
+"""Test cache value codecs."""
+
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+
+from tool_router.cache.codecs import CacheCodec, available_compressors, available_serializers
+
+
+PAYLOAD = {"tools": [{"name": f"tool_{i}", "description": "search the web " * 5} for i in range(50)]}
+
+
+class TestCacheCodec:
+    """Test serializer/compressor round trips and the header format."""
+
+    @pytest.mark.parametrize("serializer", available_serializers())
+    @pytest.mark.parametrize("compression", [None, *available_compressors()])
+    def test_round_trip(self, serializer, compression):
+        """Test every serializer/compressor combination decodes its own output."""
+        codec = CacheCodec(serializer, compression=compression)
+        assert codec.decode(codec.encode(PAYLOAD)) == PAYLOAD
+
+    def test_compression_threshold(self):
+        """Test small values are stored uncompressed and large ones compressed."""
+        codec = CacheCodec("json", compression="zlib", compress_threshold=256)
+        small = codec.encode({"a": 1})
+        large = codec.encode(PAYLOAD)
+
+        assert small[0] & 0x7 == 0
+        assert large[0] & 0x7 != 0
+        stats = codec.get_stats()
+        assert stats["compressed"] == 1
+        assert stats["compression_ratio"] > 1.0
+        assert stats["avg_encode_ms"] >= 0.0
+
+    def test_mixed_formats_decode(self):
+        """Test values from other codecs and legacy header-less values decode."""
+        reader = CacheCodec("pickle")
+        writer = CacheCodec("json", compression="zlib", compress_threshold=0)
+
+        assert reader.decode(writer.encode(PAYLOAD)) == PAYLOAD
+        assert reader.decode(pickle.dumps(PAYLOAD)) == PAYLOAD
+        assert CacheCodec("json").decode(json.dumps(PAYLOAD).encode()) == PAYLOAD
+
+    def test_unknown_codec_rejected(self):
+        """Test unregistered names raise ValueError."""
+        with pytest.raises(ValueError, match="serializer"):
+            CacheCodec("yaml")
+        with pytest.raises(ValueError, match="compression"):
+            CacheCodec("pickle", compression="brotli")
@@ -0,0 +1,89 @@
+"""Test the per-thread cache metrics counters."""
+
+from __future__ import annotations
+
+import threading
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.counters import CacheCounters
+
+
+class TestCacheCounters:
+    """Test counting and lazy aggregation."""
+
+    def test_snapshot_computes_hit_rate(self):
+        """Test the hit rate is derived from the summed counters."""
+        counters = CacheCounters()
+        assert counters.snapshot().hit_rate == 0.0
+
+        for _ in range(3):
+            counters.hit()
+        counters.miss()
+        counters.eviction()
+
+        metrics = counters.snapshot()
+        assert (metrics.hits, metrics.misses, metrics.evictions) == (3, 1, 1)
+        assert metrics.total_requests == 4
+        assert metrics.hit_rate == 0.75
+
+    def test_threads_counted_and_retired(self):
+        """Test counts from finished threads survive while their cells are dropped."""
+        counters = CacheCounters()
+
+        def work():
+            for _ in range(5000):
+                counters.hit()
+                counters.miss()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = counters.snapshot()
+        assert metrics.hits == metrics.misses == 40000
+        assert counters._cells == []
+        assert counters.snapshot().hits == 40000
+
+
+class TestManagerMetrics:
+    """Test CacheManager metrics built on the counters."""
+
+    def test_concurrent_recording(self):
+        """Test hits and misses from many threads are all counted per cache and globally."""
+        manager = CacheManager()
+        manager.create_lru_cache("tools")
+        manager.create_lru_cache("plans")
+
+        def work():
+            for _ in range(1000):
+                manager.record_hit("tools")
+                manager.record_miss("plans")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metrics = manager.get_metrics()
+        assert metrics["tools"]["hits"] == 4000
+        assert metrics["tools"]["hit_rate"] == 1.0
+        assert metrics["plans"]["misses"] == 4000
+        assert metrics["global"]["total_requests"] == 8000
+        assert metrics["global"]["hit_rate"] == 0.5
+
+    def test_reset(self):
+        """Test resetting starts fresh counters for one cache or all of them."""
+        manager = CacheManager()
+        manager.create_lru_cache("tools")
+        manager.record_hit("tools")
+        manager.record_hit("unregistered")
+
+        manager.reset_metrics("tools")
+        assert manager.get_metrics("tools")["hits"] == 0
+        assert manager.get_metrics()["global"]["hits"] == 2
+
+        manager.reset_metrics()
+        assert manager.get_metrics()["global"]["hits"] == 0
@@ -0,0 +1,125 @@
+"""Test byte-bounded caches and memory accounting."""
+
+from __future__ import annotations
+
+import pickle
+import sys
+import time
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.dashboard import CacheAlertManager, CachePerformanceCollector
+from tool_router.cache.sizing import ByteLRUCache, MemoryBudget, deep_getsizeof, pickled_size
+from tool_router.cache.types import CacheConfig
+
+
+class TestSizeof:
+    """Test the sizeof strategies."""
+
+    def test_pickled_size(self):
+        """Test the pickle strategy measures the pickled length."""
+        value = {"tool": "search", "args": list(range(10))}
+        assert pickled_size(value) == len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def test_deep_getsizeof_counts_contents(self):
+        """Test nested contents are included and shared objects counted once."""
+        payload = "x" * 10_000
+        assert deep_getsizeof([payload]) > sys.getsizeof(payload)
+        assert deep_getsizeof([payload, payload]) == sys.getsizeof([payload, payload]) + sys.getsizeof(payload)
+
+    def test_deep_getsizeof_samples_large_containers(self):
+        """Test large containers are extrapolated from a sample close to the exact size."""
+        value = [str(i) * 20 for i in range(5000)]
+        exact = deep_getsizeof(value, sample=len(value))
+        assert abs(deep_getsizeof(value, sample=32) - exact) / exact < 0.1
+
+
+class TestByteBoundedCache:
+    """Test byte-driven eviction."""
+
+    def test_evicts_by_bytes(self):
+        """Test a few large values evict entries although the entry count is small."""
+        evicted = []
+        cache = ByteLRUCache(max_bytes=10_000, sizeof=len, on_evict=lambda key, value: evicted.append(key))
+        for i in range(5):
+            cache[i] = "x" * 100
+        cache["big"] = "x" * 9_800
+
+        assert cache.currsize <= 10_000
+        assert "big" in cache
+        assert evicted == [0, 1, 2]
+
+    def test_oversized_value_not_cached(self):
+        """Test a value larger than the whole budget is skipped instead of raising."""
+        cache = ByteLRUCache(max_bytes=100, sizeof=len)
+        cache["small"] = "x" * 10
+        cache["huge"] = "x" * 1_000
+
+        assert "huge" not in cache
+        assert cache["small"] == "x" * 10
+
+    def test_global_budget_evicts_from_largest_cache(self):
+        """Test the shared budget takes space from the cache holding the most bytes."""
+        budget = MemoryBudget(max_bytes=1_000)
+        large, small = ByteLRUCache(max_bytes=1_000, sizeof=len), ByteLRUCache(max_bytes=1_000, sizeof=len)
+        budget.register(large)
+        budget.register(small)
+
+        for i in range(8):
+            large[i] = "x" * 100
+        small["a"] = "x" * 100
+        small["b"] = "x" * 100
+        small["c"] = "x" * 100
+
+        assert budget.used_bytes <= 1_000
+        assert len(small) == 3
+        assert len(large) == 7
+
+
+class TestCacheManagerMemory:
+    """Test byte budgets through CacheManager and the dashboard."""
+
+    def test_max_bytes_config(self):
+        """Test max_bytes creates a byte-bounded cache whose evictions are recorded."""
+        manager = CacheManager()
+        cache = manager.create_lru_cache("results", CacheConfig(max_bytes=2_000, sizeof="pickle"))
+        for i in range(20):
+            cache[i] = "x" * 200
+
+        metrics = manager.get_metrics("results")
+        assert metrics["memory_usage"] <= 2_000
+        assert metrics["max_bytes"] == 2_000
+        assert metrics["evictions"] == 20 - len(cache)
+
+    def test_set_memory_budget(self):
+        """Test shrinking the global budget evicts across caches immediately."""
+        manager = CacheManager()
+        first = manager.create_ttl_cache("first", CacheConfig(max_bytes=10_000, ttl=60))
+        second = manager.create_lru_cache("second", CacheConfig(max_bytes=10_000))
+        for i in range(10):
+            first[i] = "x" * 400
+            second[i] = "x" * 400
+
+        manager.set_memory_budget(4_000)
+
+        usage = manager.get_memory_usage()
+        assert usage["memory_budget"] == 4_000
+        assert 0 < usage["memory_usage"] <= 4_000
+        assert manager.get_metrics()["global"]["evictions"] > 0
+
+    def test_dashboard_reports_bytes_and_alerts(self):
+        """Test collected metrics carry real bytes and the memory alert uses the byte budget."""
+        manager = CacheManager()
+        cache = manager.create_lru_cache("results", CacheConfig(max_bytes=1_000, sizeof="pickle"))
+        cache["a"] = "x" * 950
+        manager.create_ttl_cache("plain", CacheConfig(max_size=100)).update({i: "x" * 100 for i in range(10)})
+
+        collector = CachePerformanceCollector(manager)
+        metrics = collector.collect_metrics("results")
+        assert metrics.memory_usage == cache.currsize
+        assert metrics.memory_budget == 1_000
+        assert collector.collect_metrics("plain").memory_usage >= 10 * 100
+
+        metrics.timestamp = time.time()
+        alerts = [alert for alert in CacheAlertManager().check_alerts(metrics) if alert.alert_type == "memory_usage"]
+        assert len(alerts) == 1
+        assert alerts[0].cache_name == "results"
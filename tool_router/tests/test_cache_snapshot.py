@@ -0,0 +1,189 @@
+"""Test cache snapshots and warm start."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import patch
+
+from cachetools import LRUCache
+
+from tool_router.cache import snapshot
+from tool_router.cache.cache_manager import CacheManager, cached
+from tool_router.cache.snapshot import _HEADER, cache_entries, read_snapshot
+from tool_router.cache.types import CacheConfig
+
+
+def _manager() -> CacheManager:
+    manager = CacheManager()
+    manager.create_ttl_cache("prompts", CacheConfig(max_size=10, ttl=60))
+    manager.create_lru_cache("feedback", CacheConfig(max_size=3))
+    manager.create_tinylfu_cache("routes", CacheConfig(max_size=10, ttl=60))
+    manager.create_ttl_cache("sized", CacheConfig(max_bytes=100_000, ttl=60))
+    return manager
+
+
+class TestSnapshotRoundTrip:
+    """Test saving and restoring in-process caches."""
+
+    def test_restore_into_new_process(self, tmp_path):
+        """Test every in-process cache kind is restored with its TTL left."""
+        path = tmp_path / "caches.snap"
+        before = _manager()
+        before.get_cache("prompts")["system"] = "You route tools."
+        before.get_cache("feedback")["tool1"] = {"score": 0.9}
+        before.get_cache("routes")["search docs"] = ["search"]
+        before.get_cache("sized")["blob"] = b"x" * 1000
+
+        assert before.save_snapshot(path) == 4
+
+        after = _manager()
+        assert after.load_snapshot(path) == 4
+        assert after.get_cache("prompts")["system"] == "You route tools."
+        assert after.get_cache("feedback")["tool1"] == {"score": 0.9}
+        assert after.get_cache("routes")["search docs"] == ["search"]
+        assert after.get_cache("sized")["blob"] == b"x" * 1000
+        assert after.get_memory_usage()["memory_usage"] > 1000
+
+    def test_ttl_counts_downtime(self, tmp_path):
+        """Test entries keep their remaining TTL and expire during downtime."""
+        path = tmp_path / "caches.snap"
+        before = _manager()
+        before.get_cache("prompts")["system"] = "v1"
+        before.save_snapshot(path)
+
+        with patch("tool_router.cache.snapshot.time.time", return_value=time.time() + 50):
+            after = _manager()
+            assert after.load_snapshot(path) == 1
+        prompts = after.get_cache("prompts")
+        assert prompts.expire(prompts.timer() + 5) == []
+        assert prompts.expire(prompts.timer() + 15) == [("system", "v1")]
+
+        with patch("tool_router.cache.snapshot.time.time", return_value=time.time() + 61):
+            assert _manager().load_snapshot(path) == 0
+
+    def test_lru_recency_preserved(self, tmp_path):
+        """Test restored LRU entries keep their recency order."""
+        path = tmp_path / "caches.snap"
+        before = _manager()
+        feedback = before.get_cache("feedback")
+        for key in ("a", "b", "c"):
+            feedback[key] = key
+        feedback["a"]
+        before.save_snapshot(path, caches=["feedback"])
+
+        manager = _manager()
+        manager.load_snapshot(path)
+        restored = manager.get_cache("feedback")
+        restored["d"] = "d"
+        assert "b" not in restored
+        assert set(restored) == {"a", "c", "d"}
+
+    def test_falls_back_without_cachetools_internals(self, caplog):
+        """Test caches are read through their public interface when cachetools internals are missing."""
+        cache = LRUCache(maxsize=3)
+        for key in ("a", "b"):
+            cache[key] = key.upper()
+        del cache.__dict__["_LRUCache__order"]
+
+        with patch.object(snapshot, "_fallback_logged", set()):
+            assert cache_entries(cache) == [("a", "A", None), ("b", "B", None)]
+            cache_entries(cache)
+        assert caplog.text.count("internals not found") == 1
+
+    def test_skipped_entries(self, tmp_path):
+        """Test unpicklable values, negative results and live keys are not restored."""
+        path = tmp_path / "caches.snap"
+        manager = CacheManager()
+
+        @cached(ttl=60, negative_ttl=30, manager=manager)
+        def lookup(name):
+            return None if name == "missing" else name
+
+        lookup("found")
+        lookup("missing")
+        manager.get_cache("function_lookup")["lock"] = threading.Lock()
+
+        assert manager.save_snapshot(path) == 1
+        assert [entry[1] for entry in read_snapshot(path)] == [lookup.cache_key("found")]
+
+        manager.get_cache("function_lookup")[lookup.cache_key("found")] = "fresh"
+        assert manager.load_snapshot(path) == 0
+        assert lookup("found") == "fresh"
+
+
+class TestSnapshotFiles:
+    """Test snapshot file handling."""
+
+    def test_missing_and_foreign_files(self, tmp_path):
+        """Test missing, short and other-version files restore nothing."""
+        manager = _manager()
+        assert manager.load_snapshot(tmp_path / "none.snap") == 0
+
+        short = tmp_path / "short.snap"
+        short.write_bytes(b"MCP")
+        assert manager.load_snapshot(short) == 0
+
+        future = tmp_path / "future.snap"
+        future.write_bytes(_HEADER.pack(b"MCPCSNAP", 99, 0, time.time()))
+        assert manager.load_snapshot(future) == 0
+
+    def test_truncated_file(self, tmp_path):
+        """Test a truncated file restores the complete records before the cut."""
+        path = tmp_path / "caches.snap"
+        manager = _manager()
+        prompts = manager.get_cache("prompts")
+        for i in range(5):
+            prompts[f"p{i}"] = "x" * 100
+        manager.save_snapshot(path, caches=["prompts"])
+        path.write_bytes(path.read_bytes()[:-50])
+
+        assert _manager().load_snapshot(path) == 4
+
+
+class TestPeriodicSnapshots:
+    """Test warm start with periodic saving."""
+
+    def test_enable_and_disable(self, tmp_path, monkeypatch):
+        """Test snapshots are written periodically and on shutdown, then restored."""
+        path = tmp_path / "caches.snap"
+        monkeypatch.setenv("CACHE_SNAPSHOT_PATH", str(path))
+        first = _manager()
+        assert first.enable_snapshots(interval=0.05, caches=["prompts"]) == 0
+
+        first.get_cache("prompts")["system"] = "v1"
+        deadline = time.monotonic() + 3
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.exists()
+
+        first.get_cache("prompts")["greeting"] = "hello"
+        first.disable_snapshots()
+        assert first._snapshot_thread is None
+
+        second = _manager()
+        assert second.enable_snapshots(interval=60) == 2
+        assert second.get_cache("prompts")["greeting"] == "hello"
+        second.disable_snapshots(save=False)
+
+    def test_cache_created_after_enable_is_warmed(self, tmp_path):
+        """Test caches registered after warm start get their snapshot entries."""
+        path = tmp_path / "caches.snap"
+        before = _manager()
+        before.get_cache("prompts")["system"] = "v1"
+        before.get_cache("routes")["search docs"] = ["search"]
+        before.save_snapshot(path)
+
+        manager = CacheManager()
+        assert manager.enable_snapshots(path, interval=60) == 0
+        try:
+            # Saving before the caches exist must not drop their entries
+            assert manager.save_snapshot(path) == 2
+
+            manager.create_ttl_cache("prompts", CacheConfig(max_size=10, ttl=60))
+            manager.create_tinylfu_cache("routes", CacheConfig(max_size=10, ttl=60))
+            assert manager.get_cache("prompts")["system"] == "v1"
+            assert manager.get_cache("routes")["search docs"] == ["search"]
+            assert manager._pending_restore == {}
+        finally:
+            manager.disable_snapshots(save=False)
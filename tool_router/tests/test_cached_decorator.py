@@ -0,0 +1,221 @@
+"""Test the cached memoization decorator and stable keys."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from unittest.mock import patch
+
+import pytest
+
+from tool_router.cache.cache_manager import CacheManager, cached
+from tool_router.cache.keys import canonical_encode, stable_hash
+from tool_router.cache.redis_cache import RedisCache
+
+
+@dataclass
+class _Query:
+    text: str
+    limit: int = 10
+
+
+class TestStableKeys:
+    """Test canonical encoding and hashing."""
+
+    def test_equal_structures_hash_equally(self):
+        """Test dict/set ordering does not change the key while types do."""
+        assert stable_hash({"a": 1, "b": {2, 3}}) == stable_hash({"b": {3, 2}, "a": 1})
+        assert stable_hash([1, 2]) != stable_hash((1, 2))
+        assert stable_hash("1") != stable_hash(1)
+        assert stable_hash(["ab", "c"]) != stable_hash(["a", "bc"])
+        assert stable_hash(_Query("x")) == stable_hash(_Query("x"))
+
+    def test_stable_across_processes(self):
+        """Test the key does not depend on the per-process hash seed."""
+        code = "from tool_router.cache.keys import stable_hash; print(stable_hash({'q': 'route me', 'n': (1, 2.5)}))"
+        env = {**os.environ, "PYTHONHASHSEED": "123"}
+        other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+        assert other.stdout.strip() == stable_hash({"q": "route me", "n": (1, 2.5)})
+
+    def test_unstable_objects_rejected(self):
+        """Test objects without a stable encoding raise TypeError."""
+        with pytest.raises(TypeError):
+            canonical_encode(object())
+
+
+class TestCachedDecorator:
+    """Test memoization of sync and async functions."""
+
+    def test_sync_memoization_binds_arguments(self):
+        """Test positional, keyword and default arguments map to one entry."""
+        manager = CacheManager()
+        calls = []
+
+        @cached(ttl=60, manager=manager)
+        def route(query: str, limit: int = 5) -> list[str]:
+            calls.append(query)
+            return [query] * limit
+
+        assert route("search", 2) == ["search", "search"]
+        assert route(query="search", limit=2) == ["search", "search"]
+        assert route("other") == ["other"] * 5
+        assert route("other", limit=5) == ["other"] * 5
+
+        assert calls == ["search", "other"]
+        metrics = manager.get_metrics("function_route")
+        assert metrics["hits"] == 2
+        assert metrics["misses"] == 2
+
+    def test_unkeyable_arguments_run_uncached(self):
+        """Test calls with arguments lacking a stable encoding still work."""
+        calls = []
+
+        @cached(ttl=60, manager=CacheManager())
+        def describe(value):
+            calls.append(value)
+            return type(value).__name__
+
+        marker = object()
+        assert describe(marker) == "object"
+        assert describe(marker) == "object"
+        assert len(calls) == 2
+
+    def test_custom_key_and_ignore(self):
+        """Test key functions and ignored parameters control cache sharing."""
+        manager = CacheManager()
+
+        @cached(ttl=60, manager=manager, ignore=("client",))
+        def fetch(client, doc_id):
+            return client.get(doc_id)
+
+        @cached(ttl=60, manager=manager, key=lambda query: query.text.lower())
+        def search(query):
+            return query.text
+
+        assert fetch({"a": 1}, "a") == 1
+        assert fetch({"a": 2}, "a") == 1
+        assert search(_Query("Tools")) == "Tools"
+        assert search(_Query("TOOLS", limit=3)) == "Tools"
+        assert fetch.cache_key({}, "a") == fetch.cache_key(None, doc_id="a")
+
+    def test_negative_results_use_separate_ttl(self):
+        """Test None results and listed exceptions expire after negative_ttl."""
+        calls = []
+
+        @cached(ttl=60, backend="lru", negative_ttl=1, negative_exceptions=(LookupError,), manager=CacheManager())
+        def lookup(name):
+            calls.append(name)
+            if name == "missing":
+                raise LookupError(name)
+            return None if name == "none" else name
+
+        for _ in range(2):
+            assert lookup("none") is None
+            with pytest.raises(LookupError):
+                lookup("missing")
+        assert calls == ["none", "missing"]
+
+        with patch("tool_router.cache.cache_manager.time.monotonic", return_value=time.monotonic() + 2):
+            assert lookup("none") is None
+            with pytest.raises(LookupError):
+                lookup("missing")
+            assert lookup("found") == "found"
+        assert calls == ["none", "missing", "none", "missing", "found"]
+
+    def test_cached_exception_traceback_stays_bounded(self):
+        """Test re-raising a memoized exception does not accumulate traceback frames."""
+
+        @cached(ttl=60, negative_exceptions=(LookupError,), manager=CacheManager())
+        def lookup(name):
+            raise LookupError(name)
+
+        depths = []
+        for _ in range(1000):
+            with pytest.raises(LookupError, match="missing") as excinfo:
+                lookup("missing")
+            depths.append(len(traceback.extract_tb(excinfo.value.__traceback__)))
+        assert max(depths[1:]) <= depths[1]
+        assert max(depths) < 10
+
+    def test_zero_negative_ttl_skips_caching(self):
+        """Test negative_ttl=0 never stores negative results."""
+        calls = []
+
+        @cached(ttl=60, negative_ttl=0, manager=CacheManager())
+        def lookup(name):
+            calls.append(name)
+
+        lookup("x")
+        lookup("x")
+        assert calls == ["x", "x"]
+
+    def test_concurrent_calls_share_execution(self):
+        """Test threads calling with the same key wait for one execution."""
+        calls = []
+
+        @cached(ttl=60, backend="tinylfu", manager=CacheManager())
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.1)
+            return value * 2
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [21]
+        assert results == [42] * 8
+
+    @pytest.mark.asyncio
+    async def test_async_in_flight_sharing(self):
+        """Test concurrent awaits share one coroutine run and later calls hit the cache."""
+        manager = CacheManager()
+        calls = []
+
+        @cached(ttl=60, manager=manager)
+        async def retrieve(query):
+            calls.append(query)
+            await asyncio.sleep(0.05)
+            return f"docs for {query}"
+
+        results = await asyncio.gather(*(retrieve("mcp") for _ in range(5)))
+        assert results == ["docs for mcp"] * 5
+        assert await retrieve("mcp") == "docs for mcp"
+        assert calls == ["mcp"]
+        assert manager.get_metrics("function_retrieve")["misses"] == 1
+
+    def test_redis_backend_shared_between_replicas(self):
+        """Test two decorated copies on one Redis server share entries."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        calls = []
+
+        def make_replica():
+            with patch("tool_router.cache.redis_cache.redis.Redis", return_value=fakeredis.FakeRedis(server=server)):
+
+                @cached(ttl=60, backend="redis", manager=CacheManager())
+                def plan(task):
+                    calls.append(task)
+                    return {"task": task, "tools": ["search"]}
+
+            return plan
+
+        first, second = make_replica(), make_replica()
+        assert isinstance(first.cache, RedisCache)
+        assert first("index docs") == {"task": "index docs", "tools": ["search"]}
+        assert second("index docs") == {"task": "index docs", "tools": ["search"]}
+        assert calls == ["index docs"]
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            cached(backend="disk")
@@ -0,0 +1,98 @@
+"""Test table-scoped invalidation in the database query cache."""
+
+from __future__ import annotations
+
+import threading
+
+from tool_router.database.query_cache import DatabaseQueryCache, QueryCacheConfig, extract_tables
+
+
+def _query_cache(name: str) -> DatabaseQueryCache:
+    return DatabaseQueryCache(QueryCacheConfig(cache_key_prefix=name))
+
+
+class TestExtractTables:
+    """Test table detection in SQL."""
+
+    def test_joins_subqueries_and_lists(self):
+        """Test joined, nested, comma-listed and schema-qualified tables are found."""
+        query = (
+            'SELECT * FROM users u JOIN orders o ON o.uid = u.id WHERE u.id NOT IN (SELECT uid FROM "Public"."Bans")'
+        )
+        assert extract_tables(query) == {"users", "orders", "bans"}
+        assert extract_tables("select a from t1, t2 b, app.t3 where t1.x = b.y") == {"t1", "t2", "t3"}
+        assert extract_tables("UPDATE tools SET name = ?") == {"tools"}
+        assert extract_tables("SELECT 1") == frozenset()
+
+
+class TestTableInvalidation:
+    """Test invalidation touches only dependent entries."""
+
+    def test_unrelated_tables_survive(self):
+        """Test writing one table keeps cached queries on other tables."""
+        cache = _query_cache("qc_unrelated")
+        cache.set("SELECT * FROM users", [("alice",)])
+        cache.set("SELECT * FROM tools", [("search",)])
+        cache.set("SELECT * FROM users JOIN tools ON 1=1", [("alice", "search")])
+
+        assert cache.invalidate_table("Users") == 2
+
+        assert cache.get("SELECT * FROM users") is None
+        assert cache.get("SELECT * FROM users JOIN tools ON 1=1") is None
+        assert cache.get("SELECT * FROM tools") == [("search",)]
+
+    def test_declared_tables(self):
+        """Test cached_query-style declared tables add dependencies the SQL does not show."""
+        cache = _query_cache("qc_declared")
+        assert cache.get_or_compute("SELECT * FROM tool_stats", lambda: [1], table=("tools", "usage")) == [1]
+
+        cache.invalidate_table("usage")
+        assert cache.get_or_compute("SELECT * FROM tool_stats", lambda: [2], table=("tools", "usage")) == [2]
+        assert cache.get("SELECT * FROM tool_stats", table={"usage", "tools"}) == [2]
+
+    def test_unknown_tables_invalidated_by_any_write(self):
+        """Test queries without detectable tables are dropped on every table invalidation."""
+        cache = _query_cache("qc_unknown")
+        cache.set("CALL refresh_report()", [1])
+        cache.invalidate_table("anything")
+        assert cache.get("CALL refresh_report()") is None
+
+    def test_lazy_invalidation(self):
+        """Test lazy invalidation only bumps the generation; stale entries drop on read."""
+        cache = _query_cache("qc_lazy")
+        cache.set("SELECT * FROM users", [1])
+
+        assert cache.invalidate_table("users", lazy=True) == 0
+        assert len(cache._cache) == 1
+        assert cache.get("SELECT * FROM users") is None
+        assert len(cache._cache) == 0
+
+    def test_result_computed_during_write_is_stale(self):
+        """Test a result whose table was written while it was computed is not served later."""
+        cache = _query_cache("qc_race")
+        started, release = threading.Event(), threading.Event()
+
+        def slow_query():
+            started.set()
+            release.wait(2)
+            return ["old"]
+
+        reader = threading.Thread(target=cache.get_or_compute, args=("SELECT * FROM users", slow_query))
+        reader.start()
+        assert started.wait(2)
+        cache.invalidate_table("users")
+        release.set()
+        reader.join()
+
+        assert cache.get_or_compute("SELECT * FROM users", lambda: ["new"]) == ["new"]
+
+    def test_invalidate_all(self):
+        """Test invalidate_all drops every entry and the index."""
+        cache = _query_cache("qc_all")
+        cache.set("SELECT * FROM users", [1])
+        cache.set("SELECT * FROM tools", [2])
+
+        cache.invalidate_all()
+
+        assert cache.get("SELECT * FROM users") is None
+        assert cache.get_metrics()["tracked_tables"] == 0
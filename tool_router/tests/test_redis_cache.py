@@ -1,7 +1,10 @@
 """Test Redis cache integration."""
 
+import time
 from unittest.mock import Mock, patch
 
+import pytest
+
 from tool_router.cache.config import CacheBackendConfig, get_cache_backend_config
 from tool_router.cache.redis_cache import RedisCache, RedisConfig
 
@@ -91,6 +94,55 @@ class TestRedisCache:
         assert deserialized == test_data
 
 
+class TestRedisCacheClear:
+    """Test SCAN/UNLINK based clearing and prefix invalidation."""
+
+    @pytest.fixture
+    def cache(self):
+        """RedisCache backed by an in-memory fake Redis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        with patch("tool_router.cache.redis_cache.redis.Redis", return_value=client):
+            cache = RedisCache(RedisConfig())
+        client.set("other:keep", b"1")
+        for i in range(25):
+            cache.set(f"user:{i}", i)
+            cache.set(f"session:{i}", i)
+        return cache
+
+    def test_clear_never_uses_keys(self, cache):
+        """Test clear removes only prefixed keys, batch by batch, without KEYS."""
+        updates = []
+        with patch.object(cache._redis_client, "keys", side_effect=AssertionError("KEYS used")):
+            assert cache.clear(batch_size=10, progress=lambda state: updates.append(state.deleted)) is True
+
+        assert cache._redis_client.keys("*") == [b"other:keep"]
+        progress = cache.get_clear_progress()
+        assert progress["deleted"] == 50
+        assert progress["running"] is False
+        assert progress["batches"] > 1
+        assert updates == sorted(updates)
+        assert updates[-1] == 50
+
+    def test_invalidate_prefix(self, cache):
+        """Test prefix invalidation leaves other keys in place."""
+        assert cache.invalidate_prefix("user:") is True
+
+        assert cache.get("user:3") is None
+        assert cache.get("session:3") == 3
+        assert cache.get_clear_progress()["deleted"] == 25
+
+    def test_background_clear(self, cache):
+        """Test a background clear reports progress until it finishes."""
+        assert cache.clear(background=True, batch_size=5) is True
+
+        deadline = time.monotonic() + 3
+        while cache.get_clear_progress()["running"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get_clear_progress()["deleted"] == 50
+        assert cache.get("user:1") is None
+
+
 class TestCacheBackendConfig:
     """Test cache backend configuration."""
 
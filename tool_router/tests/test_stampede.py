@@ -0,0 +1,134 @@
+"""Test cache stampede protection."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from cachetools import LRUCache, TTLCache
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.redis_cache import RedisCache, RedisConfig
+from tool_router.cache.stampede import RedisLock, get_or_compute, should_refresh, unwrap
+from tool_router.cache.types import CacheConfig
+from tool_router.database.query_cache import DatabaseQueryCache, QueryCacheConfig
+
+
+class TestGetOrCompute:
+    """Test XFetch refresh and per-key locking."""
+
+    def test_concurrent_misses_compute_once(self):
+        """Test only one of many concurrent callers runs compute for a missing key."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute(cache, "key", compute))) for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+        assert unwrap(cache["key"]) == "value"
+
+    def test_should_refresh(self):
+        """Test the XFetch decision at and far from the expiry."""
+        now = time.time()
+        assert should_refresh({"delta": 0.0, "expiry": now - 1}, now=now) is True
+        assert should_refresh({"delta": 0.0, "expiry": now + 100}, now=now) is False
+        assert should_refresh({"delta": 1.0, "expiry": None}, now=now) is False
+
+    def test_stale_value_served_during_refresh(self):
+        """Test callers keep the current value while one worker refreshes it."""
+        cache = LRUCache(maxsize=10)
+        get_or_compute(cache, "key", lambda: "old", ttl=60)
+        cache["key"]["expiry"] = time.time() - 1  # Due for refresh
+        started, release = threading.Event(), threading.Event()
+
+        def slow_compute():
+            started.set()
+            release.wait(2)
+            return "new"
+
+        refresher = threading.Thread(target=get_or_compute, args=(cache, "key", slow_compute))
+        refresher.start()
+        assert started.wait(2)
+
+        assert get_or_compute(cache, "key", lambda: pytest.fail("recomputed concurrently")) == "old"
+        release.set()
+        refresher.join()
+        assert unwrap(cache["key"]) == "new"
+
+    def test_cache_if_skips_storing(self):
+        """Test values rejected by cache_if are returned but not stored."""
+        cache = LRUCache(maxsize=10)
+        assert get_or_compute(cache, "key", list, cache_if=bool) == []
+        assert "key" not in cache
+
+
+class TestRedisLock:
+    """Test the SET NX based Redis lock."""
+
+    def test_exclusive_until_released(self):
+        """Test a second lock on the same name fails until the first is released."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        first, second = RedisLock(client, "lock:key"), RedisLock(client, "lock:key")
+
+        assert first.acquire() is True
+        assert second.acquire() is False
+        second.release()  # Not the owner: must not free the lock
+        assert client.exists("lock:key") == 1
+
+        first.release()
+        assert second.acquire() is True
+
+    def test_redis_cache_distributed_lock(self):
+        """Test RedisCache.get_or_compute stores the value and frees its lock."""
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        with patch("tool_router.cache.redis_cache.redis.Redis", return_value=client):
+            cache = RedisCache(RedisConfig())
+
+        assert cache.get_or_compute("catalog", lambda: {"tools": 3}, ttl=60, distributed_lock=True) == {"tools": 3}
+        assert cache.get_or_compute("catalog", lambda: pytest.fail("recomputed"), ttl=60) == {"tools": 3}
+        assert client.exists("mcp_cache:lock:catalog") == 0
+        assert 0 < client.ttl("mcp_cache:catalog") <= 60
+
+
+class TestStampedeIntegration:
+    """Test get_or_compute through CacheManager and DatabaseQueryCache."""
+
+    def test_cache_manager_records_hits_and_misses(self):
+        """Test computed calls count as misses and cached ones as hits."""
+        manager = CacheManager()
+        manager.create_ttl_cache("catalog", CacheConfig(max_size=10, ttl=60))
+
+        assert manager.get_or_compute("catalog", "tools", lambda: ["a", "b"]) == ["a", "b"]
+        assert manager.get_or_compute("catalog", "tools", lambda: ["c"]) == ["a", "b"]
+
+        metrics = manager.get_metrics("catalog")
+        assert metrics["misses"] == 1
+        assert metrics["hits"] == 1
+        with pytest.raises(KeyError):
+            manager.get_or_compute("missing", "key", lambda: None)
+
+    def test_query_cache(self):
+        """Test query results are cached and readable through get()."""
+        query_cache = DatabaseQueryCache(QueryCacheConfig(cache_key_prefix="stampede_test"))
+
+        assert query_cache.get_or_compute("SELECT 1", lambda: [(1,)]) == [(1,)]
+        assert query_cache.get("SELECT 1") == [(1,)]
+        assert query_cache.get_or_compute("SELECT 2", list) == []
+        assert query_cache.get("SELECT 2") is None
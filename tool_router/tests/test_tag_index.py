@@ -0,0 +1,124 @@
+"""Test the Redis-backed tag invalidation index."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.invalidation import AdvancedInvalidationManager
+from tool_router.cache.redis_cache import RedisConfig
+from tool_router.cache.tag_index import RedisTagIndex
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server():
+    """Patch redis.Redis so every client shares one in-memory server."""
+    server = fakeredis.FakeServer()
+    with patch(
+        "tool_router.cache.redis_cache.redis.Redis",
+        side_effect=lambda **kwargs: fakeredis.FakeRedis(server=server),
+    ):
+        yield server
+
+
+def _replica(tiered: bool = False) -> tuple[CacheManager, AdvancedInvalidationManager]:
+    manager = CacheManager()
+    if tiered:
+        cache = manager.create_tiered_cache("catalog", RedisConfig())
+    else:
+        cache = manager.create_redis_cache("catalog", RedisConfig())
+    return manager, AdvancedInvalidationManager(manager, tag_index=RedisTagIndex(cache))
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestRedisTagIndex:
+    """Test tags shared between replicas."""
+
+    def test_tag_invalidated_from_other_replica(self, redis_server):
+        """Test a tag registered on one node is invalidated from another."""
+        client = fakeredis.FakeRedis(server=redis_server)
+        _, first = _replica()
+        _, second = _replica()
+        first.create_tagged_cache("catalog", "tool1", {"name": "search"}, {"catalog"}, ttl=60)
+        first.create_tagged_cache("catalog", "tool2", {"name": "fetch"}, {"catalog", "user:7"}, ttl=60)
+
+        assert second.tag_manager.get_tag_info("catalog").cache_keys == {"catalog:tool1", "catalog:tool2"}
+        assert second.tag_manager.get_tags_for_key("catalog:tool2") == {"catalog", "user:7"}
+
+        assert second.invalidate_by_tags(["catalog"]) == 2
+        assert client.exists("mcp_cache:catalog:tool1", "mcp_cache:catalog:tool2") == 0
+        # Detached from its other tags as well
+        assert first.tag_manager.get_tag_info("user:7").cache_keys == set()
+        assert first.tag_manager.get_tags_for_key("catalog:tool2") == set()
+
+    def test_unknown_tag_yields_nothing(self, redis_server):
+        """Test popping a tag nobody registered is a no-op rather than an error."""
+        manager, _ = _replica()
+        index = RedisTagIndex(manager.get_cache("catalog"))
+        assert list(index.pop_members("never-tagged")) == []
+
+    def test_large_tag_in_batches(self, redis_server):
+        """Test a large fan-out is unlinked batch by batch and leaves no index keys."""
+        client = fakeredis.FakeRedis(server=redis_server)
+        manager, invalidation = _replica()
+        cache = manager.get_cache("catalog")
+        keys = [f"catalog:item{i}" for i in range(2000)]
+        cache.set_many(dict.fromkeys(keys, 1), ttl=60)
+        index = invalidation.tag_manager.index
+        index.add("catalog", keys, ttl=60)
+
+        batches = list(index.pop_members("catalog"))
+        assert sum(len(batch) for batch in batches) == 2000
+        assert len(batches) <= 2000 // index.batch_size + 1
+
+        index.add("catalog", keys, ttl=60)
+        assert invalidation.invalidate_by_tags(["catalog"]) == 2000
+        assert client.keys("mcp_cache:*") == []
+
+    def test_index_entries_expire(self, redis_server):
+        """Test tag sets live as long as their longest-lived key."""
+        client = fakeredis.FakeRedis(server=redis_server)
+        _, invalidation = _replica()
+        index = invalidation.tag_manager.index
+
+        index.add("user:7", ["catalog:a"], ttl=30)
+        index.add("user:7", ["catalog:b"], ttl=60)
+        index.add("user:7", ["catalog:c"], ttl=10)
+        assert 30 < client.ttl(f"{index.prefix}tag:user:7") <= 60
+        assert 0 < client.ttl(f"{index.prefix}key:catalog:c") <= 10
+
+        index.add("user:7", ["catalog:d"])
+        assert client.ttl(f"{index.prefix}tag:user:7") == -1
+
+    def test_tiered_l1_invalidated_on_every_replica(self, redis_server):
+        """Test tag invalidation drops the keys from other replicas' L1 caches."""
+        writer_manager, writer = _replica(tiered=True)
+        reader_manager, _ = _replica(tiered=True)
+        writer_cache, reader_cache = writer_manager.get_cache("catalog"), reader_manager.get_cache("catalog")
+        try:
+            assert _wait_for(lambda: writer_cache._epoch >= 1 and reader_cache._epoch >= 1)
+            writer.create_tagged_cache("catalog", "tool1", "v1", {"catalog"}, ttl=60)
+            assert reader_cache.get("catalog:tool1") == "v1"
+            assert "catalog:tool1" in reader_cache.l1
+
+            writer.invalidate_by_tags(["catalog"])
+
+            assert _wait_for(lambda: "catalog:tool1" not in reader_cache.l1)
+            assert "catalog:tool1" not in writer_cache.l1
+        finally:
+            writer_cache.close()
+            reader_cache.close()
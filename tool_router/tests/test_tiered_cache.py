@@ -0,0 +1,126 @@
+"""Test the two-tier (L1 + Redis) near cache."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.redis_cache import RedisConfig
+from tool_router.cache.tiered_cache import TieredCache
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server():
+    """Patch redis.Redis so every client shares one in-memory server."""
+    server = fakeredis.FakeServer()
+    with patch(
+        "tool_router.cache.redis_cache.redis.Redis",
+        side_effect=lambda **kwargs: fakeredis.FakeRedis(server=server),
+    ):
+        yield server
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTieredCache:
+    """Test L1/L2 lookups and cross-replica invalidation."""
+
+    def test_l1_and_l2_hits(self, redis_server):
+        """Test reads are served from L2 once, then from L1."""
+        cache = TieredCache(RedisConfig(), start_listener=False)
+        cache.set("key", {"value": 1})
+        cache.l1.clear()
+
+        assert cache.get("key") == {"value": 1}
+        assert cache.get("key") == {"value": 1}
+        assert cache.get("missing", "default") == "default"
+
+        stats = cache.get_tier_stats()
+        assert stats["l2_hits"] == 1
+        assert stats["l1_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["l1_hit_ratio"] == pytest.approx(1 / 3)
+
+    def test_short_ttl_not_kept_in_l1(self, redis_server):
+        """Test values expiring before the L1 TTL are served from Redis only."""
+        cache = TieredCache(RedisConfig(), start_listener=False)
+        cache.set("short", "v", ttl=5)
+        cache.set_many({"batch": "v"}, ttl=5)
+        cache.set("long", "v", ttl=3600)
+        assert set(cache.l1) == {"long"}
+
+        # Redis expiring the key must not leave a copy behind in L1
+        fakeredis.FakeRedis(server=redis_server).delete("mcp_cache:short")
+        assert cache.get("short", "expired") == "expired"
+
+    def test_other_replica_is_invalidated(self, redis_server):
+        """Test a write on one replica evicts the key from another replica's L1."""
+        writer = TieredCache(RedisConfig())
+        reader = TieredCache(RedisConfig())
+        try:
+            # Each listener resets its L1 once subscribed
+            assert _wait_for(lambda: writer._epoch >= 1 and reader._epoch >= 1)
+
+            writer.set("key", "old")
+            assert reader.get("key") == "old"
+            assert "key" in reader.l1
+
+            writer.set("key", "new")
+            assert _wait_for(lambda: "key" not in reader.l1)
+            assert reader.get("key") == "new"
+
+            writer.set("user:1", "a")
+            assert reader.get("user:1") == "a"
+            writer.invalidate_prefix("user:")
+            assert _wait_for(lambda: "user:1" not in reader.l1)
+            assert reader.get("user:1") is None
+
+            reader.get("key")
+            writer.clear()
+            assert _wait_for(lambda: len(reader.l1) == 0)
+            assert writer.get_tier_stats()["invalidations_received"] == 0
+        finally:
+            writer.close()
+            reader.close()
+
+    def test_stale_fill_is_discarded(self, redis_server):
+        """Test an L2 read racing with an invalidation does not populate L1."""
+        cache = TieredCache(RedisConfig(), start_listener=False)
+        cache.set("key", "old")
+        cache.l1.clear()
+
+        original_get = cache._get_redis
+
+        def racing_get_redis():
+            cache._invalidate_local(["key"])
+            return original_get()
+
+        with patch.object(cache, "_get_redis", side_effect=racing_get_redis):
+            assert cache.get("key") == "old"
+        assert "key" not in cache.l1
+
+    def test_manager_reports_tier_ratios(self, redis_server):
+        """Test CacheManager.get_metrics includes L1/L2 hit ratios."""
+        manager = CacheManager()
+        cache = manager.create_tiered_cache("near", start_listener=False)
+        cache.set("key", "value")
+        cache.get("key")
+
+        metrics = manager.get_metrics("near")
+        assert metrics["l1_hits"] == 1
+        assert metrics["l1_hit_ratio"] == 1.0
+        assert metrics["l2_hit_ratio"] == 0.0
+        assert "l1_hit_ratio" in manager.get_metrics()["near"]
@@ -0,0 +1,135 @@
+"""Test the W-TinyLFU cache."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from cachetools import LRUCache
+
+from tool_router.cache.cache_manager import CacheManager
+from tool_router.cache.tinylfu import CountMinSketch, TinyLFUCache
+from tool_router.cache.types import CacheConfig
+
+
+def _hit_ratio(cache, keys) -> float:
+    hits = 0
+    for key in keys:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache[key] = key
+    return hits / len(keys)
+
+
+class TestTinyLFUCache:
+    """Test mapping behaviour, TTL and admission."""
+
+    def test_mapping_interface(self):
+        """Test the cache behaves like a bounded mapping."""
+        cache = TinyLFUCache(maxsize=3)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert cache["a"] == 1
+        assert "b" in cache
+        assert cache.get("missing") is None
+        assert len(cache) == 2
+        assert set(cache) == {"a", "b"}
+
+        del cache["a"]
+        assert "a" not in cache
+        with pytest.raises(KeyError):
+            cache["a"]
+
+        for i in range(10):
+            cache[i] = i
+        assert len(cache) <= 3
+        assert cache.currsize == len(cache)
+
+    def test_ttl_expiry(self):
+        """Test entries expire after ttl seconds."""
+        now = [0.0]
+        cache = TinyLFUCache(maxsize=10, ttl=5, timer=lambda: now[0])
+        cache["a"] = 1
+        cache["b"] = 2
+
+        now[0] = 4.0
+        assert cache["a"] == 1
+        now[0] = 6.0
+        assert "a" not in cache
+        assert cache.get("a") is None
+        assert cache.expire() == [("b", 2)]
+        assert len(cache) == 0
+
+    def test_expired_entries_do_not_block_admission(self):
+        """Test expired hot entries free their slots instead of beating new candidates."""
+        now = [0.0]
+        cache = TinyLFUCache(maxsize=100, ttl=5, timer=lambda: now[0])
+        for key in range(100):
+            cache[key] = key
+            for _ in range(5):
+                cache[key]
+
+        now[0] = 10.0
+        for key in range(1000, 1100):
+            cache[key] = key
+            cache[key]
+
+        assert len(cache) == len(list(cache)) == 100
+        assert all(key >= 1000 for key in cache)
+        assert cache.rejected == 0
+
+    def test_scan_does_not_flush_hot_entries(self):
+        """Test a burst of one-off keys is not admitted over frequently used ones."""
+        cache = TinyLFUCache(maxsize=100)
+        hot = list(range(50))
+        for _ in range(5):
+            for key in hot:
+                cache.get(key) or cache.__setitem__(key, key)
+
+        for key in range(1000, 3000):
+            cache[key] = key
+
+        assert sum(key in cache for key in hot) == len(hot)
+        assert cache.get_stats()["rejected"] > 0
+
+    def test_better_than_lru_on_skewed_workload(self):
+        """Test the hit ratio beats LRU at the same size on a Zipf-like workload."""
+        rng = random.Random(42)
+        population = range(10000)
+        weights = [1 / (rank + 1) for rank in population]
+        keys = rng.choices(population, weights=weights, k=20000)
+
+        tinylfu_ratio = _hit_ratio(TinyLFUCache(maxsize=200), keys)
+        lru_ratio = _hit_ratio(LRUCache(maxsize=200), keys)
+
+        assert tinylfu_ratio > lru_ratio
+
+    def test_sketch_ages_counts(self):
+        """Test the count-min sketch halves its counters after sample_size increments."""
+        sketch = CountMinSketch(width=64, sample_size=20)
+        for _ in range(10):
+            sketch.increment("hot")
+        assert sketch.estimate("hot") == 10
+
+        for i in range(10):
+            sketch.increment(i)
+        assert sketch.resets == 1
+        assert sketch.estimate("hot") <= 6
+
+
+class TestCacheManagerTinyLFU:
+    """Test TinyLFU caches created through CacheManager."""
+
+    def test_evictions_recorded(self):
+        """Test capacity evictions show up in the cache metrics."""
+        manager = CacheManager()
+        cache = manager.create_tinylfu_cache("catalog", CacheConfig(max_size=10, ttl=60))
+        for i in range(50):
+            cache[i] = i
+
+        metrics = manager.get_metrics("catalog")
+        assert metrics["evictions"] == 40
+        assert metrics["cache_size"] == 10
+        assert cache.ttl == 60
@@ -1190,8 +1190,8 @@ class TestComponentGeneratorAdditional:
         code = "div class container Content"
         tokens = generator._estimate_component_tokens(code)
 
-        assert tokens == len(code.split()) * 1.3
-        assert tokens == 5.2
+        # Heuristic fallback: ceil(words * 1.3)
+        assert tokens == 6
 
 
 class TestComponentGeneratorAdvanced:
@@ -0,0 +1,129 @@
+"""Tests for the distilled local tool classifier."""
+
+from pathlib import Path
+
+from tool_router.ai.classifier import ClassifierTrainer, HashedNgramFeaturizer, ToolClassifier, train_from_feedback
+from tool_router.ai.feedback import FeedbackStore
+
+
+SEARCH_TASKS = [f"search the web for topic {i}" for i in range(15)]
+FILE_TASKS = [f"read file /tmp/data_{i}.txt from disk" for i in range(15)]
+
+
+def _populate(store: FeedbackStore) -> None:
+    for task in SEARCH_TASKS:
+        store.record(task, "web_search", success=True)
+    for task in FILE_TASKS:
+        store.record(task, "read_file", success=True)
+
+
+class TestHashedNgramFeaturizer:
+    def test_features_are_normalized(self) -> None:
+        features = HashedNgramFeaturizer().transform("search the web")
+        assert abs(sum(v * v for v in features.values()) - 1.0) < 1e-9
+
+    def test_features_are_stable(self) -> None:
+        featurizer = HashedNgramFeaturizer()
+        assert featurizer.transform("read file") == featurizer.transform("READ file!")
+
+    def test_empty_text(self) -> None:
+        assert HashedNgramFeaturizer().transform("") == {}
+
+
+class TestToolClassifier:
+    def test_untrained_predicts_nothing(self) -> None:
+        assert ToolClassifier().predict("search the web") is None
+
+    def test_learns_separable_tasks(self) -> None:
+        classifier = ToolClassifier(min_confidence=0.6, min_samples=10)
+        classifier.partial_fit([(t, "web_search") for t in SEARCH_TASKS] + [(t, "read_file") for t in FILE_TASKS])
+        prediction = classifier.predict("search the web for python news")
+        assert prediction is not None
+        assert prediction[0] == "web_search"
+        prediction = classifier.predict("read file /etc/hosts from disk")
+        assert prediction is not None
+        assert prediction[0] == "read_file"
+
+    def test_low_confidence_defers_to_llm(self) -> None:
+        classifier = ToolClassifier(min_confidence=0.99, min_samples=10)
+        classifier.partial_fit([(t, "web_search") for t in SEARCH_TASKS] + [(t, "read_file") for t in FILE_TASKS])
+        assert classifier.predict("something unrelated entirely") is None
+
+    def test_requires_two_classes(self) -> None:
+        classifier = ToolClassifier(min_confidence=0.1, min_samples=1)
+        classifier.partial_fit([(t, "web_search") for t in SEARCH_TASKS])
+        assert not classifier.is_ready
+        assert classifier.predict("search the web") is None
+
+    def test_save_load_roundtrip(self, tmp_path: Path) -> None:
+        model_file = str(tmp_path / "model.json.gz")
+        classifier = ToolClassifier(min_samples=10)
+        classifier.partial_fit([(t, "web_search") for t in SEARCH_TASKS] + [(t, "read_file") for t in FILE_TASKS])
+        classifier.save(model_file)
+
+        loaded = ToolClassifier.load(model_file, min_samples=10)
+        assert sorted(loaded.classes) == ["read_file", "web_search"]
+        assert loaded.n_samples_seen == classifier.n_samples_seen
+        task = "search the web for news"
+        assert abs(loaded.predict_proba(task)["web_search"] - classifier.predict_proba(task)["web_search"]) < 1e-3
+
+    def test_load_missing_or_corrupt_file(self, tmp_path: Path) -> None:
+        assert ToolClassifier.load(str(tmp_path / "missing.gz")).classes == []
+        corrupt = tmp_path / "corrupt.gz"
+        corrupt.write_bytes(b"not gzip")
+        assert ToolClassifier.load(str(corrupt)).classes == []
+
+
+class _SampleStore:
+    """Minimal feedback store serving fixed training samples."""
+
+    def __init__(self, samples: list[tuple[str, str, float]]) -> None:
+        self.samples = samples
+
+    def training_samples(self, since: float = 0.0) -> list[tuple[str, str, float]]:
+        return [sample for sample in self.samples if sample[2] > since]
+
+
+class TestClassifierTrainer:
+    def test_trains_incrementally_from_feedback(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        _populate(store)
+        store.record("search the web for failures", "read_file", success=False)
+        classifier = ToolClassifier(min_confidence=0.6, min_samples=10)
+        trainer = ClassifierTrainer(classifier, store, model_file=str(tmp_path / "model.json.gz"))
+
+        assert trainer.train_incremental() == 30  # failures are excluded
+        assert (tmp_path / "model.json.gz").exists()
+        # Nothing new since the watermark
+        assert trainer.train_incremental() == 0
+
+    def test_entries_sharing_the_watermark_timestamp_are_trained(self, tmp_path: Path) -> None:
+        store = _SampleStore([("read file a.txt", "read_file", 1000.0)])
+        trainer = ClassifierTrainer(ToolClassifier(), store, model_file=str(tmp_path / "m.gz"), min_new_samples=1)
+        assert trainer.train_incremental() == 1
+
+        store.samples.append(("search the web", "web_search", 1000.0))
+        assert trainer.train_incremental() == 1
+        assert trainer.train_incremental() == 0
+
+        reloaded = ClassifierTrainer(ToolClassifier.load(str(tmp_path / "m.gz")), store, min_new_samples=1)
+        assert reloaded.train_incremental() == 0
+
+    def test_skips_until_enough_new_samples(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.record("search the web", "web_search", success=True)
+        trainer = ClassifierTrainer(ToolClassifier(), store, model_file=str(tmp_path / "m.gz"), min_new_samples=5)
+        assert trainer.train_incremental() == 0
+
+    def test_start_stop(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        trainer = ClassifierTrainer(ToolClassifier(), store, model_file=str(tmp_path / "m.gz"))
+        trainer.start(interval=60)
+        trainer.stop()
+        assert not trainer._running
+
+    def test_train_from_feedback(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        _populate(store)
+        classifier = train_from_feedback(store, model_file=str(tmp_path / "m.gz"), min_samples=10)
+        assert sorted(classifier.classes) == ["read_file", "web_search"]
@@ -237,6 +237,7 @@ class TestOllamaSelector:
                     "options": {
                         "temperature": 0.1,
                         "num_predict": 200,
+                        "num_ctx": 2048,
                     },
                 },
             )
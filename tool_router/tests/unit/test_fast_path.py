@@ -0,0 +1,113 @@
+"""Tests for learned direct routes."""
+
+import pytest
+
+from tool_router.ai.fast_path import DirectRouteTable
+
+
+class TestTemplate:
+    def test_strips_entities(self) -> None:
+        assert DirectRouteTable.template("Read file config.yaml") == "read file {}"
+        assert DirectRouteTable.template("read file /tmp/data.csv") == DirectRouteTable.template(
+            "read  file /var/log/app.log"
+        )
+
+    def test_strips_plain_word_and_number_arguments(self) -> None:
+        template = DirectRouteTable.template("search the web for python")
+        assert template == "search the web for {}"
+        assert DirectRouteTable.template("Search the web for rust async runtimes") == template
+        assert DirectRouteTable.template("search the web for 42") == template
+
+    def test_urls_and_quotes(self) -> None:
+        assert DirectRouteTable.template('fetch https://example.com/a titled "Hello there"') == 'fetch {} titled "{}"'
+
+    def test_different_intents_never_share_a_template(self) -> None:
+        tasks = [
+            "translate hello to french",
+            "send email to bob",
+            "convert png to jpg",
+            "list users",
+            "list repositories",
+            "summarize the quarterly report",
+            "summarize the annual report",
+            "how to delete files",
+            "how to create files",
+            "read file config.yaml",
+            "delete file config.yaml",
+            "search the web for python",
+        ]
+        templates = [DirectRouteTable.template(task) for task in tasks]
+        assert len(set(templates)) == len(tasks)
+        assert DirectRouteTable.template("list users") == "list users"
+        assert DirectRouteTable.template("send email to the team") == "send email to the {}"
+
+
+class TestDirectRouteTable:
+    def test_different_queries_build_one_streak(self) -> None:
+        table = DirectRouteTable(promote_after=3, min_confidence=0.9)
+        for query in ("python", "rust", "golang"):
+            table.observe(f"search the web for {query}", "web_search", success=True)
+        assert table.lookup("search the web for zig") == "web_search"
+        assert table.lookup("search the news for zig") is None
+
+    def test_promotes_after_consecutive_successes(self) -> None:
+        table = DirectRouteTable(promote_after=3, min_confidence=0.9)
+        for i in range(2):
+            table.observe(f"read file a{i}.csv", "reader", success=True)
+            assert table.lookup("read file b.csv") is None
+        table.observe("read file a2.csv", "reader", success=True)
+        assert table.lookup("read file other.csv") == "reader"
+        assert table.get_stats()["promotions"] == 1
+
+    def test_failure_demotes(self) -> None:
+        table = DirectRouteTable(promote_after=2, min_confidence=0.5)
+        table.observe("read file a.csv", "reader", success=True)
+        table.observe("read file b.csv", "reader", success=True)
+        table.observe("read file c.csv", "reader", success=False)
+        assert table.lookup("read file a.csv") is None
+        assert table.get_stats()["demotions"] == 1
+
+    def test_confidence_threshold_blocks_flaky_tools(self) -> None:
+        table = DirectRouteTable(promote_after=2, min_confidence=0.9)
+        table.observe("read file a.csv", "reader", success=True)
+        table.observe("read file a.csv", "reader", success=False)
+        table.observe("read file a.csv", "reader", success=True)
+        table.observe("read file a.csv", "reader", success=True)
+        assert table.lookup("read file a.csv") is None  # 3/4 successes is below 0.9
+
+    def test_switching_tools_restarts_streak(self) -> None:
+        table = DirectRouteTable(promote_after=2, min_confidence=0.5)
+        table.observe("read file a.csv", "reader", success=True)
+        table.observe("read file a.csv", "cat", success=True)
+        assert table.lookup("read file a.csv") is None
+        table.observe("read file a.csv", "cat", success=True)
+        assert table.lookup("read file a.csv") == "cat"
+
+    def test_disabled_promotion(self) -> None:
+        table = DirectRouteTable(promote_after=0)
+        for _ in range(10):
+            table.observe("read file a.csv", "reader", success=True)
+        assert table.lookup("read file a.csv") is None
+
+    def test_env_defaults(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ROUTER_FAST_PATH_PROMOTE_AFTER", "7")
+        monkeypatch.setenv("ROUTER_FAST_PATH_MIN_CONFIDENCE", "0.75")
+        table = DirectRouteTable()
+        assert (table.promote_after, table.min_confidence) == (7, 0.75)
+
+    def test_templates_are_bounded(self) -> None:
+        table = DirectRouteTable(promote_after=1, max_templates=2)
+        for task in ("list users", "read file a.csv", "search the web for news"):
+            table.observe(task, "lister", success=True)
+        assert table.get_stats()["templates"] == 2
+        assert table.lookup("list users") is None
+
+    def test_stats(self) -> None:
+        table = DirectRouteTable(promote_after=1)
+        table.observe("list users", "lister", success=True)
+        table.record_scoring_latency(20.0)
+        table.lookup("list users")
+        table.lookup("read file a.csv")
+        stats = table.get_stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+        assert 0 < stats["estimated_saved_ms"] <= 20.0
@@ -1,9 +1,12 @@
 """Tests for the FeedbackStore context learning mechanism."""
 
+import json
 from pathlib import Path
 from unittest.mock import patch
 
-from tool_router.ai.feedback import FeedbackStore
+import pytest
+
+from tool_router.ai.feedback import DecayedRate, FeedbackEntry, FeedbackHistory, FeedbackStore, extract_entities
 
 
 
@@ -896,3 +899,388 @@ class TestFeedbackStoreTaskPatternLearning:
         pattern = store._patterns["file_operations"]
         assert "file_tool" in pattern.preferred_tools
         assert pattern.success_rate > 0.5
+
+
+class TestFeedbackStoreIncrementalAggregates:
+    """Test that aggregates are maintained incrementally without rescanning history."""
+
+    def test_intent_boost_tracks_all_history_beyond_entry_cap(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"), max_entries=5)
+        for _ in range(10):
+            store.record("create a report", "writer", success=True)
+        for _ in range(10):
+            store.record("create a report", "writer", success=False)
+        assert len(store._entries) == 5
+        # 50% success over all 20 outcomes, not just the retained entries
+        assert store.get_intent_boost("writer", "create") == pytest.approx(1.0)
+
+    def test_recent_window_evicts_oldest(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        for _ in range(50):
+            store.record("task", "tool", success=False)
+        for _ in range(25):
+            store.record("task", "tool", success=True)
+        stats = store.get_stats("tool")
+        assert stats.recent_success_rate == pytest.approx(0.5)
+
+    def test_running_averages(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.record("read file", "reader", success=True, confidence=0.2)
+        store.record("read file", "reader", success=False, confidence=0.6)
+        assert store.get_stats("reader").avg_confidence == pytest.approx(0.4)
+        pattern = store._patterns["file_operations"]
+        assert pattern.avg_confidence == pytest.approx(0.4)
+        assert pattern.preferred_tools["reader"] == pytest.approx(0.5)
+
+    def test_aggregates_survive_reload(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fb.json")
+        store = FeedbackStore(path)
+        for _ in range(4):
+            store.record("delete the cache", "cleaner", success=True)
+        store.record("delete the cache", "cleaner", success=False)
+
+        reloaded = FeedbackStore(path)
+        assert reloaded.get_intent_boost("cleaner", "delete") == store.get_intent_boost("cleaner", "delete")
+        assert reloaded._patterns["file_operations"].preferred_tools == store._patterns["file_operations"].preferred_tools
+        assert reloaded.get_stats("cleaner").recent_success_rate == pytest.approx(0.8)
+
+    def test_legacy_file_without_aggregates_is_replayed(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path))
+        store.record("search docs", "finder", success=True)
+        store.record("search docs", "finder", success=False)
+        store.close()
+        data = json.loads(path.read_text())
+        del data["aggregates"]
+        path.write_text(json.dumps(data))
+
+        reloaded = FeedbackStore(str(path))
+        assert reloaded.get_intent_boost("finder", "search") == pytest.approx(1.0)
+        assert reloaded.get_stats("finder").success_count == 1
+
+
+class TestFeedbackStoreWriteAheadLog:
+    """Test append-only log persistence, compaction and crash recovery."""
+
+    def test_record_appends_to_log_without_snapshot(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path), fsync="never")
+        store.record("read file", "reader", success=True)
+        store.record("read file", "reader", success=False)
+        assert not path.exists()
+        lines = (tmp_path / "fb.json.log").read_text().splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == [1, 2]
+
+    def test_compact_folds_log_into_snapshot(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path))
+        store.record("read file", "reader", success=True)
+        store.compact()
+        assert json.loads(path.read_text())["seq"] == 1
+        assert not (tmp_path / "fb.json.log").exists()
+
+        store.record("read file", "reader", success=True)
+        reloaded = FeedbackStore(str(path))
+        assert reloaded.get_stats("reader").success_count == 2
+        assert len(reloaded._entries) == 2
+
+    def test_inline_compaction_at_threshold(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path), compact_threshold=3)
+        for _ in range(3):
+            store.record("task", "tool", success=True)
+        assert path.exists()
+        assert not (tmp_path / "fb.json.log").exists()
+
+    def test_no_inline_compaction_while_background_compactor_runs(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path), compact_threshold=3)
+        store.start_compaction(interval=60)
+        with patch.object(store, "compact") as compact:
+            for _ in range(3):
+                store.record("task", "tool", success=True)
+        compact.assert_not_called()
+        store.close()
+
+    def test_torn_final_record_is_discarded(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path))
+        store.record("task", "tool", success=True)
+        store.record("task", "tool", success=True)
+        store.close()
+        log_file = tmp_path / "fb.json.log"
+        store = FeedbackStore(str(path))
+        store.record("task", "tool", success=False)
+        store._close_log()
+        log_file.write_text(log_file.read_text() + '{"seq": 4, "task": "tor')
+
+        recovered = FeedbackStore(str(path))
+        stats = recovered.get_stats("tool")
+        assert stats.success_count == 2
+        assert stats.failure_count == 1
+        assert log_file.read_text().endswith("\n")
+
+    def test_interrupted_compaction_does_not_double_count(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path))
+        store.record("task", "tool", success=True)
+        store.record("task", "tool", success=True)
+        store._close_log()
+        # Simulate a crash after the snapshot was replaced but before the rotated log was removed
+        log_text = (tmp_path / "fb.json.log").read_text()
+        store.compact()
+        (tmp_path / "fb.json.log.compacting").write_text(log_text)
+
+        recovered = FeedbackStore(str(path))
+        assert recovered.get_stats("tool").success_count == 2
+        assert not (tmp_path / "fb.json.log.compacting").exists()
+
+    def test_unknown_fsync_policy_falls_back(self, tmp_path: Path) -> None:
+        assert FeedbackStore(str(tmp_path / "fb.json"), fsync="sometimes").fsync == "interval"
+
+    def test_background_compaction_start_stop(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.start_compaction(interval=60)
+        store.record("task", "tool", success=True)
+        store.close()
+        assert store._compaction_thread is None
+        assert (tmp_path / "fb.json").exists()
+
+
+class TestFeedbackStoreSimilarityIndex:
+    """Test the inverted token index behind similar_task_tools."""
+
+    def test_only_successful_entries_are_indexed(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.record("parse the json payload", "json_parser", success=True)
+        store.record("parse the xml payload", "xml_parser", success=False)
+        assert store.similar_task_tools("parse xml payload") == ["json_parser"]
+        indexed_ids = set().union(*store._token_index.values())
+        assert [store._entries.tool(i - store._first_entry_id) for i in indexed_ids] == ["json_parser"]
+
+    def test_evicted_entries_leave_the_index(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"), max_entries=2)
+        store.record("resize image", "image_tool", success=True)
+        store.record("compress video", "video_tool", success=True)
+        store.record("transcode video", "video_tool", success=True)
+        assert store.similar_task_tools("resize image") == []
+        assert "image" not in store._token_index
+        assert set().union(*store._token_index.values()) == {1, 2}
+
+    def test_ties_prefer_most_recent_tool(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.record("convert units", "old_tool", success=True)
+        store.record("convert units", "new_tool", success=True)
+        assert store.similar_task_tools("convert units") == ["new_tool", "old_tool"]
+        assert store.similar_task_tools("convert units", top_n=1) == ["new_tool"]
+
+    def test_index_rebuilt_on_load(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fb.json")
+        store = FeedbackStore(path)
+        store.record("summarize the report", "summarizer", success=True)
+        store.compact()
+        store.record("translate the report", "translator", success=True)
+        assert FeedbackStore(path).similar_task_tools("summarize report") == ["summarizer", "translator"]
+
+
+class TestFeedbackStoreRecordMany:
+    """Test batched recording."""
+
+    def test_batch_matches_individual_records(self, tmp_path: Path) -> None:
+        events = [
+            {"task": "read file a.txt", "selected_tool": "reader", "success": True, "confidence": 0.9},
+            {"task": "read file b.txt", "selected_tool": "reader", "success": False},
+        ]
+        batched = FeedbackStore(str(tmp_path / "batched.json"))
+        batched.record_many(events)
+        single = FeedbackStore(str(tmp_path / "single.json"))
+        for event in events:
+            single.record(**event)
+
+        assert batched.get_stats("reader") == single.get_stats("reader")
+        lines = (tmp_path / "batched.json.log").read_text().splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == [1, 2]
+
+
+class TestDecayedRate:
+    """Test the exponentially decayed estimator."""
+
+    def test_weights_halve_every_half_life(self) -> None:
+        rate = DecayedRate()
+        rate.add(success=True, confidence=1.0, timestamp=0.0, half_life=10.0)
+        rate.add(success=False, confidence=0.0, timestamp=10.0, half_life=10.0)
+        assert rate.weight == pytest.approx(1.5)
+        assert rate.success_rate == pytest.approx(1 / 3)
+        assert rate.avg_confidence == pytest.approx(1 / 3)
+
+    def test_late_arrivals_count_as_decayed(self) -> None:
+        rate = DecayedRate()
+        rate.add(success=False, confidence=0.0, timestamp=10.0, half_life=10.0)
+        rate.add(success=True, confidence=1.0, timestamp=0.0, half_life=10.0)
+        assert rate.success_rate == pytest.approx(1 / 3)
+        assert rate.updated_at == 10.0
+
+    def test_empty_is_neutral(self) -> None:
+        assert DecayedRate().success_rate == 0.5
+
+
+class TestFeedbackStoreDecayedBoosts:
+    """Test that boosts follow recent behaviour."""
+
+    @staticmethod
+    def _entry(success: bool, timestamp: float) -> FeedbackEntry:
+        return FeedbackEntry(
+            task="read file",
+            selected_tool="reader",
+            success=success,
+            timestamp=timestamp,
+            confidence=0.8,
+            task_type="file_operations",
+            intent_category="read",
+        )
+
+    def test_regression_outweighs_old_successes(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"), half_life=60.0)
+        store._commit([self._entry(True, float(t)) for t in range(20)])
+        store._commit([self._entry(False, 600.0 + t) for t in range(3)])
+
+        stats = store.get_stats("reader")
+        assert stats.success_rate > 0.8  # All-time counts still dominated by old successes
+        assert store.get_boost("reader") < 1.0
+        assert store.get_task_type_boost("reader", "file_operations") < 0.8
+        assert store.get_intent_boost("reader", "read") < 0.9
+
+    def test_decayed_state_survives_reload(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "fb.json")
+        store = FeedbackStore(path, half_life=60.0)
+        store._commit([self._entry(True, 0.0), self._entry(False, 60.0), self._entry(False, 61.0)])
+        store.compact()
+        reloaded = FeedbackStore(path, half_life=60.0)
+        assert reloaded._tool_decay == store._tool_decay
+        assert reloaded.get_boost("reader") == store.get_boost("reader")
+
+    def test_snapshot_without_decayed_state_is_seeded(self, tmp_path: Path) -> None:
+        path = tmp_path / "fb.json"
+        store = FeedbackStore(str(path))
+        for _ in range(3):
+            store.record("read file", "reader", success=True)
+        store.close()
+        data = json.loads(path.read_text())
+        del data["aggregates"]["decayed"]
+        path.write_text(json.dumps(data))
+
+        reloaded = FeedbackStore(str(path))
+        assert reloaded._tool_decay["reader"].success_rate == 1.0
+        assert reloaded.get_boost("reader") == pytest.approx(store.get_boost("reader"))
+
+
+class TestFeedbackStoreBoostTable:
+    """Test the materialized per-class boost tables."""
+
+    def test_matches_comprehensive_boost(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        for _ in range(3):
+            store.record("read file config", "reader", success=True, confidence=0.9)
+        store.record("search the web", "web_search", success=False, confidence=0.3)
+
+        task = "read file notes.txt"
+        table = store.get_boost_table(task)
+        assert set(table) == {"reader", "web_search"}
+        for tool in table:
+            assert table[tool] == pytest.approx(store.get_comprehensive_boost(tool, task))
+        assert table.get("unknown", 1.0) == store.get_comprehensive_boost("unknown", task)
+
+    def test_refreshed_incrementally_on_feedback(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        for _ in range(3):
+            store.record("read file config", "reader", success=True)
+        task = "read file notes.txt"
+        before = store.get_boost_table(task)["reader"]
+
+        for _ in range(5):
+            store.record("read file config", "reader", success=False)
+        store.record("write file out", "writer", success=True)
+
+        table = store.get_boost_table(task)
+        assert table["reader"] < before
+        assert table["reader"] == pytest.approx(store.get_comprehensive_boost("reader", task))
+        assert "writer" in table
+        assert store._stale_boost_tools == set()
+
+    def test_classifies_once_per_lookup(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        store.record("read file config", "reader", success=True)
+        with patch.object(FeedbackStore, "_classify_task_type", wraps=FeedbackStore._classify_task_type) as classify:
+            store.get_boost_table("read file notes.txt")
+        assert classify.call_count == 1
+
+
+class TestFeedbackHistory:
+    """Test the columnar entry history."""
+
+    @staticmethod
+    def _entry(i: int) -> FeedbackEntry:
+        return FeedbackEntry(
+            task=f"read file data{i}.csv",
+            selected_tool=f"tool_{i % 2}",
+            success=i % 3 != 0,
+            timestamp=float(i),
+            context=f"ctx {i}",
+            confidence=i / 10,
+            task_type="file_operations",
+            intent_category="read",
+            entities=[f"data{i}.csv"],
+        )
+
+    def test_round_trips_entries(self) -> None:
+        history = FeedbackHistory(5)
+        entry = self._entry(1)
+        history.append(entry)
+        assert len(history) == 1
+        restored = history[-1]
+        assert (restored.task, restored.selected_tool, restored.success) == (entry.task, entry.selected_tool, True)
+        assert (restored.timestamp, restored.context, restored.confidence) == (1.0, "ctx 1", 0.1)
+        assert (restored.task_type, restored.intent_category) == ("file_operations", "read")
+        # Entities are re-derived from the task text
+        assert set(restored.entities) == set(extract_entities(entry.task))
+
+    def test_overwrites_oldest_when_full(self) -> None:
+        history = FeedbackHistory(3)
+        for i in range(5):
+            history.append(self._entry(i))
+        assert [e.timestamp for e in history] == [2.0, 3.0, 4.0]
+        assert history.task(0) == "read file data2.csv"
+        assert history.tool(-1) == "tool_0"
+        with pytest.raises(IndexError):
+            history[3]
+
+    def test_training_samples_and_records(self) -> None:
+        history = FeedbackHistory(3)
+        for i in range(5):
+            history.append(self._entry(i))
+        assert history.training_samples(since=2.0) == [("read file data4.csv", "tool_0", 4.0)]
+        records = history.to_records()
+        assert [FeedbackEntry(**r) for r in records][0].task == "read file data2.csv"
+        assert "entities" not in records[0]
+
+    def test_contexts_are_truncated_and_shared(self) -> None:
+        history = FeedbackHistory(3)
+        for i in range(3):
+            entry = self._entry(i)
+            entry.context = "".join(["session ", "x" * 1000])
+            history.append(entry)
+        assert len(history[0].context) == 256
+        assert history[0].context is history[2].context
+
+    def test_rejects_empty_maxlen(self) -> None:
+        with pytest.raises(ValueError, match="maxlen"):
+            FeedbackHistory(0)
+
+    def test_clear(self) -> None:
+        history = FeedbackHistory(2)
+        for i in range(3):
+            history.append(self._entry(i))
+        history.clear()
+        assert len(history) == 0
+        history.append(self._entry(7))
+        assert history[0].timestamp == 7.0
@@ -0,0 +1,58 @@
+"""Tests for the background feedback writer."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+from tool_router.ai.feedback import FeedbackStore
+from tool_router.ai.feedback_writer import FeedbackWriter
+
+
+class TestFeedbackWriter:
+    def test_applies_events_in_background(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        writer = FeedbackWriter(store, flush_interval=0.01)
+        writer.start()
+        for i in range(25):
+            assert writer.submit(f"read file {i}", "reader", success=i % 5 != 0)
+        assert writer.flush(timeout=5)
+        writer.stop()
+
+        stats = store.get_stats("reader")
+        assert stats.success_count == 20
+        assert stats.failure_count == 5
+        assert writer.get_stats()["written"] == 25
+
+    def test_batches_share_one_record_many_call(self) -> None:
+        store = Mock()
+        writer = FeedbackWriter(store, batch_size=10)
+        for i in range(25):
+            writer.submit(f"task {i}", "tool", success=True)
+        writer.flush()
+        assert [len(call.args[0]) for call in store.record_many.call_args_list] == [10, 10, 5]
+        assert writer.get_stats()["batches"] == 3
+
+    def test_drops_when_queue_is_full(self) -> None:
+        writer = FeedbackWriter(Mock(), max_queue_size=2)
+        assert writer.submit("a", "tool", success=True)
+        assert writer.submit("b", "tool", success=True)
+        assert not writer.submit("c", "tool", success=True)
+        stats = writer.get_stats()
+        assert stats["dropped"] == 1
+        assert stats["queued"] == 2
+
+    def test_stop_flushes_pending_events(self, tmp_path: Path) -> None:
+        store = FeedbackStore(str(tmp_path / "fb.json"))
+        writer = FeedbackWriter(store, flush_interval=60)
+        writer.start()
+        writer.submit("search the web", "web_search", success=True)
+        writer.stop()
+        assert store.get_stats("web_search").success_count == 1
+
+    def test_store_errors_are_counted(self) -> None:
+        store = Mock()
+        store.record_many.side_effect = OSError("disk full")
+        writer = FeedbackWriter(store)
+        writer.submit("task", "tool", success=True)
+        writer.flush()
+        assert writer.get_stats()["errors"] == 1
+        assert writer.get_stats()["written"] == 0
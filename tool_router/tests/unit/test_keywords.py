@@ -0,0 +1,67 @@
+"""Tests for the shared single-pass keyword classifier."""
+
+import pytest
+
+from tool_router.ai.keywords import (
+    INTENT_RULES,
+    PROMPT_TASK_TYPE_RULES,
+    ROUTING_RULE_SETS,
+    TASK_TYPE_RULES,
+    KeywordClassifier,
+    RuleSet,
+    get_task_classifier,
+)
+
+
+TASKS = [
+    "Read file config.yaml",
+    "search the web for news",
+    "Refactor the database table schema",
+    "Create a creative design for the landing page",
+    "fix the broken build, it is not working",
+    "improve performance and speed up the query",
+    "thread dump of the running process",
+    "",
+]
+
+
+def _naive_label(rule_set: RuleSet, text: str) -> str:
+    """Reference implementation: one substring test per keyword."""
+    lower = text.lower()
+    if not rule_set.scored:
+        for label, words in rule_set.rules.items():
+            if any(word in lower for word in words):
+                return label
+        return rule_set.default
+    scores = {label: sum(1 for word in words if word in lower) for label, words in rule_set.rules.items()}
+    scores = {label: score for label, score in scores.items() if score}
+    return max(scores, key=scores.get) if scores else rule_set.default
+
+
+class TestKeywordClassifier:
+    @pytest.mark.parametrize("task", TASKS)
+    def test_matches_substring_semantics(self, task: str) -> None:
+        classifier = KeywordClassifier(ROUTING_RULE_SETS)
+        labels = classifier.classify(task)
+        for rule_set in ROUTING_RULE_SETS:
+            assert labels[rule_set.name] == _naive_label(rule_set, task)
+
+    def test_overlapping_keywords_are_all_found(self) -> None:
+        classifier = KeywordClassifier([PROMPT_TASK_TYPE_RULES])
+        found = classifier.matches("make faster: improve performance")
+        assert {"make", "make faster", "improve", "improve performance"} <= found
+
+    def test_scored_counts_distinct_keywords(self) -> None:
+        classifier = KeywordClassifier([PROMPT_TASK_TYPE_RULES])
+        scores = classifier.scores("debug the error and fix the crash", PROMPT_TASK_TYPE_RULES.name)
+        assert scores == {"code_debugging": 5}  # "debug" also contains "bug"
+
+    def test_results_are_memoized(self) -> None:
+        classifier = KeywordClassifier([TASK_TYPE_RULES, INTENT_RULES])
+        first = classifier.classify("Read File")
+        assert classifier.classify("read file") is first
+        assert classifier.cache_info().hits == 1
+
+    def test_shared_instance(self) -> None:
+        assert get_task_classifier() is get_task_classifier()
+        assert get_task_classifier().label("delete old logs", INTENT_RULES.name) == "delete"
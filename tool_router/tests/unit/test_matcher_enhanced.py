@@ -77,6 +77,45 @@ class TestHybridSelection:
         assert result[0]["name"] == "web_search"
         mock_ai_selector.select_tool.assert_called_once()
 
+    def test_select_top_matching_tools_hybrid_classifier_skips_ai(self, sample_tools):
+        """Test that a confident classifier prediction replaces the AI call."""
+        mock_ai_selector = Mock()
+        mock_classifier = Mock()
+        mock_classifier.predict.return_value = ("file_reader", 0.95)
+
+        result = select_top_matching_tools_hybrid(
+            tools=sample_tools,
+            task="read the notes",
+            context="",
+            top_n=1,
+            ai_selector=mock_ai_selector,
+            ai_weight=0.7,
+            feedback_store=None,
+            tool_classifier=mock_classifier,
+        )
+
+        assert result[0]["name"] == "file_reader"
+        mock_ai_selector.select_tool.assert_not_called()
+
+    def test_select_top_matching_tools_hybrid_classifier_unsure_uses_ai(self, sample_tools):
+        """Test that the AI selector is consulted when the classifier abstains."""
+        mock_ai_selector = Mock()
+        mock_ai_selector.select_tool.return_value = {"tool_name": "web_search", "confidence": 0.9}
+        mock_classifier = Mock()
+        mock_classifier.predict.return_value = None
+
+        result = select_top_matching_tools_hybrid(
+            tools=sample_tools,
+            task="search the web",
+            context="",
+            top_n=1,
+            ai_selector=mock_ai_selector,
+            tool_classifier=mock_classifier,
+        )
+
+        assert result[0]["name"] == "web_search"
+        mock_ai_selector.select_tool.assert_called_once()
+
     def test_select_top_matching_tools_hybrid_ai_failure(self, sample_tools):
         """Test hybrid selection when AI fails."""
         mock_ai_selector = Mock()
@@ -99,7 +138,7 @@ class TestHybridSelection:
         """Test hybrid selection with feedback store."""
         mock_feedback_store = Mock()
         mock_feedback_store.similar_task_tools.return_value = ["web_search"]
-        mock_feedback_store.get_comprehensive_boost.return_value = 1.2
+        mock_feedback_store.get_boost_table.return_value = {"web_search": 1.2}
 
         result = select_top_matching_tools_hybrid(
             tools=sample_tools,
@@ -154,7 +193,7 @@ class TestEnhancedSelection:
         mock_feedback_store.get_adaptive_hints.return_value = ["search", "web"]
         mock_feedback_store.similar_task_tools.return_value = ["web_search"]
         mock_feedback_store.get_learning_insights.return_value = {"web_search": 0.8}
-        mock_feedback_store.get_comprehensive_boost.return_value = 1.1
+        mock_feedback_store.get_boost_table.return_value = {"web_search": 1.1}
 
         result = select_top_matching_tools_enhanced(
             tools=sample_tools,
@@ -201,7 +240,7 @@ class TestEnhancedSelection:
             "web_search": 0.9,
             "file_reader": 0.3
         }
-        mock_feedback_store.get_comprehensive_boost.return_value = 1.15
+        mock_feedback_store.get_boost_table.return_value = {"web_search": 1.15}
 
         result = select_top_matching_tools_enhanced(
             tools=sample_tools,
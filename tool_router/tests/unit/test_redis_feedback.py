@@ -0,0 +1,165 @@
+"""Tests for the Redis-shared feedback store."""
+
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tool_router.ai.feedback import FeedbackStore
+from tool_router.ai.redis_feedback import RedisFeedbackStore, _PendingEvent
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server() -> "fakeredis.FakeServer":
+    return fakeredis.FakeServer()
+
+
+def _client(server: "fakeredis.FakeServer") -> "fakeredis.FakeRedis":
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+class TestRedisFeedbackStore:
+    def test_replicas_share_learning(self, server: "fakeredis.FakeServer") -> None:
+        replica_a = RedisFeedbackStore(client=_client(server))
+        replica_b = RedisFeedbackStore(client=_client(server))
+        replica_a.record("read file a.txt", "reader", success=True, confidence=0.8)
+        replica_b.record("read file b.txt", "reader", success=False, confidence=0.4)
+
+        replica_a.refresh()
+        replica_b.refresh()
+        for replica in (replica_a, replica_b):
+            stats = replica.get_stats("reader")
+            assert stats.success_count == 1
+            assert stats.failure_count == 1
+            assert stats.avg_confidence == pytest.approx(0.6)
+        assert replica_a.get_boost("reader") == replica_b.get_boost("reader")
+
+    def test_matches_local_store(self, server: "fakeredis.FakeServer", tmp_path: Path) -> None:
+        shared = RedisFeedbackStore(client=_client(server))
+        local = FeedbackStore(str(tmp_path / "fb.json"))
+        tasks = [
+            ("read file config.yaml", "reader", True, 0.9),
+            ("read file broken", "reader", False, 0.2),
+            ("search the web for news", "web_search", True, 0.8),
+            ("delete old logs", "cleaner", False, 0.4),
+        ]
+        for task, tool, success, confidence in tasks:
+            shared.record(task, tool, success=success, confidence=confidence)
+            local.record(task, tool, success=success, confidence=confidence)
+
+        merged = RedisFeedbackStore(client=_client(server))
+        for tool in ("reader", "web_search", "cleaner"):
+            assert merged.get_stats(tool) == local.get_stats(tool)
+        task = "read file notes.txt"
+        assert merged.get_comprehensive_boost("reader", task) == pytest.approx(
+            local.get_comprehensive_boost("reader", task)
+        )
+        merged_insights, local_insights = merged.get_learning_insights(task), local.get_learning_insights(task)
+        assert merged_insights["recommended_tools"] == local_insights["recommended_tools"]
+        assert sorted(merged_insights["pattern"]["common_entities"]) == sorted(
+            local_insights["pattern"]["common_entities"]
+        )
+        assert merged.similar_task_tools("search the web") == local.similar_task_tools("search the web")
+
+    def test_retried_batch_is_not_double_counted(self, server: "fakeredis.FakeServer") -> None:
+        store = RedisFeedbackStore(client=_client(server))
+        store.record("read file", "reader", success=True)
+        # Simulate a lost EXEC reply: the same event is sent again
+        store._pending.append(_PendingEvent(f"{store._instance_id}:1", store._entries[0]))
+        assert store._flush_pending()
+
+        store.refresh()
+        assert store.get_stats("reader").success_count == 1
+        assert _client(server).xlen(store._key("events")) == 1
+
+    def test_applied_state_is_one_key_per_replica(self, server: "fakeredis.FakeServer") -> None:
+        store = RedisFeedbackStore(client=_client(server))
+        for i in range(20):
+            store.record(f"read file {i}.txt", "reader", success=True)
+        assert _client(server).keys(store._key("applied:*")) == [store._key(f"applied:{store._instance_id}")]
+
+    def test_refresh_applies_only_new_events(self, server: "fakeredis.FakeServer") -> None:
+        replica_a = RedisFeedbackStore(client=_client(server))
+        replica_a.record("read file a.txt", "reader", success=True)
+        replica_b = RedisFeedbackStore(client=_client(server))
+        replica_a.record("read file b.txt", "reader", success=False)
+        replica_b.record("search the web", "web_search", success=True)
+
+        with patch.object(replica_b, "_rebuild", side_effect=AssertionError("full rebuild")):
+            replica_b.refresh()
+            replica_b.refresh()
+        stats = replica_b.get_stats("reader")
+        assert (stats.success_count, stats.failure_count) == (1, 1)
+        assert replica_b.get_stats("web_search").success_count == 1
+        assert len(replica_b._entries) == 3
+
+    def test_refresh_reloads_after_stream_is_trimmed(self, server: "fakeredis.FakeServer") -> None:
+        replica_a = RedisFeedbackStore(client=_client(server))
+        replica_a.record("read file a.txt", "reader", success=True)
+        replica_b = RedisFeedbackStore(client=_client(server))
+        replica_a.record("read file b.txt", "reader", success=True)
+        _client(server).xtrim(replica_a._key("events"), maxlen=0)
+
+        with patch.object(replica_b, "_reload", wraps=replica_b._reload) as reload:
+            replica_b.refresh()
+        reload.assert_called_once()
+        assert replica_b.get_stats("reader").success_count == 2
+
+    def test_warns_once_when_buffer_fills(
+        self, server: "fakeredis.FakeServer", caplog: pytest.LogCaptureFixture
+    ) -> None:
+        store = RedisFeedbackStore(client=_client(server), max_events=2)
+        with patch.object(store._client, "transaction", side_effect=ConnectionError("down")):
+            for _ in range(5):
+                store.record("read file", "reader", success=True)
+        assert caplog.text.count("buffer full") == 1
+
+    def test_buffers_events_while_redis_is_down(self, server: "fakeredis.FakeServer") -> None:
+        store = RedisFeedbackStore(client=_client(server))
+        with patch.object(store._client, "transaction", side_effect=ConnectionError("down")):
+            store.record("read file", "reader", success=True)
+            assert len(store._pending) == 1
+            store.refresh()
+            assert store.get_stats("reader").success_count == 1  # Still visible locally
+
+        store.record("read file", "reader", success=True)
+        assert not store._pending
+        assert RedisFeedbackStore(client=_client(server)).get_stats("reader").success_count == 2
+
+    def test_redis_round_trip_runs_without_store_lock(self, server: "fakeredis.FakeServer") -> None:
+        store = RedisFeedbackStore(client=_client(server))
+        transaction = store._client.transaction
+        lock_free = []
+
+        def probe() -> None:
+            acquired = store._lock.acquire(timeout=1)
+            if acquired:
+                store._lock.release()
+            lock_free.append(acquired)
+
+        def check_lock(*args: object, **kwargs: object) -> object:
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return transaction(*args, **kwargs)
+
+        with patch.object(store._client, "transaction", side_effect=check_lock):
+            store.record("read file", "reader", success=True)
+        assert lock_free == [True]
+        assert not store._pending
+
+    def test_without_redis_works_locally(self) -> None:
+        with patch("tool_router.ai.redis_feedback.REDIS_AVAILABLE", False):
+            store = RedisFeedbackStore()
+        store.record("read file", "reader", success=True)
+        assert store.get_stats("reader").success_count == 1
+
+    def test_background_sync_start_stop(self, server: "fakeredis.FakeServer") -> None:
+        store = RedisFeedbackStore(client=_client(server), sync_interval=60)
+        store.start_compaction()
+        store.close()
+        assert store._compaction_thread is None
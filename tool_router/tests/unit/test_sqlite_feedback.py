@@ -0,0 +1,136 @@
+"""Tests for the SQLite-backed feedback store."""
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tool_router.ai.feedback import FeedbackStore, create_feedback_store
+from tool_router.ai.sqlite_feedback import SQLiteFeedbackStore
+
+
+def _record_mix(store: FeedbackStore | SQLiteFeedbackStore) -> None:
+    store.record("read file config.yaml", "reader", success=True, confidence=0.9)
+    store.record("read file data.csv", "reader", success=True, confidence=0.7)
+    store.record("read file broken", "reader", success=False, confidence=0.2)
+    store.record("search the web for news", "web_search", success=True, confidence=0.8)
+    store.record("delete old logs", "cleaner", success=False, confidence=0.4)
+
+
+class TestSQLiteFeedbackStore:
+    def test_missing_tool(self, tmp_path: Path) -> None:
+        store = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        assert store.get_stats("nope") is None
+        assert store.get_boost("nope") == 1.0
+        assert store.get_all_stats() == {}
+
+    def test_matches_in_memory_store(self, tmp_path: Path) -> None:
+        memory = FeedbackStore(str(tmp_path / "fb.json"))
+        sqlite = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        _record_mix(memory)
+        _record_mix(sqlite)
+
+        for tool in ("reader", "web_search", "cleaner"):
+            expected, actual = memory.get_stats(tool), sqlite.get_stats(tool)
+            assert actual.success_count == expected.success_count
+            assert actual.failure_count == expected.failure_count
+            assert actual.avg_confidence == pytest.approx(expected.avg_confidence)
+            assert actual.task_types == expected.task_types
+            assert actual.intent_categories == expected.intent_categories
+            assert actual.recent_success_rate == pytest.approx(expected.recent_success_rate)
+            assert sqlite.get_boost(tool) == pytest.approx(memory.get_boost(tool))
+
+        task = "read file notes.txt"
+        assert sqlite.get_comprehensive_boost("reader", task) == pytest.approx(
+            memory.get_comprehensive_boost("reader", task)
+        )
+        assert sqlite.get_learning_insights(task) == memory.get_learning_insights(task)
+        assert sqlite.get_adaptive_hints(task) == memory.get_adaptive_hints(task)
+        assert sqlite.similar_task_tools("search the web") == memory.similar_task_tools("search the web")
+
+    def test_boosts_decay_with_half_life(self, tmp_path: Path) -> None:
+        db_file = str(tmp_path / "fb.db")
+        store = SQLiteFeedbackStore(db_file, half_life=10)
+        with patch("tool_router.ai.sqlite_feedback.time.time", return_value=1000.0):
+            for _ in range(5):
+                store.record("read file old.txt", "reader", success=False)
+        with patch("tool_router.ai.sqlite_feedback.time.time", return_value=2000.0):
+            for _ in range(5):
+                store.record("read file new.txt", "reader", success=True)
+
+        assert store.get_stats("reader").success_rate == 0.5  # All-time counts are kept
+        assert store.get_task_type_boost("reader", "file_operations") == pytest.approx(1.3)
+        store.close()
+
+        reopened = SQLiteFeedbackStore(db_file, half_life=10)
+        assert reopened.get_task_type_boost("reader", "file_operations") == pytest.approx(1.3)
+
+    def test_boost_table_dropped_on_write(self, tmp_path: Path) -> None:
+        store = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        _record_mix(store)
+        task = "read file notes.txt"
+        table = store.get_boost_table(task)
+        assert table["reader"] == pytest.approx(store.get_comprehensive_boost("reader", task))
+
+        store.record("read file gone", "reader", success=False)
+        assert store.get_boost_table(task)["reader"] < table["reader"]
+
+    def test_persists_across_connections(self, tmp_path: Path) -> None:
+        db_file = str(tmp_path / "fb.db")
+        store = SQLiteFeedbackStore(db_file)
+        _record_mix(store)
+        store.close()
+
+        reopened = SQLiteFeedbackStore(db_file)
+        assert reopened.get_stats("reader").total == 3
+        assert set(reopened.get_all_stats()) == {"reader", "web_search", "cleaner"}
+
+    def test_uses_wal_and_indexes(self, tmp_path: Path) -> None:
+        store = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        assert store._query("PRAGMA journal_mode")[0][0] == "wal"
+        indexes = {row[1] for row in store._query("PRAGMA index_list(feedback_entries)")}
+        assert {"idx_feedback_tool", "idx_feedback_task_type_tool", "idx_feedback_timestamp"} <= indexes
+
+    def test_training_samples_since(self, tmp_path: Path) -> None:
+        store = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        _record_mix(store)
+        samples = store.training_samples()
+        assert len(samples) == 3
+        assert store.training_samples(since=samples[-1][2]) == []
+
+    def test_prune_keeps_rollups(self, tmp_path: Path) -> None:
+        store = SQLiteFeedbackStore(str(tmp_path / "fb.db"))
+        _record_mix(store)
+        time.sleep(0.01)
+        assert store.prune(retention_days=0) == 5
+        assert store.training_samples() == []
+        assert store.get_stats("reader").success_count == 2
+
+    def test_background_compaction_prunes_and_checkpoints(self, tmp_path: Path) -> None:
+        db_file = tmp_path / "fb.db"
+        store = SQLiteFeedbackStore(str(db_file), retention_days=0)
+        _record_mix(store)
+        wal_file = tmp_path / "fb.db-wal"
+        assert wal_file.stat().st_size > 0
+
+        store.start_compaction(interval=0.05)
+        deadline = time.monotonic() + 3
+        while (store.training_samples() or wal_file.stat().st_size) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert wal_file.stat().st_size == 0
+        assert store.training_samples() == []
+        store.close()
+
+        assert store._compaction_thread is None
+        assert SQLiteFeedbackStore(str(db_file)).get_stats("reader").success_count == 2
+
+
+class TestCreateFeedbackStore:
+    def test_sqlite_backend(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ROUTER_FEEDBACK_DB", str(tmp_path / "fb.db"))
+        assert isinstance(create_feedback_store("sqlite"), SQLiteFeedbackStore)
+
+    def test_unknown_backend_falls_back_to_json(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ROUTER_FEEDBACK_FILE", str(tmp_path / "fb.json"))
+        assert type(create_feedback_store("bogus")) is FeedbackStore
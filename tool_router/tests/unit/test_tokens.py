@@ -0,0 +1,92 @@
+"""Tests for shared token accounting and prompt packing."""
+
+import json
+from pathlib import Path
+
+from tool_router.ai.tokens import TokenCounter, format_tool_line, pack_tool_descriptions
+
+
+class TestTokenCounter:
+    def test_heuristic_fallback(self) -> None:
+        counter = TokenCounter(vocab_file=None)
+        assert not counter.uses_vocabulary
+        assert counter.count("one two three four") == 6  # ceil(4 * 1.3)
+
+    def test_empty_text(self) -> None:
+        assert TokenCounter().count("") == 0
+
+    def test_flat_json_vocabulary(self, tmp_path: Path) -> None:
+        vocab_file = tmp_path / "vocab.json"
+        vocab_file.write_text(json.dumps({"search": 0, "ing": 1, "web": 2, "Ġthe": 3}))
+        counter = TokenCounter(vocab_file=str(vocab_file))
+        assert counter.uses_vocabulary
+        # "searching" -> search + ing, "the" -> the, "web" -> web
+        assert counter.count("searching the web") == 4
+
+    def test_huggingface_tokenizer_json(self, tmp_path: Path) -> None:
+        vocab_file = tmp_path / "tokenizer.json"
+        vocab_file.write_text(json.dumps({"model": {"vocab": {"read": 0, "▁file": 1}}}))
+        counter = TokenCounter(vocab_file=str(vocab_file))
+        assert counter.count("read file") == 2
+
+    def test_text_vocabulary_unknown_characters(self, tmp_path: Path) -> None:
+        vocab_file = tmp_path / "vocab.txt"
+        vocab_file.write_text("hello\n##world\n")
+        counter = TokenCounter(vocab_file=str(vocab_file))
+        # "helloworld" -> hello + world, "!" -> 1 unknown char
+        assert counter.count("helloworld!") == 3
+
+    def test_missing_vocabulary_uses_heuristic(self, tmp_path: Path) -> None:
+        counter = TokenCounter(vocab_file=str(tmp_path / "missing.json"))
+        assert not counter.uses_vocabulary
+        assert counter.count("a b") == 3
+
+    def test_counts_are_memoized(self) -> None:
+        counter = TokenCounter()
+        counter.count("repeat me")
+        counter.count("repeat me")
+        info = counter.cache_info()
+        assert info["hits"] == 1
+        assert info["misses"] == 1
+
+    def test_truncate_within_budget(self) -> None:
+        counter = TokenCounter()
+        text = " ".join(f"word{i}" for i in range(50))
+        truncated = counter.truncate(text, 10)
+        assert truncated.endswith("...")
+        assert counter.count(truncated) <= 10
+
+    def test_truncate_cuts_long_first_word_by_characters(self, tmp_path: Path) -> None:
+        vocab_file = tmp_path / "vocab.txt"
+        vocab_file.write_text("ab\ncd\n.\n")
+        counter = TokenCounter(vocab_file=str(vocab_file))
+        assert counter.truncate("abcd" * 20 + " tail", 6) == "abcdab..."
+        assert counter.truncate("abcd" * 20, 3) == ""
+
+    def test_truncate_short_text_unchanged(self) -> None:
+        counter = TokenCounter()
+        assert counter.truncate("short text", 10) == "short text"
+
+
+class TestPackToolDescriptions:
+    def test_stops_at_budget_keeping_ranked_order(self) -> None:
+        counter = TokenCounter()
+        tools = [{"name": f"tool_{i}", "description": "does a useful thing"} for i in range(20)]
+        line_tokens = counter.count(format_tool_line(tools[0])) + 1
+        packed = pack_tool_descriptions(tools, budget_tokens=line_tokens * 3, counter=counter)
+        lines = packed.split("\n")
+        assert [line.split(":")[0] for line in lines] == ["- tool_0", "- tool_1", "- tool_2"]
+
+    def test_truncates_long_descriptions(self) -> None:
+        counter = TokenCounter()
+        tools = [{"name": "verbose", "description": "word " * 200}]
+        packed = pack_tool_descriptions(tools, budget_tokens=1000, max_description_tokens=20, counter=counter)
+        assert packed.endswith("...")
+        assert counter.count(packed) < 30
+
+    def test_always_includes_first_tool(self) -> None:
+        tools = [{"name": "only", "description": "desc"}]
+        assert pack_tool_descriptions(tools, budget_tokens=0).startswith("- only")
+
+    def test_missing_description(self) -> None:
+        assert pack_tool_descriptions([{"name": "bare"}], budget_tokens=100) == "- bare: No description"